@@ -15,20 +15,14 @@ sys.path.append('/app/config')
 
 from monitor import CastingMonitor
 from config.settings import Settings
+from utils.log_pipeline import configure_logging
 
 async def main():
     """Основная функция приложения"""
     settings = Settings()
     
-    # Настройка логирования
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('/app/logs/casting_monitor.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    # Настройка логирования: общий с ботами вывод через очередь в фоновом потоке
+    configure_logging(level=settings.LOG_LEVEL, log_file='/app/logs/casting_monitor.log')
     
     logger = logging.getLogger(__name__)
     logger.info("Запуск мониторинга кастингов...")
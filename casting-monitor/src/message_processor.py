@@ -11,6 +11,7 @@ from llm_client import LLMClient
 from clickhouse_client import ClickHouseClient
 from notification_client import NotificationClient
 from config.settings import Settings
+from utils.log_pipeline import get_throttled_logger
 
 class MessageProcessor:
     def __init__(self, settings: Settings):
@@ -22,6 +23,8 @@ class MessageProcessor:
             settings.NOTIFICATION_CHAT_ID
         )
         self.logger = logging.getLogger(__name__)
+        # Записи на каждое сообщение - с ограничением частоты
+        self.message_logger = get_throttled_logger(self.logger)
     
     async def process_message(self, message: Message):
         """Полная обработка сообщения"""
@@ -41,7 +44,7 @@ class MessageProcessor:
             # 5. Отправка уведомления
             await self._send_notification(message_data, llm_result)
             
-            self.logger.info(f"Сообщение {message_data['message_id']} обработано успешно")
+            self.message_logger.info(f"Сообщение {message_data['message_id']} обработано успешно")
             
         except Exception as e:
             self.logger.error(f"Ошибка при обработке сообщения: {e}")
@@ -79,7 +82,7 @@ class MessageProcessor:
     async def _save_to_clickhouse(self, message_data: Dict[str, Any]):
         """Сохранение сообщения в ClickHouse"""
         await self.clickhouse_client.insert_castings_message(message_data)
-        self.logger.debug(f"Сообщение {message_data['message_id']} сохранено в ClickHouse")
+        self.message_logger.debug(f"Сообщение {message_data['message_id']} сохранено в ClickHouse")
     
     async def _analyze_with_llm(self, text: str) -> Dict[str, Any]:
         """Анализ текста через LLM"""
@@ -91,13 +94,13 @@ class MessageProcessor:
     async def _update_with_llm_result(self, message_id: int, llm_result: Dict[str, Any]):
         """Обновление записи с результатом LLM анализа"""
         await self.clickhouse_client.update_llm_analysis(message_id, llm_result)
-        self.logger.debug(f"LLM результат для сообщения {message_id} сохранен")
+        self.message_logger.debug(f"LLM результат для сообщения {message_id} сохранен")
     
     async def _send_notification(self, message_data: Dict[str, Any], llm_result: Dict[str, Any]):
         """Отправка уведомления о новом сообщении"""
         try:
             await self.notification_client.send_new_message_notification(message_data, llm_result)
-            self.logger.debug(f"Уведомление для сообщения {message_data['message_id']} отправлено")
+            self.message_logger.debug(f"Уведомление для сообщения {message_data['message_id']} отправлено")
         except Exception as e:
             self.logger.error(f"Ошибка при отправке уведомления: {e}")
             # Не прерываем обработку из-за ошибки уведомления
@@ -10,6 +10,7 @@ from telethon.tl.types import Channel, Message
 
 from message_processor import MessageProcessor
 from config.settings import Settings
+from utils.log_pipeline import get_throttled_logger
 from config.channels import get_monitored_channels
 
 class CastingMonitor:
@@ -18,6 +19,8 @@ class CastingMonitor:
         self.client = None
         self.processor = MessageProcessor(settings)
         self.logger = logging.getLogger(__name__)
+        # Записи на каждое сообщение - с ограничением частоты
+        self.message_logger = get_throttled_logger(self.logger)
         self.is_running = False
         
     async def start(self):
@@ -72,7 +75,7 @@ class CastingMonitor:
     async def process_new_message(self, message: Message):
         """Обработка нового сообщения"""
         try:
-            self.logger.info(f"Новое сообщение из канала {message.chat.username}")
+            self.message_logger.info(f"Новое сообщение из канала {message.chat.username}")
             
             # Обработка сообщения
             await self.processor.process_message(message)
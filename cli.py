@@ -269,6 +269,29 @@ def group_responder():
         if e.stderr:
             click.echo(f"Ошибка: {e.stderr}")
 
+@bot.command()
+@click.option('--bot-type', 'bot_type', default='simple', type=click.Choice(['simple', 'smart', 'group']),
+              help='Тип бота')
+@click.option('--messages', default=1000, help='Количество сообщений')
+@click.option('--chats', default=5, help='Количество чатов')
+@click.option('--reply-ratio', default=0.3, help='Доля сообщений с ключевыми словами')
+@click.option('--recorded', default=None, help='JSONL с записанными сообщениями')
+def bench(bot_type, messages, chats, reply_ratio, recorded):
+    """Нагрузочный тест автоответчика без Telegram"""
+    click.echo(f"⏱️ Нагрузочный тест {bot_type}: {messages} сообщений, {chats} чатов...")
+    command = [sys.executable, 'scripts/bench_responders.py', '--bot', bot_type,
+               '--messages', str(messages), '--chats', str(chats), '--reply-ratio', str(reply_ratio)]
+    if recorded:
+        command += ['--recorded', recorded]
+    try:
+        import subprocess
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        click.echo(result.stdout)
+    except subprocess.CalledProcessError as e:
+        click.echo(f"❌ Ошибка нагрузочного теста: {e}")
+        if e.stderr:
+            click.echo(f"Ошибка: {e.stderr}")
+
 @bot.command()
 def docker():
     """Запустить в Docker"""
@@ -41,8 +41,26 @@ def update_database_schema():
             
             # Обновляем таблицу messages
             "ALTER TABLE messages ALTER COLUMN telegram_id TYPE BIGINT;",
+            
+            # Задержка в очереди отправки отдельно от времени отправки
+            "ALTER TABLE bot_responses ADD COLUMN IF NOT EXISTS queue_delay_ms INTEGER;",
+            
+            # Отметки этапов обработки ответа
+            "ALTER TABLE bot_responses ADD COLUMN IF NOT EXISTS message_date TIMESTAMP;",
+            "ALTER TABLE bot_responses ADD COLUMN IF NOT EXISTS received_at TIMESTAMP;",
+            "ALTER TABLE bot_responses ADD COLUMN IF NOT EXISTS persisted_at TIMESTAMP;",
+            "ALTER TABLE bot_responses ADD COLUMN IF NOT EXISTS matched_at TIMESTAMP;",
+            "ALTER TABLE bot_responses ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP;",
+            
+            # Дневные агрегаты bot_stats: одна строка на чат и день
+            "ALTER TABLE bot_stats ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;",
+            "ALTER TABLE bot_stats ADD COLUMN IF NOT EXISTS timed_responses INTEGER;",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_bot_stats_chat_date ON bot_stats (chat_id, date);",
         ]
         
+        # Создаем недостающие таблицы (например, response_rules)
+        db_manager.create_tables()
+        
         # Выполняем команды
         session = db_manager.get_session()
         try:
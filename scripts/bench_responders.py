@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест автоответчиков без подключения к Telegram
+
+Пример:
+    python scripts/bench_responders.py --bot smart --messages 5000 --chats 20 --reply-ratio 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots import SimpleResponder, SmartResponder, GroupResponder
+from src.bots.replay import ReplayHarness, generate_events, load_recorded_events
+from src.database.database import DatabaseManager
+from src.config.logging_config import setup_logging, get_logger
+
+logger = get_logger("bench_responders")
+
+BOT_FACTORIES = {
+    'simple': lambda chats: SimpleResponder(chats=chats),
+    'smart': lambda chats: SmartResponder(chats=chats),
+    'group': lambda chats: GroupResponder(groups=chats),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест автоответчиков")
+    parser.add_argument('--bot', choices=sorted(BOT_FACTORIES), default='simple', help="Тип бота")
+    parser.add_argument('--messages', type=int, default=1000, help="Количество сообщений")
+    parser.add_argument('--chats', type=int, default=5, help="Количество чатов")
+    parser.add_argument('--users', type=int, default=100, help="Количество отправителей")
+    parser.add_argument('--reply-ratio', type=float, default=0.3,
+                        help="Доля сообщений с ключевыми словами (0..1)")
+    parser.add_argument('--recorded', help="JSONL с записанными сообщениями вместо генерации")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Темп подачи, сообщений в секунду (по умолчанию без ограничения)")
+    parser.add_argument('--send-latency-ms', type=float, default=50.0,
+                        help="Имитация времени отправки одного сообщения")
+    parser.add_argument('--global-rate', type=float, default=25.0,
+                        help="Лимит отправки на все чаты, сообщений в секунду")
+    parser.add_argument('--chat-rate', type=float, default=1.0,
+                        help="Лимит отправки на чат, сообщений в секунду")
+    parser.add_argument('--database-url', help="URL базы (по умолчанию временная SQLite)")
+    parser.add_argument('--seed', type=int, default=42, help="Зерно генератора сообщений")
+    parser.add_argument('--json', action='store_true', help="Вывести отчет в JSON")
+    return parser.parse_args()
+
+
+def print_report(report):
+    """Печатает отчет в читаемом виде"""
+    print(f"\n📊 {report['bot']}: {report['messages']} сообщений в {report['chats']} чатах")
+    print(f"   Пропускная способность: {report['messages_per_sec']} сообщ/с "
+          f"(за {report['elapsed_s']}с, ошибок: {report['errors']}, отброшено: {report['dropped']})")
+    print(f"   Ответов отправлено: {report['replies_sent']}")
+    writer = report['db_writer']
+    print(f"   База: {writer['messages_written']} сообщений, {writer['responses_written']} ответов, "
+          f"{writer['flushes']} пачек, {report['db_statements']} SQL-запросов "
+          f"(дозапись {report['db_drain_s']}с)")
+    print("   Задержки, мс:")
+    for stage, summary in report['latency_ms'].items():
+        print(f"      {stage:12} p50={summary['p50']:>8} p95={summary['p95']:>8} "
+              f"p99={summary['p99']:>8} max={summary['max']:>8}")
+
+
+async def main():
+    args = parse_args()
+    setup_logging(level="WARNING", log_to_file=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseManager(args.database_url or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}")
+        db.create_tables()
+
+        harness = ReplayHarness(
+            BOT_FACTORIES[args.bot], db,
+            chat_count=args.chats,
+            send_latency=args.send_latency_ms / 1000,
+            global_rate=args.global_rate,
+            chat_rate=args.chat_rate
+        )
+        if args.recorded:
+            events = load_recorded_events(args.recorded, harness.chat_ids)
+        else:
+            events = generate_events(harness.chat_ids, args.messages, harness.keywords(),
+                                     reply_ratio=args.reply_ratio, users=args.users, seed=args.seed)
+
+        report = await harness.run(events, rate=args.rate)
+        db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Замер времени импорта модулей проекта
+
+Каждый модуль импортируется в отдельном процессе с пустым окружением,
+поэтому замер не зависит от .env и уже загруженных модулей.
+
+Пример:
+    python scripts/check_import_time.py --budget 1.5
+    python scripts/check_import_time.py src.bots --budget 1.0
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    'src.config.settings',
+    'src.database.database',
+    'src.bots',
+    'src.bot_manager',
+]
+
+# Выполняется в дочернем процессе: время импорта и признаки побочных эффектов
+_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - started
+from src.config.settings import config
+from src.database.database import db_manager
+from src.config.logging_config import bot_logger
+print(json.dumps({
+    'seconds': round(elapsed, 3),
+    'config': config.lazy_initialized,
+    'db_manager': db_manager.lazy_initialized,
+    'logger': bot_logger.lazy_initialized,
+    'files': sorted(os.listdir('.')),
+}))
+"""
+
+
+def measure(module: str) -> dict:
+    """
+    Импортирует модуль в чистом процессе
+
+    Returns:
+        dict: seconds - время импорта; config, db_manager, logger - были ли
+            созданы глобальные объекты; files - что появилось в рабочем каталоге
+    """
+    env = {'PATH': os.environ.get('PATH', ''), 'PYTHONPATH': ROOT}
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [sys.executable, '-c', _PROBE, module],
+            cwd=cwd, env=env, capture_output=True, text=True, timeout=60
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Импорт {module} завершился с ошибкой:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени импорта модулей")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help="Модули для замера")
+    parser.add_argument('--budget', type=float, default=1.5, help="Допустимое время импорта, секунд")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        report = measure(module)
+        side_effects = [name for name in ('config', 'db_manager', 'logger') if report[name]]
+        if report['files']:
+            side_effects.append(f"файлы: {', '.join(report['files'])}")
+        over_budget = report['seconds'] > args.budget
+        failed = failed or over_budget or bool(side_effects)
+        status = "❌" if over_budget or side_effects else "✅"
+        print(f"{status} {module}: {report['seconds']}с"
+              + (f" (создано при импорте: {'; '.join(side_effects)})" if side_effects else ""))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
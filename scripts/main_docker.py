@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Telegram Bot Auto-Responder - Docker версия
-Автоматически запускает SimpleResponder без интерактивного ввода
+Автоматически запускает боты из BOT_TYPES (по умолчанию SimpleResponder) без интерактивного ввода
 """
 
 import asyncio
@@ -13,7 +13,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.config.logging_config import setup_logging, get_logger
 from src.bot_manager import BotManager
-from src.config.settings import config
+from src.config.settings import ConfigError, config
 
 # Настройка логирования
 setup_logging()
@@ -27,12 +27,15 @@ async def main():
         # Создаем менеджер ботов
         bot_manager = BotManager()
         
-        # Автоматически запускаем SimpleResponder
-        logger.info("Автоматический запуск SimpleResponder...")
-        await bot_manager.run_bot('simple')
+        # Автоматически запускаем боты из BOT_TYPES в одном процессе
+        logger.info(f"Автоматический запуск ботов: {', '.join(config.BOT_TYPES)}...")
+        await bot_manager.run_bots(config.BOT_TYPES)
         
     except KeyboardInterrupt:
         logger.info("Получен сигнал остановки")
+    except ConfigError:
+        # Недостающие переменные уже перечислены в логе
+        sys.exit(1)
     except Exception as e:
         logger.error(f"Критическая ошибка: {e}")
         sys.exit(1)
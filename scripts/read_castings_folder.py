@@ -30,12 +30,13 @@ except ImportError as e:
     CASTINGS_SETTINGS = {}
     CASTING_PARSER_CONFIG = {}
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from src.utils.log_pipeline import configure_logging, get_throttled_logger
+
+# Настройка логирования: запись в фоновом потоке, чтобы не тормозить Telethon
+configure_logging(level="INFO")
 logger = logging.getLogger(__name__)
+# Записи на каждое прочитанное сообщение - с выборкой и ограничением частоты
+message_logger = get_throttled_logger(logger)
 
 class CastingsFolderReader:
     def __init__(self):
@@ -257,7 +258,7 @@ class CastingsFolderReader:
                 offset_date=offset_date
             ):
                 message_count += 1
-                logger.info(f"   📝 Сообщение {message_count}: ID {message.id}, дата: {message.date.strftime('%Y-%m-%d %H:%M')}")
+                message_logger.info(f"   📝 Сообщение {message_count}: ID {message.id}, дата: {message.date.strftime('%Y-%m-%d %H:%M')}")
                 
                 message_data = {
                     'message_id': message.id,
@@ -279,9 +280,9 @@ class CastingsFolderReader:
                 # Логируем первые несколько символов сообщения
                 if message.text:
                     preview = message.text[:100].replace('\n', ' ')
-                    logger.info(f"      Текст: {preview}...")
+                    message_logger.info(f"      Текст: {preview}...")
                 else:
-                    logger.info(f"      Медиа сообщение: {message_data['media_type']}")
+                    message_logger.info(f"      Медиа сообщение: {message_data['media_type']}")
                 
                 # Небольшая задержка для избежания лимитов
                 await asyncio.sleep(0.1)
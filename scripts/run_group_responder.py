@@ -11,6 +11,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.bots.group_responder import GroupResponder
 from src.config.logging_config import get_logger
+from src.config.settings import ConfigError
 
 logger = get_logger("group_responder_main")
 
@@ -33,6 +34,9 @@ async def main():
         
     except KeyboardInterrupt:
         logger.info("Остановка по запросу пользователя")
+    except ConfigError:
+        # Недостающие переменные уже перечислены в логе
+        sys.exit(1)
     except Exception as e:
         logger.error(f"Ошибка: {e}")
         raise
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Запуск автоответчиков в нескольких процессах под наблюдением супервизора
+
+Чаты из RESPONDER_CHATS (или --chats) распределяются по процессам
+согласованным хэшированием. Упавшие процессы перезапускаются.
+Число процессов меняется без остановки: SIGUSR1 - добавить, SIGUSR2 - убрать.
+
+Каждому процессу нужна своя сессия читателя. Перед первым запуском
+и перед увеличением числа процессов войдите в недостающие сессии
+(номер из PHONE_NUMBER, код вводится в терминале):
+    python scripts/run_supervisor.py --workers 4 --login
+
+Пример:
+    python scripts/run_supervisor.py --workers 4 --bot smart
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.logging_config import setup_logging, get_logger
+from src.bots.client_pool import ClientPool
+from src.config.settings import ConfigError, config, parse_chat_list
+from src.supervisor import Supervisor
+
+logger = get_logger("supervisor_main")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Супервизор процессов-автоответчиков")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Число процессов (по умолчанию SUPERVISOR_WORKERS)")
+    parser.add_argument('--bot', action='append', dest='bots',
+                        help="Тип бота (можно несколько раз, по умолчанию BOT_TYPES)")
+    parser.add_argument('--chats', help="Чаты через запятую (по умолчанию RESPONDER_CHATS)")
+    parser.add_argument('--login', action='store_true',
+                        help="Войти в недостающие сессии процессов и выйти")
+    return parser.parse_args()
+
+
+async def login(session_dir, session_names):
+    """Создает сессии читателя, запрашивая код входа в терминале"""
+    pool = ClientPool(session_dir)
+    try:
+        for session_name in session_names:
+            await pool.acquire(session_name, phone=config.PHONE_NUMBER)
+    finally:
+        await pool.close()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+
+    chats = parse_chat_list(args.chats) or config.RESPONDER_CHATS or [config.CHANNEL_USERNAME]
+    supervisor = Supervisor(
+        bot_types=args.bots or config.BOT_TYPES or ['simple'],
+        chats=chats,
+        workers=args.workers or config.SUPERVISOR_WORKERS,
+        max_restart_delay=config.SUPERVISOR_MAX_RESTART_DELAY,
+        require_sessions=not args.login
+    )
+    if args.login:
+        missing = supervisor.missing_sessions(supervisor.assignments)
+        asyncio.run(login(supervisor.session_dir, missing))
+        logger.info(f"Создано сессий: {len(missing)}")
+        return
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except ConfigError:
+        # Недостающие переменные уже перечислены в логе
+        sys.exit(1)
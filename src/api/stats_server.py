@@ -0,0 +1,186 @@
+"""
+HTTP-сервер статистики запущенных ботов
+"""
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from ..config.logging_config import get_logger
+from ..database.database import db_manager as shared_db_manager
+from ..utils.cache import TTLCache
+from ..utils.serialization import json_dumps
+
+logger = get_logger("stats_server")
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+
+class StatsServer:
+    """
+    Легкий HTTP-сервер на asyncio внутри процесса ботов.
+
+    Маршруты (только GET):
+        /health    - запущенные боты, без кэша
+        /stats     - счетчики, гистограммы задержек, очереди и кэши ботов
+        /messages  - последние сообщения чата (?chat=@имя|peer_id&bot=тип&limit=N)
+
+    Ответы /stats и /messages кэшируются на `cache_ttl` секунд, одинаковые
+    запросы, пришедшие одновременно, ждут одно вычисление: частый опрос
+    дашбордом не обращается к базе данных на каждый запрос.
+    """
+
+    def __init__(self, manager, host: str = '127.0.0.1', port: int = 8081,
+                 cache_ttl: float = 2.0, db_manager=None):
+        """
+        Args:
+            manager: BotManager, чьи запущенные боты (running) показываются
+            host: Адрес для прослушивания
+            port: Порт (0 - любой свободный)
+            cache_ttl: Время жизни кэшированного ответа, секунд
+            db_manager: Менеджер базы данных для /messages (по умолчанию общий)
+        """
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.db_manager = db_manager if db_manager is not None else shared_db_manager
+        self.cache = TTLCache(maxsize=256, ttl=cache_ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.requests = 0
+
+    async def start(self):
+        """Начинает принимать подключения"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Статистика доступна на http://{self.host}:{self.port}/stats")
+
+    async def stop(self):
+        """Закрывает сервер"""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обрабатывает одно подключение: запрос, ответ, закрытие"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Заголовки не используются, но их нужно дочитать
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 5)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2:
+                status, body = 400, {'error': 'bad request'}
+            elif parts[0] not in ('GET', 'HEAD'):
+                status, body = 405, {'error': 'method not allowed'}
+            else:
+                self.requests += 1
+                try:
+                    status, body = await self.dispatch(parts[1])
+                except Exception as e:
+                    logger.error(f"Ошибка запроса статистики {parts[1]}: {e}")
+                    status, body = 500, {'error': str(e)}
+            payload = body if isinstance(body, bytes) else json_dumps(body).encode('utf-8')
+            head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    "Cache-Control: no-store\r\n"
+                    "Connection: close\r\n\r\n")
+            writer.write(head.encode('latin-1') + (payload if parts and parts[0] != 'HEAD' else b''))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Ошибка обработки запроса статистики: {e}")
+        finally:
+            writer.close()
+
+    async def dispatch(self, target: str) -> Tuple[int, Any]:
+        """
+        Возвращает статус и тело ответа для пути запроса
+
+        Returns:
+            tuple: HTTP-статус и тело (dict или готовый JSON в bytes)
+        """
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'bots': list(self.manager.running)}
+        if url.path == '/stats':
+            return await self._cached('/stats', self._stats)
+        if url.path == '/messages':
+            return await self._messages(query)
+        return 404, {'error': 'not found'}
+
+    async def _cached(self, key: str, build, *args) -> Tuple[int, Any]:
+        """Возвращает кэшированный ответ или строит его один раз для всех ожидающих"""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(build(*args))
+            self._inflight[key] = future
+            try:
+                status, body = await future
+            finally:
+                self._inflight.pop(key, None)
+            # Сериализуем один раз, из кэша отдаются готовые байты
+            result = (status, json_dumps(body).encode('utf-8'))
+            if status == 200:
+                self.cache.put(key, result)
+            return result
+        status, body = await asyncio.shield(future)
+        return status, json_dumps(body).encode('utf-8')
+
+    async def _stats(self) -> Tuple[int, Dict[str, Any]]:
+        return 200, {key: bot.get_status() for key, bot in self.manager.running.items()}
+
+    def _find_chat(self, query: Dict[str, str]) -> Tuple[Any, Optional[int]]:
+        """Находит бота и ID чата в базе данных по параметрам bot и chat"""
+        bots = self.manager.running
+        bot = bots.get(query['bot']) if 'bot' in query else next(iter(bots.values()), None)
+        if bot is None:
+            return None, None
+        chat = query.get('chat')
+        for peer_id, name in bot.chat_refs.items():
+            if chat is None or chat in (name, str(peer_id)):
+                return bot, bot.chat_db_ids.get(peer_id)
+        return bot, None
+
+    async def _messages(self, query: Dict[str, str]) -> Tuple[int, Any]:
+        try:
+            limit = min(100, max(1, int(query.get('limit', 20))))
+        except ValueError:
+            return 400, {'error': 'limit must be a number'}
+        bot, chat_db_id = self._find_chat(query)
+        if chat_db_id is None:
+            return 404, {'error': 'chat not found'}
+        return await self._cached(f"/messages:{chat_db_id}:{limit}", self._load_messages, chat_db_id, limit)
+
+    async def _load_messages(self, chat_db_id: int, limit: int) -> Tuple[int, Any]:
+        def load():
+            session = self.db_manager.get_session()
+            try:
+                return [
+                    {
+                        'id': message.id,
+                        'telegram_id': message.telegram_id,
+                        'user_id': message.user_id,
+                        'text': message.text,
+                        'is_bot_response': message.is_bot_response,
+                        'created_at': message.created_at
+                    }
+                    for message in self.db_manager.get_recent_messages(session, chat_db_id, limit)
+                ]
+            finally:
+                session.close()
+
+        messages = await asyncio.get_running_loop().run_in_executor(None, load)
+        return 200, {'chat_id': chat_db_id, 'messages': messages}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает число запросов и статистику кэша ответов"""
+        return {'requests': self.requests, 'cache': self.cache.get_stats()}
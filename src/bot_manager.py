@@ -2,73 +2,257 @@
 Менеджер для управления различными типами ботов
 """
 import asyncio
-from typing import Dict, Type
+import signal
+from typing import Dict, List, Optional, Type
 from .bots import BaseBot, SmartResponder, SimpleResponder, GroupResponder
+from .bots.client_pool import ClientPool, client_pool
+from .api.stats_server import StatsServer
+from .config.settings import config
 from .config.logging_config import get_logger
+from .utils.lazy import LazyProxy
 
 logger = get_logger("bot_manager")
 
 
 class BotManager:
-    """Менеджер для управления бота"""
-    
-    def __init__(self):
+    """
+    Менеджер ботов
+
+    Запускает несколько ботов в одном цикле событий. Боты используют общий
+    пул клиентов (одна сессия reader и одна сессия бота на процесс) и общий
+    движок базы данных; ошибка запуска или остановки одного бота не влияет
+    на остальные.
+    """
+
+    def __init__(self, session_name: Optional[str] = None, pool: Optional[ClientPool] = None,
+                 chats: Optional[List[str]] = None, stats_port: Optional[int] = None):
+        """
+        Args:
+            session_name: Общий префикс сессий для ботов (по умолчанию BOT_SESSION_NAME)
+            pool: Пул клиентов (по умолчанию общий пул процесса)
+            chats: Чаты для всех ботов (по умолчанию у каждого бота свои из настроек)
+            stats_port: Порт HTTP-статистики (по умолчанию STATS_API_PORT, 0 - выключена)
+        """
         self.bots: Dict[str, Type[BaseBot]] = {
             'smart': SmartResponder,
             'simple': SimpleResponder,
             'group': GroupResponder
         }
+        self.session_name = session_name or config.BOT_SESSION_NAME
+        self.client_pool = pool if pool is not None else client_pool
+        self.chats = chats
+        self.stats_port = config.STATS_API_PORT if stats_port is None else stats_port
+        self.stats_server: Optional[StatsServer] = None
+        self.running: Dict[str, BaseBot] = {}
         self.current_bot: BaseBot = None
-    
+        self._stop_event = asyncio.Event()
+
     def list_available_bots(self):
         """Выводит список доступных ботов"""
         logger.info("Доступные типы ботов:")
         for i, (key, bot_class) in enumerate(self.bots.items(), 1):
             logger.info(f"{i}. {bot_class.__name__} ({key})")
-    
-    def get_bot_by_choice(self, choice: str) -> BaseBot:
+
+    def resolve_bot_type(self, choice: str) -> str:
         """
-        Возвращает бота по выбору пользователя
-        
+        Возвращает ключ типа бота по выбору пользователя
+
         Args:
             choice: Выбор пользователя ('smart', 'simple' или номер)
-            
+
         Returns:
-            BaseBot: Экземпляр выбранного бота
+            str: Ключ из self.bots (по умолчанию 'simple')
         """
         if choice in self.bots:
-            return self.bots[choice]()
-        
+            return choice
+
         # Попытка парсинга номера
         try:
             choice_num = int(choice)
             bot_keys = list(self.bots.keys())
             if 1 <= choice_num <= len(bot_keys):
-                bot_key = bot_keys[choice_num - 1]
-                return self.bots[bot_key]()
+                return bot_keys[choice_num - 1]
         except ValueError:
             pass
-        
+
         # По умолчанию возвращаем простой бот
         logger.warning("Неверный выбор, запускаем простой автоответчик")
-        return self.bots['simple']()
-    
+        return 'simple'
+
+    def get_bot_by_choice(self, choice: str) -> BaseBot:
+        """
+        Возвращает бота по выбору пользователя
+
+        Args:
+            choice: Выбор пользователя ('smart', 'simple' или номер)
+
+        Returns:
+            BaseBot: Экземпляр выбранного бота
+        """
+        return self.bots[self.resolve_bot_type(choice)]()
+
     async def run_bot(self, bot_type: str = 'simple'):
         """
         Запускает бота указанного типа
-        
+
         Args:
             bot_type: Тип бота ('smart', 'simple' или 'group')
         """
         self.current_bot = self.get_bot_by_choice(bot_type)
         await self.current_bot.start_monitoring()
-    
+
+    def create_bot(self, key: str) -> BaseBot:
+        """
+        Создает бота с общей сессией и пулом клиентов менеджера
+
+        Args:
+            key: Ключ типа бота из self.bots
+        """
+        options = {'session_name': self.session_name, 'client_pool': self.client_pool}
+        if self.chats:
+            # GroupResponder принимает список чатов под именем groups
+            options['groups' if key == 'group' else 'chats'] = self.chats
+        return self.bots[key](**options)
+
+    async def start_bot(self, bot_type: str) -> Optional[BaseBot]:
+        """
+        Запускает бота в общем цикле событий, не блокируя вызывающего
+
+        Args:
+            bot_type: Тип бота ('smart', 'simple', 'group' или номер)
+
+        Returns:
+            BaseBot or None: Запущенный бот или None при ошибке запуска
+        """
+        key = self.resolve_bot_type(bot_type)
+        if key in self.running:
+            logger.warning(f"Бот {key} уже запущен")
+            return self.running[key]
+
+        bot = None
+        try:
+            bot = self.create_bot(key)
+            if not await bot.start():
+                raise RuntimeError("бот не смог подключиться ни к одному чату")
+            bot.register_handlers()
+        except Exception as e:
+            logger.error(f"Не удалось запустить бота {key}: {e}")
+            if bot:
+                await self._stop_safely(key, bot)
+            return None
+
+        self.running[key] = bot
+        self.current_bot = self.current_bot or bot
+        logger.info(f"{bot.name} запущен для чатов: {', '.join(bot.chat_refs.values())}")
+        return bot
+
+    async def run_bots(self, bot_types: Optional[List[str]] = None):
+        """
+        Запускает несколько ботов одновременно и работает до остановки
+
+        Args:
+            bot_types: Типы ботов (по умолчанию BOT_TYPES)
+        """
+        bot_types = bot_types or config.BOT_TYPES or ['simple']
+        self._stop_event.clear()
+
+        # Боты стартуют параллельно; общие клиенты подключаются один раз
+        await asyncio.gather(*(self.start_bot(bot_type) for bot_type in bot_types))
+        if not self.running:
+            logger.error("Ни один бот не запущен. Завершение работы.")
+            return
+
+        logger.info(f"Запущено ботов: {len(self.running)} ({', '.join(self.running)})")
+        logger.info("Нажмите Ctrl+C для остановки")
+        await self.start_stats_server()
+
+        # SIGTERM (остановка контейнера, выкладка) - плавная остановка всех ботов
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self._stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+        try:
+            await self.wait_until_stopped()
+        finally:
+            for bot in self.running.values():
+                bot.print_stats()
+            await self.stop_stats_server()
+            await self.stop_all()
+
+    async def start_stats_server(self):
+        """Запускает HTTP-статистику, если задан порт; ошибка запуска не мешает ботам"""
+        if not self.stats_port:
+            return
+        server = StatsServer(self, host=config.STATS_API_HOST, port=self.stats_port,
+                             cache_ttl=config.STATS_API_CACHE_TTL)
+        try:
+            await server.start()
+        except OSError as e:
+            logger.warning(f"Не удалось запустить HTTP-статистику на порту {self.stats_port}: {e}")
+            return
+        self.stats_server = server
+
+    async def stop_stats_server(self):
+        """Останавливает HTTP-статистику"""
+        if self.stats_server:
+            await self.stats_server.stop()
+            self.stats_server = None
+
+    async def wait_until_stopped(self):
+        """Ждет вызова stop_all() или отключения клиента, читающего сообщения"""
+        waiters = {asyncio.ensure_future(self._stop_event.wait())}
+        waiters.update(
+            asyncio.ensure_future(client.disconnected)
+            for client in {bot.reader_client for bot in self.running.values() if bot.reader_client}
+        )
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def stop_bot(self, bot_type: str):
+        """
+        Останавливает одного запущенного бота, не затрагивая остальных
+
+        Args:
+            bot_type: Тип бота ('smart', 'simple' или 'group')
+        """
+        key = self.resolve_bot_type(bot_type)
+        bot = self.running.pop(key, None)
+        if not bot:
+            return
+        await self._stop_safely(key, bot)
+        if self.current_bot is bot:
+            self.current_bot = next(iter(self.running.values()), None)
+        if not self.running:
+            self._stop_event.set()
+
+    async def stop_all(self):
+        """Останавливает всех запущенных ботов"""
+        running = list(self.running.items())
+        self.running.clear()
+        await asyncio.gather(*(self._stop_safely(key, bot) for key, bot in running))
+        self.current_bot = None
+        self._stop_event.set()
+
     async def stop_current_bot(self):
         """Останавливает текущего бота"""
-        if self.current_bot:
+        if self.running:
+            await self.stop_all()
+        elif self.current_bot:
             await self.current_bot.stop()
             self.current_bot = None
 
+    async def _stop_safely(self, key: str, bot: BaseBot):
+        """Плавно останавливает бота, изолируя его ошибки от остальных"""
+        try:
+            await bot.drain()
+        except Exception as e:
+            logger.error(f"Ошибка остановки бота {key}: {e}")
+
 
 # Глобальный экземпляр менеджера
-bot_manager = BotManager()
+bot_manager = LazyProxy(BotManager, 'bot_manager')
@@ -3,5 +3,8 @@ from .base_bot import BaseBot
 from .smart_responder import SmartResponder
 from .simple_responder import SimpleResponder
 from .group_responder import GroupResponder
+from .rule_engine import RuleEngine, ResponseRule, RuleMatch
+from .client_pool import ClientPool
 
-__all__ = ['BaseBot', 'SmartResponder', 'SimpleResponder', 'GroupResponder']
+__all__ = ['BaseBot', 'SmartResponder', 'SimpleResponder', 'GroupResponder',
+           'RuleEngine', 'ResponseRule', 'RuleMatch', 'ClientPool']
@@ -0,0 +1,98 @@
+"""
+Сохраняемый между запусками кэш проверенных чатов
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from telethon.errors import ChannelPrivateError, ChatWriteForbiddenError, UserNotParticipantError
+from ..config.settings import config
+from ..config.logging_config import get_logger
+from ..utils.lazy import LazyProxy
+
+logger = get_logger("access_cache")
+
+# Ошибки отправки, после которых сохраненная проверка прав больше не верна
+ACCESS_ERRORS = (ChatWriteForbiddenError, UserNotParticipantError, ChannelPrivateError)
+
+
+class ChatAccessCache:
+    """
+    Результаты проверки прав и данные чатов, сохраненные в JSON-файл.
+
+    При повторном запуске в пределах `ttl` чат подключается без проверки
+    прав и без запроса сущности. Запоминаются только успешные проверки:
+    отказ перепроверяется при каждом запуске, чтобы выданные права
+    подхватывались сразу.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400.0):
+        """
+        Args:
+            path: Путь к файлу кэша (по умолчанию sessions/chat_access.json)
+            ttl: Время жизни записи в секундах (0 - кэш отключен)
+        """
+        self.path = path or os.path.join(os.getcwd(), 'sessions', 'chat_access.json')
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Читает файл при первом обращении"""
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        self._entries = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Не удалось прочитать кэш чатов {self.path}: {e}")
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает сохраненные данные чата, если они не устарели
+
+        Args:
+            key: Ключ записи (сессия, режим и имя чата)
+        """
+        if self.ttl <= 0:
+            return None
+        entry = self._load().get(key)
+        if entry and entry.get('checked_at', 0) + self.ttl > time.time():
+            self.stats['hits'] += 1
+            return entry
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, info: Dict[str, Any]):
+        """Запоминает успешную проверку чата и сохраняет файл"""
+        if self.ttl <= 0:
+            return
+        self._load()[key] = dict(info, checked_at=time.time())
+        self.save()
+
+    def invalidate(self, key: str):
+        """Удаляет запись (например, если отправка в чат перестала работать)"""
+        if self._load().pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        """Атомарно записывает кэш, отбрасывая устаревшие записи"""
+        now = time.time()
+        entries = {
+            key: entry for key, entry in self._load().items()
+            if entry.get('checked_at', 0) + self.ttl > now
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить кэш чатов {self.path}: {e}")
+
+
+# Глобальный кэш, общий для всех ботов процесса
+chat_access_cache = LazyProxy(lambda: ChatAccessCache(ttl=config.CHAT_ACCESS_CACHE_TTL), 'chat_access_cache')
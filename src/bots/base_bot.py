@@ -3,138 +3,795 @@
 """
 import asyncio
 import os
-from typing import Dict, Any, Optional
-from telethon import TelegramClient, events
+import signal
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from telethon import events
+from telethon.utils import get_peer_id
 from ..config.settings import config
 from ..config.logging_config import get_logger
+from ..utils.log_pipeline import get_throttled_logger
 from ..utils.permissions import check_bot_permissions, format_error_message
 from ..database.database import db_manager
+from ..database.write_behind import WriteBehindQueue, MessageRef
+from ..database.stats_rollup import StatsRollup
+from ..database.session_tracker import SessionTracker
+from ..utils.serialization import capture_message, DEFAULT_MESSAGE_FIELDS
+from ..utils.metrics import LatencyStats
+from ..utils.seen_ring import SeenRing
+from ..utils.cooldown import ReplyCooldowns
+from ..utils.context_buffer import ContextBuffers, ContextEntry
+from ..utils.cache import LRUCache
+from ..utils.spool import Spool
+from .rule_engine import RuleEngine, RuleMatch, ResponseRule, keyword_normalizer
+from .rule_store import RuleStore
+from .templates import ResponseTemplate
+from .chat_workers import ChatWorkerPool
+from .send_scheduler import send_scheduler, SendResult
+from .entity_cache import entity_cache
+from .access_cache import ACCESS_ERRORS, chat_access_cache
+from .client_pool import ClientPool, client_pool as default_client_pool
 
 logger = get_logger("base_bot")
+# Записи на каждое сообщение - с выборкой и ограничением частоты (LOG_MESSAGE_*)
+message_logger = get_throttled_logger(logger)
 
 
 class BaseBot:
     """Базовый класс для всех ботов"""
     
-    def __init__(self, name: str):
+    # Тип ответа, под которым ответы сохраняются в bot_responses
+    response_type = 'auto'
+    
+    # Подпись ответов, отправляемых от имени пользователя (USE_USER_ACCOUNT)
+    signature = ''
+    
+    def __init__(self, name: str, chats: Optional[List[str]] = None,
+                 chat_rules: Optional[Dict[str, RuleEngine]] = None,
+                 session_name: Optional[str] = None,
+                 client_pool: Optional[ClientPool] = None):
         """
         Инициализация базового бота
         
         Args:
             name: Имя бота для идентификации
+            chats: Список чатов (@username или -100...), которые обслуживает бот.
+                По умолчанию RESPONDER_CHATS или CHANNEL_USERNAME
+            chat_rules: Отдельные наборы правил для чатов по их имени из `chats`
+            session_name: Префикс файлов сессий (по умолчанию имя бота). Боты
+                с одинаковым префиксом используют общие клиенты из пула
+            client_pool: Пул клиентов (по умолчанию общий пул процесса)
         """
         self.name = name
+        self.session_name = session_name or name
+        # Имя экземпляра в bot_sessions: боты одного типа в разных сессиях различаются
+        self.instance_name = name if self.session_name == name else f"{name}:{self.session_name}"
+        self.client_pool = client_pool if client_pool is not None else default_client_pool
+        self.chats = list(chats or config.RESPONDER_CHATS or [config.CHANNEL_USERNAME])
+        self.chat_rules = dict(chat_rules or {})
+        self.rule_engine: Optional[RuleEngine] = None
+        self.rule_store: Optional[RuleStore] = None  # Правила из таблицы response_rules
         self.reader_client = None
         self.bot_client = None
         self.stats = {
             'total_messages': 0,
             'responses_sent': 0,
+            'responses_suppressed': 0,
             'keywords_found': {}
         }
         self.db_session = None
-        self.chat_db_id = None
+        self.db_writer = None
+        self.stats_rollup = None  # Дневные агрегаты в bot_stats
+        self.session_tracker = None  # Счетчики сессии по чатам в bot_sessions
+        self.start_time = None  # Время запуска бота
+        
+        # Состояние чатов по peer id (как в event.chat_id)
+        self.chat_refs: Dict[int, str] = {}
+        self.chat_db_ids: Dict[int, int] = {}
+        self.chat_titles: Dict[int, str] = {}
+        self.chat_rule_engines: Dict[int, RuleEngine] = {}
+        self._message_handler = None
+        
+        # Успешные проверки чатов, сохраняемые между запусками
+        self.access_cache = chat_access_cache
+        
+        # Собственные id клиентов для фильтрации эха без сетевых вызовов
+        self.own_ids = frozenset()
+        self._identity_task = None
+        
+        # Гистограммы задержек по этапам обработки
+        self.latency = LatencyStats()
+        
+        # Окна тишины: не отвечать слишком часто одному пользователю, на одно слово, в один чат
+        self.cooldowns = ReplyCooldowns(
+            user_window=config.COOLDOWN_USER,
+            keyword_window=config.COOLDOWN_KEYWORD,
+            chat_window=config.COOLDOWN_CHAT
+        )
+        
+        # Уже обработанные (chat_id, message_id) - защита от повторной доставки
+        self.seen = SeenRing(config.DEDUP_CAPACITY)
+        self.seen_path = os.path.join(os.getcwd(), 'sessions', f'{self.name}_seen.bin')
+        self._seen_task = None
+        
+        # Последние сообщения переписки с каждым пользователем (get_context)
+        self.context = ContextBuffers(
+            size=config.CONTEXT_SIZE,
+            max_messages=config.CONTEXT_MAX_MESSAGES,
+            max_chars=config.CONTEXT_MAX_CHARS
+        )
+        
+        # Скомпилированные шаблоны ответов по тексту правила
+        self.templates = LRUCache(1000)
+        
+        # Запасной источник ответов для сообщений без правила (LLMFallback)
+        self.fallback = None
+        self._fallback_tasks = set()
+        
+        # Планировщик отправки (общий для процесса, заменяется в нагрузочных тестах)
+        self.send_scheduler = send_scheduler
+        
+        # Неотправленные ответы и незаписанные строки, отложенные до следующего запуска
+        spool_name = self.instance_name.replace(':', '_')
+        self.spool = Spool(os.path.join(os.getcwd(), 'sessions', f'{spool_name}_spool.jsonl'))
+        self._deferring = False  # Плавная остановка: новые ответы сразу откладываются
+        self._spool_tasks = set()
+        
+        # Обработчики по чатам: порядок внутри чата, чаты параллельно
+        self.worker_pool: Optional[ChatWorkerPool] = None
+        if config.HANDLER_WORKERS > 0:
+            self.worker_pool = ChatWorkerPool(
+                self._handle_queued,
+                workers=config.HANDLER_WORKERS,
+                max_queue=config.HANDLER_QUEUE_SIZE,
+                overflow=config.HANDLER_OVERFLOW
+            )
     
     async def start(self):
         """Запуск бота"""
-        # Создаем клиенты с правильными путями к сессиям
-        session_dir = os.path.join(os.getcwd(), 'sessions')
-        os.makedirs(session_dir, exist_ok=True)
+        # Получаем клиенты из пула (общие для ботов с одной сессией) одновременно
+        reader, bot = await asyncio.gather(
+            self.client_pool.acquire(f'{self.session_name}_reader', phone=config.PHONE_NUMBER),
+            self.client_pool.acquire(f'{self.session_name}_bot', bot_token=config.BOT_TOKEN),
+            return_exceptions=True
+        )
+        # Успешно полученный клиент сохраняем, чтобы stop() вернул его в пул
+        self.reader_client = None if isinstance(reader, BaseException) else reader
+        self.bot_client = None if isinstance(bot, BaseException) else bot
+        for error in (reader, bot):
+            if isinstance(error, BaseException):
+                logger.error(f"Ошибка авторизации: {error}")
+                return False
         
-        reader_session = os.path.join(session_dir, f'{self.name}_reader')
-        bot_session = os.path.join(session_dir, f'{self.name}_bot')
+        try:
+            await self._refresh_identity()
+        except Exception as e:
+            logger.error(f"Не удалось получить информацию о клиентах: {e}")
+            return False
+        self._identity_task = asyncio.create_task(self._identity_refresh_loop())
         
-        self.reader_client = TelegramClient(reader_session, config.API_ID, config.API_HASH)
-        self.bot_client = TelegramClient(bot_session, config.API_ID, config.API_HASH)
+        try:
+            loaded = self.seen.load(self.seen_path)
+            if loaded:
+                logger.info(f"Загружено {loaded} обработанных сообщений для защиты от дубликатов")
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить список обработанных сообщений: {e}")
+        if config.DEDUP_SAVE_INTERVAL > 0:
+            self._seen_task = asyncio.create_task(self._seen_save_loop())
+        
+        logger.info(f"Запуск {self.name} для {len(self.chats)} чатов")
+        logger.info(f"Читаем через: {config.PHONE_NUMBER}")
         
-        # Запускаем клиенты
+        # Инициализируем базу данных
         try:
-            # Проверяем, есть ли уже сессия для reader
-            if os.path.exists(f"{reader_session}.session"):
-                logger.info("Используем существующую сессию для reader")
-                await self.reader_client.start()
-            else:
-                logger.info("Создаем новую сессию для reader")
-                await self.reader_client.start(config.PHONE_NUMBER)
-            
-            # Бот всегда использует токен
-            await self.bot_client.start(bot_token=config.BOT_TOKEN)
+            self.db_session = db_manager.get_session()
         except Exception as e:
-            logger.error(f"Ошибка авторизации: {e}")
+            logger.error(f"Ошибка инициализации базы данных: {e}")
+            # Продолжаем работу без базы данных
+            self.db_session = None
+        
+        # Чаты проверяются параллельно; проверенные ранее берутся из кэша
+        await asyncio.gather(*(self._setup_chat(chat) for chat in self.chats))
+        
+        if not self.chat_refs:
+            logger.error("Ни один чат не доступен. Завершение работы.")
             return False
         
-        logger.info(f"Запуск {self.name}")
-        logger.info(f"Читаем через: {config.PHONE_NUMBER}")
+        if self.db_session and self.chat_db_ids:
+            self.db_writer = WriteBehindQueue(
+                db_manager,
+                batch_size=config.DB_BATCH_SIZE,
+                flush_interval=config.DB_FLUSH_INTERVAL,
+                spool=self.spool
+            )
+            self.db_writer.start()
+            self.stats_rollup = StatsRollup(
+                db_manager,
+                interval=config.STATS_ROLLUP_INTERVAL,
+                before_flush=self.db_writer.flush
+            )
+            self.stats_rollup.start()
+            await self._open_session_tracker()
+            logger.info("База данных инициализирована")
+            
+            self.rule_store = RuleStore(db_manager, self.response_type, interval=config.RULES_RELOAD_INTERVAL)
+            await self.rule_store.start()
+        
+        self._replay_spool()
+        return True
+    
+    def _replay_spool(self):
+        """Возвращает в работу ответы и строки, отложенные при прошлой остановке"""
+        try:
+            records = self.spool.take()
+        except Exception as e:
+            logger.error(f"Не удалось прочитать отложенные данные {self.spool.path}: {e}")
+            return
+        if not records:
+            return
         
+        rows = [record for record in records if record.get('kind') in ('message', 'response')]
+        if rows and self.db_writer:
+            logger.info(f"Повторная запись отложенных строк: {self.db_writer.replay(rows)} из {len(rows)}")
+        elif rows:
+            # Без базы данных строки остаются в файле до следующего запуска
+            self.spool.append(rows)
+        
+        peers = {name: peer_id for peer_id, name in self.chat_refs.items()}
+        replies = [record for record in records if record.get('kind') == 'reply']
+        expired = 0
+        for record in replies:
+            peer_id = peers.get(record['chat'])
+            if peer_id is None or time.time() - record['created_at'] > config.SPOOL_MAX_AGE:
+                expired += 1
+                continue
+            task = asyncio.create_task(self.send_response(record['text'], peer_id))
+            self._spool_tasks.add(task)
+            task.add_done_callback(self._spool_tasks.discard)
+        if replies:
+            logger.info(f"Отправка отложенных ответов: {len(replies) - expired}, устарело: {expired}")
+    
+    def _defer_replies(self, replies: List[tuple]):
+        """Откладывает пары (чат, текст) в файл до следующего запуска"""
+        now = time.time()
+        try:
+            self.spool.append({'kind': 'reply', 'chat': chat, 'text': text, 'created_at': now}
+                              for chat, text in replies)
+        except Exception as e:
+            logger.error(f"Не удалось отложить {len(replies)} ответов: {e}")
+    
+    async def _open_session_tracker(self):
+        """Открывает строки bot_sessions для подключенных чатов"""
+        tracker = SessionTracker(db_manager, self.instance_name, interval=config.SESSION_STATS_INTERVAL)
+        try:
+            await tracker.open(self.chat_db_ids.values())
+        except Exception as e:
+            logger.warning(f"Не удалось открыть сессию в bot_sessions: {e}")
+            return
+        tracker.start()
+        self.session_tracker = tracker
+    
+    async def _refresh_identity(self):
+        """Обновляет собственные id клиентов из кэша сущностей"""
+        own_ids = {(await entity_cache.get_me(self.bot_client)).id}
         if config.USE_USER_ACCOUNT:
-            logger.info("Отвечаем от имени пользователя")
-            # Проверяем права пользователя в чате
-            logger.info("Проверка прав пользователя...")
-            if not await check_bot_permissions(self.reader_client, config.CHANNEL_USERNAME):
-                logger.error("Пользователь не может работать в этом чате. Завершение работы.")
+            # Ответы уходят от имени пользователя - его сообщения тоже эхо
+            own_ids.add((await entity_cache.get_me(self.reader_client)).id)
+        self.own_ids = frozenset(own_ids)
+    
+    async def _identity_refresh_loop(self):
+        """Периодически обновляет кэш идентичности по истечении TTL"""
+        while True:
+            await asyncio.sleep(entity_cache.ttl)
+            try:
+                await self._refresh_identity()
+                for chat in self.chat_refs.values():
+                    await entity_cache.get_entity(self.reader_client, chat)
+            except Exception as e:
+                logger.warning(f"Ошибка обновления кэша сущностей: {e}")
+    
+    def _save_seen(self):
+        """Сохраняет список обработанных сообщений на диск"""
+        try:
+            self.seen.save(self.seen_path)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить список обработанных сообщений: {e}")
+    
+    async def _seen_save_loop(self):
+        """Периодически сохраняет список обработанных сообщений"""
+        while True:
+            await asyncio.sleep(config.DEDUP_SAVE_INTERVAL)
+            self._save_seen()
+    
+    def _access_cache_key(self, chat: str) -> str:
+        """Ключ проверки прав в чате: сессия, режим отправки и имя чата"""
+        mode = 'user' if config.USE_USER_ACCOUNT else 'bot'
+        return f"{self.session_name}:{mode}:{chat}"
+    
+    async def _setup_chat(self, chat: str) -> bool:
+        """
+        Проверяет права в чате и регистрирует его в боте и базе данных
+        
+        Args:
+            chat: Имя чата из списка `chats`
+            
+        Returns:
+            bool: True если чат будет обслуживаться
+        """
+        cache_key = self._access_cache_key(chat)
+        info = self.access_cache.get(cache_key)
+        if info is None:
+            info = await self._check_chat(chat)
+            if info is None:
                 return False
+            self.access_cache.put(cache_key, info)
+        else:
+            logger.info(f"Права в {chat} проверены ранее, проверка пропущена")
+        
+        peer_id = info['peer_id']
+        self.chat_refs[peer_id] = chat
+        if info['title']:
+            self.chat_titles[peer_id] = info['title']
+        if chat in self.chat_rules:
+            self.chat_rule_engines[peer_id] = self.chat_rules[chat]
+        
+        if self.db_session:
+            try:
+                # Получаем или создаем чат в базе данных
+                self.chat_db_ids[peer_id] = db_manager.upsert_chat(
+                    self.db_session,
+                    telegram_id=info['telegram_id'],
+                    username=info['username'],
+                    title=info['title'],
+                    chat_type=info['chat_type']
+                )
+            except Exception as e:
+                logger.error(f"Ошибка регистрации чата {chat} в базе данных: {e}")
+        
+        logger.info(f"Чат подключен: {info['title'] or chat}")
+        return True
+    
+    async def _check_chat(self, chat: str) -> Optional[Dict[str, Any]]:
+        """
+        Проверяет права в чате и получает его данные через Telegram
+        
+        Args:
+            chat: Имя чата из списка `chats`
+            
+        Returns:
+            dict or None: Данные чата для кэша или None, если чат недоступен
+        """
+        if config.USE_USER_ACCOUNT:
+            # Проверяем права пользователя в чате
+            logger.info(f"Проверка прав пользователя в {chat}...")
+            if not await check_bot_permissions(self.reader_client, chat):
+                logger.error(f"Пользователь не может работать в чате {chat}, чат пропущен")
+                return None
         else:
-            logger.info(f"Отвечаем через бота: {config.BOT_TOKEN[:10]}...")
             # Проверяем права бота в чате
-            logger.info("Проверка прав бота...")
-            if not await check_bot_permissions(self.bot_client, config.CHANNEL_USERNAME):
-                logger.error("Бот не может работать в этом чате. Завершение работы.")
-                return False
+            logger.info(f"Проверка прав бота в {chat}...")
+            if not await check_bot_permissions(self.bot_client, chat):
+                logger.error(f"Бот не может работать в чате {chat}, чат пропущен")
+                return None
         
-        # Инициализируем базу данных
         try:
-            self.db_session = db_manager.get_session()
-            # Получаем или создаем чат в базе данных
             # Используем reader_client для получения информации о чате
-            chat_entity = await self.reader_client.get_entity(config.CHANNEL_USERNAME)
-            self.chat_db_id = db_manager.get_or_create_chat(
-                self.db_session,
-                telegram_id=chat_entity.id,
-                username=getattr(chat_entity, 'username', None),
-                title=getattr(chat_entity, 'title', None),
-                chat_type=chat_entity.__class__.__name__.lower()
-            ).id
-            logger.info("База данных инициализирована")
+            chat_entity = await entity_cache.get_entity(self.reader_client, chat)
         except Exception as e:
-            logger.error(f"Ошибка инициализации базы данных: {e}")
-            # Продолжаем работу без базы данных
-            self.db_session = None
+            await self._on_chat_unavailable(chat, e)
+            return None
         
-        return True
+        return {
+            'peer_id': get_peer_id(chat_entity),
+            'telegram_id': chat_entity.id,
+            'username': getattr(chat_entity, 'username', None),
+            'title': getattr(chat_entity, 'title', None),
+            'chat_type': chat_entity.__class__.__name__.lower()
+        }
+    
+    async def _on_chat_unavailable(self, chat: str, error: Exception):
+        """
+        Вызывается, если чат не удалось найти
+        
+        Args:
+            chat: Имя чата
+            error: Ошибка получения чата
+        """
+        logger.error(f"Ошибка при поиске чата '{chat}': {error}")
+    
+    def register_handlers(self):
+        """Регистрирует один обработчик новых сообщений на все обслуживаемые чаты"""
+        self.start_time = time.time()
+        
+        self._message_handler = self.dispatch_message
+        self.reader_client.add_event_handler(
+            self._message_handler,
+            events.NewMessage(chats=list(self.chat_refs))
+        )
+    
+    def get_rule_engine(self, chat_id: int) -> RuleEngine:
+        """
+        Возвращает набор правил для чата
+        
+        Правила из базы данных важнее встроенных: правила чата из базы,
+        встроенные правила чата, общие правила из базы, встроенные по умолчанию.
+        """
+        snapshot = self.rule_store.snapshot if self.rule_store else None
+        if snapshot:
+            engine = snapshot.by_chat.get(self.chat_db_ids.get(chat_id))
+            if engine:
+                return engine
+        engine = self.chat_rule_engines.get(chat_id)
+        if engine:
+            return engine
+        if snapshot and snapshot.default:
+            return snapshot.default
+        return self.rule_engine
+    
+    def _find_response(self, chat_id: int, text: str) -> Optional[RuleMatch]:
+        """
+        Находит подходящее правило для текста
+        
+        Args:
+            chat_id: Peer id чата
+            text: Текст сообщения
+            
+        Returns:
+            RuleMatch or None: Найденное правило с ключевым словом-триггером
+        """
+        engine = self.get_rule_engine(chat_id)
+        return engine.match(text) if engine else None
+    
+    @property
+    def reply_signature(self) -> str:
+        """Подпись, добавляемая к ответам"""
+        return self.signature if config.USE_USER_ACCOUNT else ''
+    
+    def get_template(self, response: str) -> ResponseTemplate:
+        """Возвращает шаблон ответа, компилируя его при первом использовании"""
+        template = self.templates.get(response)
+        if template is None:
+            template = ResponseTemplate(response, self.reply_signature)
+            self.templates.put(response, template)
+        return template
+    
+    async def dispatch_message(self, event):
+        """
+        Обработчик Telethon: передает событие в очередь его чата и сразу возвращает управление
+        
+        Args:
+            event: Событие events.NewMessage
+        """
+        received_at = time.time()
+        if self.worker_pool:
+            self.worker_pool.submit(event.chat_id, (received_at, event))
+        else:
+            await self.handle_message(event, received_at)
+    
+    async def _handle_queued(self, item):
+        """Обрабатывает событие из очереди чата"""
+        received_at, event = item
+        self.latency.record('handler_queue', (time.time() - received_at) * 1000)
+        await self.handle_message(event, received_at)
+    
+    async def handle_message(self, event, received_at: Optional[float] = None):
+        """
+        Обрабатывает новое сообщение в любом из обслуживаемых чатов
+        
+        Args:
+            event: Событие events.NewMessage
+            received_at: Время получения события (по умолчанию - сейчас)
+        """
+        started_at = time.time()
+        received_at = received_at or started_at
+        message = event.message
+        chat_id = event.chat_id
+        text = message.text or ""
+        
+        if not text.strip():
+            return
+        
+        # Проверяем, что сообщение не от самого бота (id закэшированы при запуске)
+        if message.sender_id in self.own_ids:
+            message_logger.debug(f"Игнорируем сообщение от самого бота: {text}")
+            return
+        
+        # Проверяем, что сообщение отправлено после запуска бота
+        if self.start_time and message.date.timestamp() < self.start_time:
+            message_logger.debug(f"Игнорируем старое сообщение (до запуска бота): {text}")
+            return
+        
+        # Дополнительная проверка: игнорируем сообщения, которые являются ответами бота
+        engine = self.get_rule_engine(chat_id)
+        if engine and engine.is_response(text):
+            message_logger.debug(f"Игнорируем сообщение-ответ бота: {text}")
+            return
+        
+        # Повторная доставка после переподключения - не пишем в базу и не отвечаем
+        if self.seen.check_and_add(chat_id, message.id):
+            message_logger.debug(f"Игнорируем повторно доставленное сообщение {message.id} в {chat_id}")
+            return
+        
+        self.context.add(chat_id, message.sender_id, text, timestamp=message.date.timestamp())
+        
+        # Подготавливаем данные для базы данных
+        message_data = {
+            'telegram_id': message.id,
+            'user_id': message.sender_id,
+            'username': getattr(message.sender, 'username', None) if message.sender else None,
+            'first_name': getattr(message.sender, 'first_name', None) if message.sender else None,
+            'last_name': getattr(message.sender, 'last_name', None) if message.sender else None,
+            'is_bot': getattr(message.sender, 'bot', False) if message.sender else False,
+            'text': text,
+            'message_type': 'text',
+            'is_bot_response': False,
+            'raw_data': self._safe_serialize_message(message)
+        }
+        
+        # Сохраняем сообщение в базу данных
+        message_ref = self.save_message_to_db(chat_id, message_data)
+        persisted_at = time.time()
+        
+        # Обновляем статистику
+        self.update_stats()
+        
+        # Ищем подходящее правило
+        match = self._find_response(chat_id, text)
+        matched_at = time.time()
+        
+        message_date = message.date.timestamp()
+        self.latency.record('delivery', (received_at - message_date) * 1000)
+        self.latency.record('persist', (persisted_at - started_at) * 1000)
+        self.latency.record('match', (matched_at - persisted_at) * 1000)
+        
+        if not match:
+            if self.fallback and self._wants_fallback(text):
+                # Ответ LLM ждется в отдельной задаче, чтобы не держать очередь чата
+                task = asyncio.create_task(self._reply_with_fallback(
+                    chat_id, message, text, message_ref, received_at
+                ))
+                self._fallback_tasks.add(task)
+                task.add_done_callback(self._fallback_tasks.discard)
+                return
+            message_logger.debug(f"Сообщение #{self.stats['total_messages']}: {text[:50]} (без ответа)")
+            return
+        
+        await self._reply(chat_id, message, text, match, message_ref, received_at, matched_at)
+    
+    def get_context(self, chat_id: int, user_id: Optional[int],
+                    limit: Optional[int] = None) -> List[ContextEntry]:
+        """
+        Возвращает последние сообщения переписки с пользователем в чате
+        
+        Берется из памяти процесса, без запросов к базе данных. Последний
+        элемент - текущее обрабатываемое сообщение пользователя.
+        
+        Args:
+            chat_id: Peer id чата
+            user_id: Id пользователя
+            limit: Сколько последних сообщений вернуть (по умолчанию все)
+        """
+        return self.context.get(chat_id, user_id, limit)
+    
+    def _wants_fallback(self, text: str) -> bool:
+        """Нужно ли спрашивать запасной источник о сообщении без правила"""
+        return not config.LLM_FALLBACK_QUESTIONS_ONLY or '?' in text
+    
+    async def _reply_with_fallback(self, chat_id: int, message, text: str,
+                                   message_ref: Optional[MessageRef], received_at: float):
+        """Запрашивает ответ у запасного источника и отправляет его"""
+        try:
+            # Предыдущие сообщения переписки, без текущего
+            history = self.get_context(chat_id, message.sender_id)[:-1]
+            answer = await self.fallback.answer(text, history)
+            if not answer:
+                message_logger.debug(f"Сообщение #{self.stats['total_messages']}: {text[:50]} (без ответа)")
+                return
+            match = RuleMatch(ResponseRule(('llm',), answer, 0), 'llm', 0)
+            # Ответ LLM отправляется как есть, без подстановок
+            template = ResponseTemplate(answer, self.reply_signature, dynamic=False)
+            await self._reply(chat_id, message, text, match, message_ref, received_at, time.time(), template)
+        except Exception as e:
+            logger.error(f"Ошибка запасного ответа в {chat_id}: {e}")
+    
+    async def _reply(self, chat_id: int, message, text: str, match: RuleMatch,
+                     message_ref: Optional[MessageRef], received_at: float, matched_at: float,
+                     template: Optional[ResponseTemplate] = None):
+        """
+        Отправляет ответ по найденному правилу и ставит его в очередь записи
+        
+        Args:
+            chat_id: Peer id чата
+            message: Исходное сообщение
+            text: Текст исходного сообщения
+            match: Найденное правило
+            message_ref: Ссылка на сохраненное исходное сообщение
+            received_at: Время получения события
+            matched_at: Время выбора ответа
+            template: Шаблон ответа (по умолчанию - скомпилированный текст правила)
+        """
+        # Окна тишины проверяются до отправки, чтобы не тратить лимит отправки
+        blocked_by = self.cooldowns.check(chat_id, message.sender_id, match.keyword)
+        if blocked_by:
+            self.stats['responses_suppressed'] += 1
+            message_logger.debug(f"Ответ на '{match.keyword}' подавлен окном тишины ({blocked_by})")
+            return
+        
+        message_date = message.date.timestamp()
+        response = (template or self.get_template(match.response)).render(self, chat_id, message)
+        # Отправляем ответ
+        result = await self.send_response(response, chat_id)
+        if result.deferred:
+            message_logger.info(f"Ответ на '{match.keyword}' отложен до перезапуска")
+            return
+        success = result.success
+        sent_at = time.time()
+        
+        self.latency.record('queue', result.queue_delay_ms)
+        self.latency.record('send', result.send_ms)
+        self.latency.record('reply_total', (sent_at - received_at) * 1000)
+        
+        if self.session_tracker:
+            self.session_tracker.count(self.chat_db_ids.get(chat_id), responses=int(success), errors=int(not success))
+        
+        if success:
+            self.context.add(chat_id, message.sender_id, response, from_bot=True)
+            # Обновляем статистику ключевых слов
+            self.stats['keywords_found'][match.keyword] = self.stats['keywords_found'].get(match.keyword, 0) + 1
+            chat_db_id = self.chat_db_ids.get(chat_id)
+            if self.stats_rollup and chat_db_id:
+                self.stats_rollup.record_response(chat_db_id, match.keyword, result.send_ms)
+            message_logger.info(f"Сообщение #{self.stats['total_messages']} в {self.chat_refs.get(chat_id, chat_id)}: {text}")
+            message_logger.info(f"   Ответ: {response}")
+            message_logger.info(f"   Статистика: {self.stats['responses_sent']}/{self.stats['total_messages']} ответов")
+            message_logger.info(f"   Время ответа: {result.send_ms}мс (в очереди {result.queue_delay_ms}мс)")
+        
+        # Сохраняем ответ бота в базу данных
+        if message_ref:
+            self.save_bot_response_to_db(
+                original_message=message_ref,
+                response_text=response,
+                response_type=self.response_type,
+                trigger_keyword=match.keyword,
+                response_time_ms=result.send_ms,
+                queue_delay_ms=result.queue_delay_ms,
+                is_successful=success,
+                error_message=None if success else (result.error or "Ошибка отправки сообщения"),
+                timings={
+                    'message_date': message_date,
+                    'received_at': received_at,
+                    'matched_at': matched_at,
+                    'sent_at': sent_at
+                }
+            )
+    
+    async def start_monitoring(self):
+        """Запускает мониторинг сообщений во всех обслуживаемых чатах"""
+        if not await self.start():
+            # Освобождаем уже полученные клиенты и ресурсы
+            await self.stop()
+            return
+        
+        self.register_handlers()
+        
+        logger.info(f"{self.name} запущен для чатов: {', '.join(self.chat_refs.values())}")
+        logger.info("Нажмите Ctrl+C для остановки")
+        if config.USE_USER_ACCOUNT:
+            logger.info("Отвечаем от имени пользователя")
+        else:
+            logger.info(f"Отвечаем через бота: {config.BOT_TOKEN[:10]}...")
+        
+        await self.run_until_disconnected()
+    
+    async def drain(self, timeout: Optional[float] = None):
+        """
+        Плавная остановка (SIGTERM): события больше не принимаются, принятые
+        дообрабатываются, а ответы, не успевшие уйти, и строки, которые не
+        удалось записать, откладываются в файл и обрабатываются при следующем
+        запуске
+        
+        Args:
+            timeout: Сколько ждать дообработки, секунд (по умолчанию DRAIN_TIMEOUT)
+        """
+        timeout = config.DRAIN_TIMEOUT if timeout is None else timeout
+        if self.reader_client and self._message_handler:
+            self.reader_client.remove_event_handler(self._message_handler)
+            self._message_handler = None
+        
+        waiters = set(self._fallback_tasks) | set(self._spool_tasks)
+        joined = asyncio.ensure_future(self.worker_pool.join()) if self.worker_pool else None
+        if joined:
+            waiters.add(joined)
+        if waiters:
+            _, pending = await asyncio.wait(waiters, timeout=timeout)
+            if pending:
+                logger.warning(f"{self.name}: не завершено за {timeout}с задач: {len(pending)}")
+            if joined:
+                joined.cancel()
+        
+        # Ответы, которые еще не начали отправляться, не ждем: откладываем до перезапуска
+        self._deferring = True
+        withdrawn = self.send_scheduler.withdraw(self)
+        if withdrawn:
+            self._defer_replies(withdrawn)
+            logger.info(f"{self.name}: отложено неотправленных ответов: {len(withdrawn)}")
+        await self.stop()
     
     async def stop(self):
         """Остановка бота"""
+        if self._identity_task:
+            self._identity_task.cancel()
+            self._identity_task = None
+        if self.rule_store:
+            await self.rule_store.stop()
+            self.rule_store = None
+        if self.reader_client and self._message_handler:
+            self.reader_client.remove_event_handler(self._message_handler)
+            self._message_handler = None
+        if self.worker_pool:
+            # Дообрабатываем принятые события, пока клиенты еще подключены
+            await self.worker_pool.stop()
+        if self._fallback_tasks:
+            # Запросы к LLM ограничены дедлайном, дожидаемся их ответов
+            await asyncio.wait(set(self._fallback_tasks), timeout=config.LLM_FALLBACK_DEADLINE + 5)
+        if self.fallback:
+            self.fallback.close()
+        if self._seen_task:
+            self._seen_task.cancel()
+            self._seen_task = None
+        if len(self.seen):
+            self._save_seen()
+        # Клиенты отключаются пулом, когда их освободит последний бот
         if self.reader_client:
-            await self.reader_client.disconnect()
+            await self.client_pool.release(self.reader_client)
+            self.reader_client = None
         if self.bot_client:
-            await self.bot_client.disconnect()
+            await self.client_pool.release(self.bot_client)
+            self.bot_client = None
+        if self.stats_rollup:
+            await self.stats_rollup.stop()
+            self.stats_rollup = None
+        if self.session_tracker:
+            await self.session_tracker.stop()
+            self.session_tracker = None
+        if self.db_writer:
+            await self.db_writer.stop()
+            self.db_writer = None
         if self.db_session:
             db_manager.close_session(self.db_session)
+            self.db_session = None
     
-    async def send_response(self, response: str) -> bool:
+    async def send_response(self, response: str, chat_id: Optional[int] = None) -> SendResult:
         """
-        Отправляет ответ в чат
+        Отправляет ответ в чат через общий планировщик отправки
         
         Args:
             response: Текст ответа
+            chat_id: Peer id чата (по умолчанию первый обслуживаемый чат)
             
         Returns:
-            bool: True если сообщение отправлено успешно
+            SendResult: Результат отправки (приводится к bool), с задержкой
+                в очереди и временем отправки
         """
-        try:
-            if config.USE_USER_ACCOUNT:
-                # Отправляем от имени пользователя
-                await self.reader_client.send_message(config.CHANNEL_USERNAME, response)
-                logger.info(f"Ответ отправлен от имени пользователя: {response[:50]}...")
-            else:
-                # Отправляем от имени бота
-                await self.bot_client.send_message(config.CHANNEL_USERNAME, response)
-                logger.info(f"Ответ отправлен от имени бота: {response[:50]}...")
-            
+        chat = self.chat_refs.get(chat_id, self.chats[0]) if chat_id is not None else self.chats[0]
+        if self._deferring:
+            self._defer_replies([(chat, response)])
+            return SendResult(success=False, error="отложено до перезапуска", deferred=True)
+        # Отправляем от имени пользователя или от имени бота
+        client = self.reader_client if config.USE_USER_ACCOUNT else self.bot_client
+        result = await self.send_scheduler.submit(client, chat, response, owner=self)
+        
+        if result.success:
+            sender = "пользователя" if config.USE_USER_ACCOUNT else "бота"
+            logger.info(f"Ответ отправлен от имени {sender} в {chat}: {response[:50]}...")
             self.stats['responses_sent'] += 1
-            return True
-        except Exception as e:
-            logger.error(format_error_message(e, config.CHANNEL_USERNAME))
-            return False
+        else:
+            logger.error(format_error_message(result.exception or Exception(result.error), chat))
+            if isinstance(result.exception, ACCESS_ERRORS):
+                # Права отозваны: при следующем запуске чат проверяется заново
+                self.access_cache.invalidate(self._access_cache_key(chat))
+        return result
     
     def update_stats(self, keyword: str = None):
         """
@@ -147,126 +804,166 @@ class BaseBot:
         if keyword:
             self.stats['keywords_found'][keyword] = self.stats['keywords_found'].get(keyword, 0) + 1
     
-    def save_message_to_db(self, message_data: Dict[str, Any]) -> Optional[int]:
+    def save_message_to_db(self, chat_id: int, message_data: Dict[str, Any]) -> Optional[MessageRef]:
         """
-        Сохраняет сообщение в базу данных
+        Ставит сообщение в очередь отложенной записи в базу данных
         
         Args:
+            chat_id: Peer id чата
             message_data: Данные сообщения
             
         Returns:
-            int or None: ID сообщения в базе данных
+            MessageRef or None: Ссылка на сообщение для привязки ответа бота
         """
-        if not self.db_session or not self.chat_db_id:
+        chat_db_id = self.chat_db_ids.get(chat_id)
+        if not self.db_writer or not chat_db_id:
             return None
         
-        try:
-            # Получаем или создаем пользователя
-            user_id = None
-            if message_data.get('user_id'):
-                user = db_manager.get_or_create_user(
-                    self.db_session,
-                    telegram_id=message_data['user_id'],
-                    username=message_data.get('username'),
-                    first_name=message_data.get('first_name'),
-                    last_name=message_data.get('last_name'),
-                    is_bot=message_data.get('is_bot', False)
-                )
-                user_id = user.id
-            
-            # Сохраняем сообщение
-            message = db_manager.save_message(
-                self.db_session,
-                telegram_id=message_data['telegram_id'],
-                chat_id=self.chat_db_id,
-                user_id=user_id,
-                text=message_data.get('text'),
-                message_type=message_data.get('message_type', 'text'),
-                is_bot_response=message_data.get('is_bot_response', False),
-                raw_data=message_data.get('raw_data')
-            )
-            return message.id
-        except Exception as e:
-            logger.error(f"Ошибка сохранения сообщения в БД: {e}")
-            return None
+        message_ref = self.db_writer.enqueue_message(dict(message_data, chat_id=chat_db_id))
+        if message_ref and self.stats_rollup:
+            self.stats_rollup.mark(chat_db_id)
+        if message_ref and self.session_tracker:
+            self.session_tracker.count(chat_db_id, messages=1)
+        return message_ref
     
-    def save_bot_response_to_db(self, original_message_id: int, response_text: str,
+    def save_bot_response_to_db(self, original_message: MessageRef, response_text: str,
                                response_type: str = 'auto', trigger_keyword: str = None,
-                               response_time_ms: int = None, is_successful: bool = True,
-                               error_message: str = None) -> Optional[int]:
+                               response_time_ms: int = None, queue_delay_ms: int = None,
+                               is_successful: bool = True, error_message: str = None,
+                               timings: Optional[Dict[str, float]] = None) -> bool:
         """
-        Сохраняет ответ бота в базу данных
+        Ставит ответ бота в очередь отложенной записи в базу данных
         
         Args:
-            original_message_id: ID исходного сообщения
+            original_message: Ссылка на исходное сообщение
             response_text: Текст ответа
             response_type: Тип ответа
             trigger_keyword: Ключевое слово-триггер
-            response_time_ms: Время ответа в миллисекундах
+            response_time_ms: Время отправки в миллисекундах
+            queue_delay_ms: Ожидание в очереди отправки в миллисекундах
             is_successful: Успешность ответа
             error_message: Сообщение об ошибке
+            timings: Отметки этапов (unix time): message_date, received_at,
+                matched_at, sent_at. Время записи исходного сообщения
+                (persisted_at) проставляет очередь записи
             
         Returns:
-            int or None: ID ответа в базе данных
+            bool: True если ответ поставлен в очередь
         """
-        if not self.db_session:
-            return None
+        if not self.db_writer or not original_message:
+            return False
         
-        try:
-            response = db_manager.save_bot_response(
-                self.db_session,
-                original_message_id=original_message_id,
-                response_text=response_text,
-                response_type=response_type,
-                trigger_keyword=trigger_keyword,
-                response_time_ms=response_time_ms,
-                is_successful=is_successful,
-                error_message=error_message
-            )
-            return response.id
-        except Exception as e:
-            logger.error(f"Ошибка сохранения ответа бота в БД: {e}")
-            return None
+        stage_columns = {
+            column: datetime.utcfromtimestamp(value)
+            for column, value in (timings or {}).items() if value is not None
+        }
+        return self.db_writer.enqueue_response(original_message, {
+            **stage_columns,
+            'response_text': response_text,
+            'response_type': response_type,
+            'trigger_keyword': trigger_keyword,
+            'response_time_ms': response_time_ms,
+            'queue_delay_ms': queue_delay_ms,
+            'is_successful': is_successful,
+            'error_message': error_message
+        })
     
     def _safe_serialize_message(self, message):
-        """Безопасная сериализация сообщения для JSON"""
+        """Готовит raw_data сообщения в режиме RAW_DATA_MODE"""
         try:
-            if hasattr(message, 'to_dict'):
-                data = message.to_dict()
-                # Конвертируем datetime объекты в строки
-                return self._convert_datetime_to_string(data)
-            return None
+            return capture_message(
+                message,
+                mode=config.RAW_DATA_MODE,
+                fields=config.RAW_DATA_FIELDS or DEFAULT_MESSAGE_FIELDS,
+                compress=config.RAW_DATA_COMPRESS
+            )
         except Exception as e:
             logger.warning(f"Ошибка сериализации сообщения: {e}")
             return None
-    
-    def _convert_datetime_to_string(self, obj):
-        """Рекурсивно конвертирует datetime объекты в строки"""
-        if isinstance(obj, dict):
-            return {key: self._convert_datetime_to_string(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [self._convert_datetime_to_string(item) for item in obj]
-        elif hasattr(obj, 'isoformat'):  # datetime объекты
-            return obj.isoformat()
-        else:
-            return obj
 
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Возвращает текущее состояние бота для HTTP-статистики
+        
+        Returns:
+            Dict: Счетчики, задержки по этапам, состояние очередей и кэшей
+        """
+        status = {
+            'name': self.instance_name,
+            'response_type': self.response_type,
+            'uptime': round(time.time() - self.start_time) if self.start_time else 0,
+            'chats': {str(peer_id): name for peer_id, name in self.chat_refs.items()},
+            'stats': dict(self.stats, keywords_found=dict(self.stats['keywords_found'])),
+            'latency_ms': self.latency.snapshot(),
+            'cooldowns': self.cooldowns.get_stats(),
+            'send': self.send_scheduler.get_stats(),
+            'dedup': self.seen.get_stats(),
+            'context': self.context.get_stats()
+        }
+        if self.worker_pool:
+            status['workers'] = self.worker_pool.get_stats()
+        if self.db_writer:
+            status['db_writer'] = self.db_writer.get_metrics()
+        if self.stats_rollup:
+            status['stats_rollup'] = self.stats_rollup.get_metrics()
+        if self.session_tracker:
+            status['session'] = self.session_tracker.get_metrics()
+        if self.fallback:
+            status['fallback'] = self.fallback.get_stats()
+        return status
+    
     def print_stats(self):
         """Выводит статистику работы бота"""
         logger.info("Итоговая статистика:")
         logger.info(f"   Всего сообщений: {self.stats['total_messages']}")
         logger.info(f"   Отправлено ответов: {self.stats['responses_sent']}")
+        by_scope = self.cooldowns.format_suppressed()
+        logger.info(f"   Подавлено окнами тишины: {self.stats['responses_suppressed']}"
+                    + (f" ({by_scope})" if by_scope else ""))
         if self.stats['keywords_found']:
             logger.info(f"   Найденные ключевые слова: {self.stats['keywords_found']}")
+        if self.db_writer:
+            logger.info(f"   Запись в БД: {self.db_writer.get_metrics()}")
+        if self.stats_rollup:
+            logger.info(f"   Пересчет статистики: {self.stats_rollup.get_metrics()}")
+        logger.info(f"   Отправка: {self.send_scheduler.get_stats()}")
+        if self.worker_pool:
+            logger.info(f"   Обработчики: {self.worker_pool.get_stats()}")
+        logger.info(f"   Дубликаты: {self.seen.get_stats()}")
+        logger.info(f"   Контекст переписки: {self.context.get_stats()}")
+        if config.KEYWORD_NORMALIZE:
+            logger.info(f"   Кэш основ слов: {keyword_normalizer.get_stats()}")
+        if self.fallback:
+            logger.info(f"   Ответы LLM: {self.fallback.get_stats()}")
+        for stage, summary in self.latency.snapshot().items():
+            logger.info(f"   Задержка {stage}: p50={summary['p50']}мс p95={summary['p95']}мс "
+                        f"p99={summary['p99']}мс (n={summary['count']})")
     
     async def run_until_disconnected(self):
-        """Запускает бота до отключения"""
+        """Запускает бота до отключения или SIGTERM; по SIGTERM останавливается плавно"""
+        loop = asyncio.get_running_loop()
+        terminated = asyncio.Event()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, terminated.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+        waiters = {asyncio.ensure_future(self.reader_client.run_until_disconnected()),
+                   asyncio.ensure_future(terminated.wait())}
         try:
-            await self.reader_client.run_until_disconnected()
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            if terminated.is_set():
+                logger.info(f"Получен SIGTERM, плавная остановка {self.name}")
+                self.print_stats()
         except KeyboardInterrupt:
             logger.info(f"Остановка {self.name}")
             self.print_stats()
         except Exception as e:
             logger.error(f"Ошибка: {e}")
         finally:
-            await self.stop()
+            for waiter in waiters:
+                waiter.cancel()
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
+            await self.drain()
@@ -0,0 +1,134 @@
+"""
+Пул обработчиков сообщений с порядком внутри чата
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional
+from ..config.logging_config import get_logger
+
+logger = get_logger("chat_workers")
+
+# Политики переполнения очереди чата
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+
+
+class ChatWorkerPool:
+    """
+    Ограниченный пул асинхронных обработчиков с очередью на каждый чат.
+
+    Сообщения одного чата обрабатываются строго по очереди, разные чаты -
+    параллельно, но одновременно выполняется не более `workers` обработчиков.
+    Медленная запись или отправка в одном чате не задерживает остальные.
+    Глубина очереди чата ограничена `max_queue`; при переполнении
+    отбрасывается самое старое (drop_oldest) или новое (drop_newest) событие.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], workers: int = 8,
+                 max_queue: int = 100, overflow: str = OVERFLOW_DROP_OLDEST):
+        """
+        Args:
+            handler: Корутина-обработчик одного события
+            workers: Максимум одновременно выполняемых обработчиков
+            max_queue: Максимальная глубина очереди одного чата
+            overflow: Политика переполнения: drop_oldest или drop_newest
+        """
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Неизвестная политика переполнения: {overflow}")
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self._queues: Dict[Hashable, Deque[Any]] = {}
+        self._drains: Dict[Hashable, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(workers)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.stats = {
+            'submitted': 0,
+            'processed': 0,
+            'dropped': 0,
+            'errors': 0,
+            'max_depth': 0
+        }
+
+    def submit(self, key: Hashable, item: Any) -> bool:
+        """
+        Ставит событие в очередь чата, не дожидаясь обработки
+
+        Args:
+            key: Ключ чата (peer id)
+            item: Событие
+
+        Returns:
+            bool: False если событие отброшено из-за переполнения
+        """
+        self.stats['submitted'] += 1
+        queue = self._queues.setdefault(key, deque())
+        if len(queue) >= self.max_queue:
+            self.stats['dropped'] += 1
+            if self.overflow == OVERFLOW_DROP_NEWEST:
+                logger.warning(f"Очередь чата {key} переполнена, новое событие отброшено")
+                return False
+            queue.popleft()
+            logger.warning(f"Очередь чата {key} переполнена, старейшее событие отброшено")
+
+        queue.append(item)
+        if len(queue) > self.stats['max_depth']:
+            self.stats['max_depth'] = len(queue)
+
+        if key not in self._drains:
+            self._idle.clear()
+            self._drains[key] = asyncio.create_task(self._drain(key))
+        return True
+
+    async def _drain(self, key: Hashable):
+        """Обрабатывает очередь одного чата по порядку"""
+        queue = self._queues[key]
+        try:
+            while queue:
+                item = queue.popleft()
+                # Слот берется на каждое событие, чтобы активный чат не занимал его навсегда
+                async with self._semaphore:
+                    try:
+                        await self.handler(item)
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        logger.error(f"Ошибка обработки события в чате {key}: {e}")
+                self.stats['processed'] += 1
+        finally:
+            self._drains.pop(key, None)
+            if not queue:
+                self._queues.pop(key, None)
+            if not self._drains:
+                self._idle.set()
+
+    def pending(self) -> int:
+        """Количество событий, ожидающих обработки"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def join(self):
+        """Ждет, пока все очереди опустеют"""
+        await self._idle.wait()
+
+    async def stop(self, timeout: Optional[float] = 10.0):
+        """
+        Дожидается обработки очередей и отменяет оставшиеся задачи
+
+        Args:
+            timeout: Сколько ждать дообработки, секунд
+        """
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Не обработано событий при остановке: {self.pending()}")
+        for task in list(self._drains.values()):
+            task.cancel()
+        self._queues.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику пула"""
+        stats = dict(self.stats)
+        stats['pending'] = self.pending()
+        stats['active_chats'] = len(self._drains)
+        return stats
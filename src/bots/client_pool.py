@@ -0,0 +1,109 @@
+"""
+Общий пул клиентов Telegram для ботов одного процесса
+"""
+import asyncio
+import os
+from typing import Dict, Optional
+from telethon import TelegramClient
+from ..config.settings import config
+from ..config.logging_config import get_logger
+from .entity_cache import entity_cache
+
+logger = get_logger("client_pool")
+
+
+class ClientPool:
+    """
+    Клиенты Telegram с подсчетом ссылок, по одному на файл сессии.
+
+    Боты, запрошенные с одним именем сессии, получают один и тот же
+    подключенный клиент; клиент отключается при освобождении последней ссылки.
+    """
+
+    def __init__(self, session_dir: Optional[str] = None):
+        """
+        Args:
+            session_dir: Каталог файлов сессий (по умолчанию ./sessions)
+        """
+        self.session_dir = session_dir or os.path.join(os.getcwd(), 'sessions')
+        self._clients: Dict[str, TelegramClient] = {}
+        self._refs: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, session_name: str, phone: Optional[str] = None,
+                      bot_token: Optional[str] = None) -> TelegramClient:
+        """
+        Возвращает подключенный клиент для сессии, создавая его при первом запросе
+
+        Args:
+            session_name: Имя файла сессии в session_dir
+            phone: Номер телефона для входа пользователя без сохраненной сессии
+            bot_token: Токен для входа бота
+
+        Returns:
+            TelegramClient: Авторизованный клиент
+        """
+        lock = self._locks.setdefault(session_name, asyncio.Lock())
+        async with lock:
+            client = self._clients.get(session_name)
+            if client is None:
+                client = await self._connect(session_name, phone, bot_token)
+                self._clients[session_name] = client
+                self._refs[session_name] = 0
+            self._refs[session_name] += 1
+            return client
+
+    async def _connect(self, session_name: str, phone: Optional[str],
+                       bot_token: Optional[str]) -> TelegramClient:
+        """Создает клиент и выполняет вход"""
+        os.makedirs(self.session_dir, exist_ok=True)
+        session_path = os.path.join(self.session_dir, session_name)
+        client = TelegramClient(session_path, config.API_ID, config.API_HASH)
+
+        if bot_token:
+            # Бот всегда использует токен
+            await client.start(bot_token=bot_token)
+        elif os.path.exists(f"{session_path}.session"):
+            logger.info(f"Используем существующую сессию {session_name}")
+            await client.start()
+        else:
+            logger.info(f"Создаем новую сессию {session_name}")
+            await client.start(phone)
+        return client
+
+    async def release(self, client: TelegramClient):
+        """Освобождает ссылку на клиент и отключает его, если ссылок не осталось"""
+        for session_name, pooled in self._clients.items():
+            if pooled is client:
+                break
+        else:
+            return
+
+        self._refs[session_name] -= 1
+        if self._refs[session_name] > 0:
+            return
+
+        del self._clients[session_name]
+        del self._refs[session_name]
+        entity_cache.invalidate(client)
+        await client.disconnect()
+        logger.debug(f"Клиент {session_name} отключен")
+
+    async def close(self):
+        """Отключает все клиенты независимо от числа ссылок"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._refs.clear()
+        for client in clients:
+            entity_cache.invalidate(client)
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.warning(f"Ошибка отключения клиента: {e}")
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+# Глобальный пул клиентов
+client_pool = ClientPool()
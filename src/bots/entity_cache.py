@@ -0,0 +1,83 @@
+"""
+Кэш собственной идентичности клиентов и сущностей Telegram
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+from ..config.settings import config
+from ..config.logging_config import get_logger
+from ..utils.lazy import LazyProxy
+
+logger = get_logger("entity_cache")
+
+
+class EntityCache:
+    """
+    Кэш результатов get_me() и get_entity() с временем жизни.
+
+    Значения разрешаются один раз и переиспользуются всеми обработчиками.
+    Если обновление по истечении TTL не удалось, продолжаем использовать
+    прежнее значение - для фильтрации сообщений устаревший id лучше, чем
+    сетевой вызов на каждое сообщение.
+    """
+
+    def __init__(self, ttl: float = 3600.0):
+        """
+        Args:
+            ttl: Время жизни записи в секундах
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple[int, Any], Tuple[Any, float]] = {}
+        self._locks: Dict[Tuple[int, Any], asyncio.Lock] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'refresh_errors': 0}
+
+    async def _resolve(self, key: Tuple[int, Any], fetch):
+        """Возвращает значение из кэша или загружает его, не более одного запроса на ключ"""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry and entry[1] > now:
+            self.stats['hits'] += 1
+            return entry[0]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self.stats['hits'] += 1
+                return entry[0]
+            self.stats['misses'] += 1
+            try:
+                value = await fetch()
+            except Exception as e:
+                if entry:
+                    self.stats['refresh_errors'] += 1
+                    logger.warning(f"Не удалось обновить {key[1]}, используем кэш: {e}")
+                    return entry[0]
+                raise
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            return value
+
+    async def get_me(self, client):
+        """Кэшированный client.get_me()"""
+        return await self._resolve((id(client), 'me'), client.get_me)
+
+    async def get_entity(self, client, entity):
+        """Кэшированный client.get_entity(entity)"""
+        return await self._resolve((id(client), entity), lambda: client.get_entity(entity))
+
+    def peek(self, client, entity='me') -> Optional[Any]:
+        """Возвращает значение из кэша без сетевых вызовов (даже устаревшее)"""
+        entry = self._entries.get((id(client), entity))
+        return entry[0] if entry else None
+
+    def invalidate(self, client=None):
+        """Сбрасывает кэш целиком или для одного клиента"""
+        if client is None:
+            self._entries.clear()
+        else:
+            for key in [key for key in self._entries if key[0] == id(client)]:
+                del self._entries[key]
+
+
+# Глобальный кэш, общий для всех ботов процесса
+entity_cache = LazyProxy(lambda: EntityCache(ttl=config.ENTITY_CACHE_TTL), 'entity_cache')
@@ -0,0 +1,218 @@
+"""
+Ответы LLM на сообщения, для которых не нашлось правила
+"""
+import asyncio
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from ..config.logging_config import get_logger
+from ..config.settings import config
+from ..utils.cache import TTLCache
+from ..utils.context_buffer import ContextEntry, format_context
+
+logger = get_logger("llm_fallback")
+
+DEFAULT_SYSTEM_PROMPT = (
+    "Ты автоответчик в Telegram-чате. Отвечай по-русски, кратко и дружелюбно, "
+    "одним-двумя предложениями. Если не знаешь ответа, так и скажи."
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """
+    Приводит вопрос к ключу кэша: нижний регистр, ё -> е,
+    без знаков препинания и лишних пробелов
+    """
+    text = text.lower().replace('ё', 'е')
+    text = _PUNCTUATION.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def create_pipeline(provider: Optional[str] = None, model: Optional[str] = None):
+    """
+    Создает LLMPipeline по настройкам LLM_FALLBACK_*
+
+    Модуль src.llm и его зависимости (openai, httpx) импортируются лениво:
+    без них бот работает как раньше, только без ответов LLM.
+
+    Returns:
+        LLMPipeline or None: Пайплайн или None, если LLM недоступна
+    """
+    provider = (provider or config.LLM_FALLBACK_PROVIDER).lower()
+    try:
+        from ..llm import LLMPipeline, DeepSeekProvider, OpenAIProvider, OpenRouterProvider
+    except ImportError as e:
+        logger.warning(f"Ответы LLM отключены: не установлены зависимости ({e})")
+        return None
+
+    providers = {
+        'deepseek': (DeepSeekProvider, config.DEEPSEEK_API_KEY),
+        'openai': (OpenAIProvider, config.OPENAI_API_KEY),
+        'openrouter': (OpenRouterProvider, config.OPENROUTER_API_KEY),
+    }
+    if provider not in providers:
+        logger.warning(f"Ответы LLM отключены: неизвестный провайдер {provider}")
+        return None
+    provider_class, api_key = providers[provider]
+    if not api_key:
+        logger.warning(f"Ответы LLM отключены: не задан API-ключ для {provider}")
+        return None
+
+    options = {'model': model or config.LLM_FALLBACK_MODEL} if (model or config.LLM_FALLBACK_MODEL) else {}
+    return LLMPipeline(provider_class(api_key, **options))
+
+
+class LLMFallback:
+    """
+    Запасной источник ответов через LLMPipeline.
+
+    Синхронный вызов пайплайна выполняется в отдельном пуле потоков,
+    ограниченном `concurrency`, и ждется не дольше `deadline` секунд.
+    Ответы кэшируются по нормализованному тексту вопроса (LRU + TTL),
+    одинаковые вопросы, пришедшие одновременно, ждут один запрос.
+    Ответ, пришедший после дедлайна, все равно попадает в кэш.
+    С `context` > 0 в промпт добавляются предыдущие сообщения переписки,
+    и ключом кэша становится вопрос вместе с ними.
+    """
+
+    def __init__(self, pipeline, deadline: float = 8.0, cache_size: int = 1000,
+                 cache_ttl: float = 86400.0, concurrency: int = 4,
+                 system_prompt: str = DEFAULT_SYSTEM_PROMPT, context: int = 0):
+        """
+        Args:
+            pipeline: Объект с методом process_request(LLMRequest) -> LLMResult
+            deadline: Максимальное ожидание ответа, секунд
+            cache_size: Максимальное количество кэшированных ответов
+            cache_ttl: Время жизни ответа в кэше, секунд
+            concurrency: Максимум одновременных запросов к LLM
+            system_prompt: Системный промпт
+            context: Сколько предыдущих сообщений переписки передавать LLM
+        """
+        self.pipeline = pipeline
+        self.deadline = deadline
+        self.system_prompt = system_prompt
+        self.context = context
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm_fallback")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'joined': 0,
+            'answered': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'late_cached': 0
+        }
+
+    def _request(self, question: str) -> Optional[str]:
+        """Синхронный запрос к LLM, выполняется в пуле потоков"""
+        from ..llm import LLMRequest
+
+        result = self.pipeline.process_request(LLMRequest(
+            request_id=f"fallback_{uuid.uuid4().hex[:8]}",
+            system_prompt=self.system_prompt,
+            user_prompt=question,
+            # Повторы с паузами не укладываются в короткий дедлайн
+            max_retries=1
+        ))
+        if result.status != 'success' or not result.response:
+            raise RuntimeError(result.error_message or "пустой ответ LLM")
+        return result.response.content.strip() or None
+
+    def _store(self, key: str, future: asyncio.Future):
+        """Кэширует результат запроса и снимает его с учета"""
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        answer = future.result()
+        if answer:
+            self.cache.put(key, answer)
+
+    def _prompt(self, text: str, history: List[ContextEntry]) -> str:
+        """Текст запроса: вопрос и, если есть, предыдущие сообщения переписки"""
+        if not history:
+            return text
+        return f"Предыдущие сообщения:\n{format_context(history)}\n\nСообщение пользователя: {text}"
+
+    async def answer(self, text: str, history: Optional[List[ContextEntry]] = None) -> Optional[str]:
+        """
+        Возвращает ответ LLM на текст сообщения
+
+        Args:
+            text: Текст сообщения
+            history: Предыдущие сообщения переписки, от старых к новым
+                (используются последние `context`)
+
+        Returns:
+            str or None: Ответ или None при ошибке или превышении дедлайна
+        """
+        history = list(history or [])[-self.context:] if self.context > 0 else []
+        key = normalize_question(text)
+        if not key:
+            return None
+        if history:
+            key = normalize_question(format_context(history)) + '\n' + key
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.stats['requests'] += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, self._request, self._prompt(text, history))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._store(key, done))
+        else:
+            self.stats['joined'] += 1
+
+        try:
+            # shield: отмена ожидания по дедлайну не отменяет сам запрос
+            answer = await asyncio.wait_for(asyncio.shield(future), self.deadline)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            future.add_done_callback(self._count_late)
+            logger.debug(f"LLM не ответила за {self.deadline}с: {key[:50]}")
+            return None
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Ошибка запроса к LLM: {e}")
+            return None
+        if answer:
+            self.stats['answered'] += 1
+        return answer
+
+    def _count_late(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            self.stats['late_cached'] += 1
+
+    def close(self):
+        """Освобождает пул потоков, не дожидаясь незавершенных запросов"""
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику запросов и кэша"""
+        return dict(self.stats, inflight=len(self._inflight), cache=self.cache.get_stats())
+
+    @classmethod
+    def from_config(cls) -> Optional['LLMFallback']:
+        """Создает запасной источник по настройкам или None, если он выключен"""
+        if not config.LLM_FALLBACK_ENABLED:
+            return None
+        pipeline = create_pipeline()
+        if pipeline is None:
+            return None
+        return cls(
+            pipeline,
+            deadline=config.LLM_FALLBACK_DEADLINE,
+            cache_size=config.LLM_FALLBACK_CACHE_SIZE,
+            cache_ttl=config.LLM_FALLBACK_CACHE_TTL,
+            concurrency=config.LLM_FALLBACK_CONCURRENCY,
+            context=config.LLM_FALLBACK_CONTEXT
+        )
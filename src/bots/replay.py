@@ -0,0 +1,280 @@
+"""
+Нагрузочный стенд: воспроизведение событий NewMessage через настоящие обработчики ботов
+"""
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import event
+from ..config.logging_config import get_logger
+from ..database.write_behind import WriteBehindQueue
+from .base_bot import BaseBot
+from .send_scheduler import SendScheduler
+
+logger = get_logger("replay")
+
+# Тексты без ключевых слов для "шумовой" части потока
+FILLER_TEXTS = (
+    "Всем добрый вечер",
+    "Кто-нибудь был на вчерашней встрече?",
+    "Скиньте, пожалуйста, ссылку на таблицу",
+    "Согласен, так и сделаем",
+    "Ок, увидимся завтра в 10",
+)
+
+
+class FakeUser:
+    """Отправитель сообщения"""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.username = f"bench_user_{user_id}"
+        self.first_name = f"User {user_id}"
+        self.last_name = None
+        self.bot = False
+
+
+class FakeMessage:
+    """Сообщение с атрибутами, которые читают обработчики"""
+
+    def __init__(self, message_id: int, chat_id: int, text: str, sender: FakeUser,
+                 date: Optional[datetime] = None):
+        self.id = message_id
+        self.chat_id = chat_id
+        self.text = text
+        self.sender = sender
+        self.sender_id = sender.id
+        self.date = date or datetime.now(timezone.utc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            '_': 'Message',
+            'id': self.id,
+            'peer_id': {'_': 'PeerChannel', 'channel_id': self.chat_id},
+            'date': self.date,
+            'message': self.text,
+            'from_id': {'_': 'PeerUser', 'user_id': self.sender_id}
+        }
+
+
+class FakeEvent:
+    """Событие events.NewMessage"""
+
+    def __init__(self, message: FakeMessage):
+        self.message = message
+        self.chat_id = message.chat_id
+
+
+class FakeClient:
+    """
+    Клиент Telethon без сети: отправка занимает `send_latency` секунд
+    и запоминается в списке `sent`
+    """
+
+    def __init__(self, user_id: int = 1, send_latency: float = 0.0):
+        self.me = FakeUser(user_id)
+        self.me.bot = True
+        self.send_latency = send_latency
+        self.sent: List[tuple] = []
+
+    async def get_me(self):
+        return self.me
+
+    async def send_message(self, chat, text: str):
+        if self.send_latency:
+            await asyncio.sleep(self.send_latency)
+        self.sent.append((chat, text))
+
+    def add_event_handler(self, callback, event=None):
+        pass
+
+    def remove_event_handler(self, callback, event=None):
+        pass
+
+    async def disconnect(self):
+        pass
+
+
+def generate_events(chat_ids: List[int], count: int, keywords: List[str],
+                    reply_ratio: float = 0.3, users: int = 100,
+                    seed: Optional[int] = None) -> List[FakeEvent]:
+    """
+    Генерирует поток сообщений с заданной долей ключевых слов
+
+    Args:
+        chat_ids: Peer id чатов, по которым равномерно распределяются сообщения
+        count: Количество сообщений
+        keywords: Ключевые слова, на которые бот должен ответить
+        reply_ratio: Доля сообщений с ключевым словом (0..1)
+        users: Количество разных отправителей
+        seed: Зерно генератора для воспроизводимости
+
+    Returns:
+        List[FakeEvent]: События в порядке поступления
+    """
+    rng = random.Random(seed)
+    senders = [FakeUser(100000 + i) for i in range(max(1, users))]
+    events = []
+    for message_id in range(1, count + 1):
+        if keywords and rng.random() < reply_ratio:
+            text = f"{rng.choice(FILLER_TEXTS)}, {rng.choice(keywords)}"
+        else:
+            text = rng.choice(FILLER_TEXTS)
+        message = FakeMessage(message_id, rng.choice(chat_ids), text, rng.choice(senders))
+        events.append(FakeEvent(message))
+    return events
+
+
+def load_recorded_events(path: str, chat_ids: List[int]) -> List[FakeEvent]:
+    """
+    Загружает записанные сообщения из JSONL
+
+    Каждая строка - объект с полем `text` и необязательными `sender_id`
+    и `chat` (номер чата стенда, по умолчанию по кругу).
+    """
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for index, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            chat_id = chat_ids[int(record.get('chat', index)) % len(chat_ids)]
+            sender = FakeUser(int(record.get('sender_id', 100000 + index % 100)))
+            events.append(FakeEvent(FakeMessage(index + 1, chat_id, record['text'], sender)))
+    return events
+
+
+class ReplayHarness:
+    """
+    Подает события в настоящий обработчик бота (`dispatch_message`).
+
+    Telegram заменяется FakeClient, база - переданным DatabaseManager
+    (например, SQLite), отправка идет через собственный SendScheduler
+    стенда. Подключение к Telegram и проверка прав не выполняются.
+    """
+
+    def __init__(self, bot_factory: Callable[[List[str]], BaseBot], db_manager,
+                 chat_count: int = 1, send_latency: float = 0.0,
+                 global_rate: float = 25.0, chat_rate: float = 1.0,
+                 batch_size: int = 100, flush_interval: float = 0.5):
+        """
+        Args:
+            bot_factory: Создает бота по списку имен чатов
+            db_manager: Менеджер базы данных для записи сообщений
+            chat_count: Количество чатов стенда
+            send_latency: Имитация времени отправки сообщения, секунд
+            global_rate: Лимит отправки на все чаты, сообщений в секунду
+            chat_rate: Лимит отправки на один чат, сообщений в секунду
+            batch_size: Размер пачки отложенной записи
+            flush_interval: Период сброса отложенной записи
+        """
+        self.db_manager = db_manager
+        self.chat_names = [f"@bench_chat_{i}" for i in range(chat_count)]
+        self.chat_ids = [-1000000000000 - i for i in range(1, chat_count + 1)]
+        self.client = FakeClient(send_latency=send_latency)
+        self.bot = bot_factory(self.chat_names)
+        self.bot.send_scheduler = SendScheduler(
+            global_rate=global_rate, global_burst=global_rate,
+            chat_rate=chat_rate, chat_burst=max(1.0, chat_rate)
+        )
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.db_statements = 0
+
+    def keywords(self) -> List[str]:
+        """Ключевые слова встроенных правил бота"""
+        engine = self.bot.rule_engine
+        return [keyword for rule in (engine.rules if engine else []) for keyword in rule.keywords]
+
+    def _count_statement(self, *args):
+        self.db_statements += 1
+
+    def _prepare(self):
+        """Подключает бота к стенду вместо Telegram"""
+        bot = self.bot
+        bot.reader_client = bot.bot_client = self.client
+        bot.own_ids = frozenset({self.client.me.id})
+
+        session = self.db_manager.get_session()
+        try:
+            for index, (peer_id, name) in enumerate(zip(self.chat_ids, self.chat_names)):
+                bot.chat_refs[peer_id] = name
+                if name in bot.chat_rules:
+                    bot.chat_rule_engines[peer_id] = bot.chat_rules[name]
+                bot.chat_db_ids[peer_id] = self.db_manager.upsert_chat(
+                    session, telegram_id=1000000000 + index, username=name.lstrip('@'),
+                    title=f"Bench chat {index}", chat_type='channel'
+                )
+        finally:
+            session.close()
+
+        bot.db_writer = WriteBehindQueue(
+            self.db_manager, batch_size=self.batch_size, flush_interval=self.flush_interval
+        )
+        # Сообщения стенда датированы моментом генерации
+        bot.start_time = time.time() - 3600
+
+    async def run(self, events: List[FakeEvent], rate: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Воспроизводит события и возвращает отчет
+
+        Args:
+            events: События для обработки
+            rate: Темп подачи, сообщений в секунду (None - без ограничения)
+
+        Returns:
+            Dict: Пропускная способность, задержки по этапам, записи в базу и отправка
+        """
+        self._prepare()
+        bot = self.bot
+        bot.db_writer.start()
+        event.listen(self.db_manager.engine, 'before_cursor_execute', self._count_statement)
+
+        started = time.perf_counter()
+        try:
+            # Как и Telethon, обрабатываем каждое событие отдельной задачей
+            tasks = []
+            for index, replayed in enumerate(events):
+                if rate:
+                    delay = started + index / rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                # Дата сообщения - момент подачи, так delivery показывает задержку цикла событий
+                replayed.message.date = datetime.now(timezone.utc)
+                tasks.append(asyncio.create_task(bot.dispatch_message(replayed)))
+            handled_at = time.perf_counter()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            if bot.worker_pool:
+                await bot.worker_pool.join()
+            replied_at = time.perf_counter()
+            await bot.db_writer.stop()
+            finished = time.perf_counter()
+        finally:
+            event.remove(self.db_manager.engine, 'before_cursor_execute', self._count_statement)
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors[:5]:
+            logger.error(f"Ошибка обработчика: {error!r}")
+        workers = bot.worker_pool.get_stats() if bot.worker_pool else {}
+
+        elapsed = replied_at - started
+        return {
+            'bot': bot.name,
+            'messages': len(events),
+            'chats': len(self.chat_ids),
+            'errors': len(errors) + workers.get('errors', 0),
+            'dropped': workers.get('dropped', 0),
+            'duplicates': bot.seen.hits,
+            'suppressed': bot.stats['responses_suppressed'],
+            'replies_sent': len(self.client.sent),
+            'dispatch_s': round(handled_at - started, 3),
+            'elapsed_s': round(elapsed, 3),
+            'messages_per_sec': round(len(events) / elapsed, 1) if elapsed else 0.0,
+            'db_drain_s': round(finished - replied_at, 3),
+            'db_statements': self.db_statements,
+            'db_writer': bot.db_writer.get_metrics(),
+            'send': bot.send_scheduler.get_stats(),
+            'latency_ms': bot.latency.snapshot()
+        }
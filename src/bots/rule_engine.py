@@ -0,0 +1,184 @@
+"""
+Движок правил ответов на основе автомата Ахо-Корасик
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..config.settings import config
+from ..utils.lazy import LazyProxy
+from ..utils.stemmer import KeywordNormalizer
+
+# Общий кэш основ слов для всех движков процесса
+keyword_normalizer = LazyProxy(lambda: KeywordNormalizer(config.KEYWORD_STEM_CACHE_SIZE), "keyword_normalizer")
+
+
+def default_normalizer() -> Optional[KeywordNormalizer]:
+    """Общий нормализатор, если включен KEYWORD_NORMALIZE, иначе None"""
+    return keyword_normalizer if config.KEYWORD_NORMALIZE else None
+
+
+@dataclass(frozen=True)
+class ResponseRule:
+    """Правило ответа: набор ключевых слов и текст ответа"""
+    keywords: Tuple[str, ...]
+    response: str
+    priority: int = 1
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """Результат сопоставления текста с правилами"""
+    rule: ResponseRule
+    keyword: str
+    priority: int
+
+    @property
+    def response(self) -> str:
+        return self.rule.response
+
+
+class RuleEngine:
+    """
+    Скомпилированный набор правил ответов.
+
+    Все ключевые слова всех правил собираются в один автомат Ахо-Корасик,
+    поэтому поиск выполняется за один проход по тексту независимо от
+    количества правил. Побеждает правило с наименьшим приоритетом; при
+    равенстве - правило, объявленное раньше, а внутри правила - ключевое
+    слово, объявленное раньше. Это совпадает с прежним поведением линейного
+    перебора `keyword in text_lower`.
+
+    С нормализатором автомат строится по основам слов ключевых слов, а текст
+    перед поиском приводится к основам: ключевое слово совпадает в любой
+    словоформе и только целыми словами.
+    """
+
+    def __init__(self, rules: Iterable[ResponseRule], normalizer: Optional[KeywordNormalizer] = None):
+        """
+        Компилирует правила в автомат
+
+        Args:
+            rules: Правила ответов в порядке объявления
+            normalizer: Приведение слов к основам (None - поиск подстроки)
+        """
+        self.rules: List[ResponseRule] = list(rules)
+        self.normalizer = normalizer
+        # Для каждого узла автомата: переходы, суффиксная ссылка и лучший
+        # (минимальный) ранг среди ключевых слов, заканчивающихся в узле
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[Tuple[int, int, int]]] = [None]
+        self._matches: Dict[Tuple[int, int, int], RuleMatch] = {}
+        self._min_rank: Optional[Tuple[int, int, int]] = None
+        self._responses = frozenset(rule.response.strip() for rule in self.rules)
+        self._compile()
+
+    @classmethod
+    def from_responses(cls, responses: Dict[str, str],
+                       normalizer: Optional[KeywordNormalizer] = None) -> 'RuleEngine':
+        """
+        Создает движок из словаря "ключевое слово -> ответ"
+
+        Порядок ключей словаря задает приоритет, как и при линейном переборе.
+        """
+        return cls(
+            (ResponseRule(keywords=(keyword,), response=reply)
+             for keyword, reply in responses.items()),
+            normalizer
+        )
+
+    @classmethod
+    def from_rule_dicts(cls, rules: Iterable[Dict],
+                        normalizer: Optional[KeywordNormalizer] = None) -> 'RuleEngine':
+        """
+        Создает движок из списка правил вида
+        {'keywords': [...], 'response': ..., 'priority': ...}
+        """
+        return cls(
+            (ResponseRule(
+                keywords=tuple(rule['keywords']),
+                response=rule['response'],
+                priority=rule.get('priority', 1)
+            ) for rule in rules),
+            normalizer
+        )
+
+    def _compile(self):
+        """Строит бор, суффиксные ссылки и таблицу лучших совпадений"""
+        for rule_index, rule in enumerate(self.rules):
+            for keyword_index, keyword in enumerate(rule.keywords):
+                pattern = self.normalizer.normalize(keyword) if self.normalizer else keyword.lower()
+                if not pattern:
+                    continue
+                rank = (rule.priority, rule_index, keyword_index)
+                node = 0
+                for char in pattern:
+                    next_node = self._goto[node].get(char)
+                    if next_node is None:
+                        next_node = len(self._goto)
+                        self._goto[node][char] = next_node
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._best.append(None)
+                    node = next_node
+                if self._best[node] is None or rank < self._best[node]:
+                    self._best[node] = rank
+                self._matches[rank] = RuleMatch(rule=rule, keyword=keyword, priority=rule.priority)
+                if self._min_rank is None or rank < self._min_rank:
+                    self._min_rank = rank
+
+        # Обход в ширину: суффиксные ссылки и наследование совпадений
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(char, 0)
+                self._fail[child] = fail_target if fail_target != child else 0
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited < self._best[child]):
+                    self._best[child] = inherited
+                queue.append(child)
+
+    def match(self, text: str) -> Optional[RuleMatch]:
+        """
+        Находит лучшее правило для текста за один проход
+
+        Args:
+            text: Текст сообщения
+
+        Returns:
+            RuleMatch or None: Победившее правило с ключевым словом и приоритетом
+        """
+        if not text or self._min_rank is None:
+            return None
+
+        goto = self._goto
+        fail = self._fail
+        best_table = self._best
+        min_rank = self._min_rank
+        best = None
+        node = 0
+
+        text = self.normalizer.normalize(text) if self.normalizer else text.lower()
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            rank = best_table[node]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+                if best == min_rank:
+                    break
+
+        return self._matches[best] if best is not None else None
+
+    def is_response(self, text: str) -> bool:
+        """Проверяет, совпадает ли текст с одним из ответов (эхо собственных ответов)"""
+        return text.strip() in self._responses
+
+    def __len__(self) -> int:
+        return len(self.rules)
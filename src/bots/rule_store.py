@@ -0,0 +1,131 @@
+"""
+Правила ответов из базы данных с фоновой перезагрузкой
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from ..config.logging_config import get_logger
+from .rule_engine import RuleEngine, default_normalizer
+from .templates import ResponseTemplate
+
+logger = get_logger("rule_store")
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """Неизменяемый скомпилированный набор правил одной версии"""
+    version: tuple = ()
+    default: Optional[RuleEngine] = None
+    by_chat: Dict[int, RuleEngine] = field(default_factory=dict)
+
+    @classmethod
+    def compile(cls, version: tuple, rules: List[Dict[str, Any]]) -> 'RuleSnapshot':
+        """Компилирует строки правил в автоматы: общий и по одному на чат"""
+        default_rules, chat_rules = [], {}
+        for rule in rules:
+            try:
+                # Некорректный шаблон отклоняется при загрузке, а не при отправке
+                ResponseTemplate(rule['response'])
+            except ValueError as e:
+                logger.warning(f"Правило {rule.get('keywords')} пропущено: {e}")
+                continue
+            if rule.get('chat_id') is None:
+                default_rules.append(rule)
+            else:
+                chat_rules.setdefault(rule['chat_id'], []).append(rule)
+
+        normalizer = default_normalizer()
+        default = RuleEngine.from_rule_dicts(default_rules, normalizer) if default_rules else None
+        by_chat = {
+            chat_id: RuleEngine.from_rule_dicts(rules + default_rules, normalizer)
+            for chat_id, rules in chat_rules.items()
+        }
+        return cls(version=version, default=default, by_chat=by_chat)
+
+
+class RuleStore:
+    """
+    Версионированный индекс правил из таблицы response_rules.
+
+    Фоновая задача периодически сверяет отпечаток версии (один дешевый
+    запрос), а при изменении загружает и компилирует правила в пуле потоков.
+    Новый снимок подменяет старый одним присваиванием, поэтому обработчик
+    сообщений всегда видит целостный набор и никогда не ждет перезагрузки.
+    """
+
+    def __init__(self, db_manager, bot_type: str, interval: float = 30.0):
+        """
+        Args:
+            db_manager: Менеджер базы данных
+            bot_type: Тип бота (response_type), чьи правила загружаются
+            interval: Период проверки изменений в секундах
+        """
+        self.db_manager = db_manager
+        self.bot_type = bot_type
+        self.interval = interval
+        self.snapshot = RuleSnapshot()
+        self.reloads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _load(self, known_version: tuple) -> Optional[RuleSnapshot]:
+        """Загружает правила, если версия изменилась (выполняется в пуле потоков)"""
+        session = self.db_manager.get_session()
+        try:
+            version = self.db_manager.get_rules_version(session, self.bot_type)
+            if version == known_version:
+                return None
+            rules = self.db_manager.get_response_rules(session, self.bot_type)
+        finally:
+            session.close()
+        return RuleSnapshot.compile(version, rules)
+
+    async def reload(self) -> bool:
+        """
+        Проверяет версию правил и при изменении подменяет снимок
+
+        Returns:
+            bool: True если загружена новая версия
+        """
+        loop = asyncio.get_running_loop()
+        snapshot = await loop.run_in_executor(None, self._load, self.snapshot.version)
+        if snapshot is None:
+            return False
+
+        self.snapshot = snapshot
+        self.reloads += 1
+        logger.info(f"Правила {self.bot_type} обновлены: {self.rule_count()} правил, "
+                    f"версия {snapshot.version}")
+        return True
+
+    def rule_count(self) -> int:
+        """Количество загруженных правил (общие плюс собственные правила чатов)"""
+        snapshot = self.snapshot
+        default = len(snapshot.default) if snapshot.default else 0
+        return default + sum(len(engine) - default for engine in snapshot.by_chat.values())
+
+    async def start(self):
+        """Загружает правила и запускает фоновую перезагрузку"""
+        try:
+            await self.reload()
+        except Exception as e:
+            # Например, таблица еще не создана - работаем на встроенных правилах
+            logger.warning(f"Не удалось загрузить правила из базы данных: {e}")
+            return
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def _poll_loop(self):
+        """Периодически проверяет изменения правил"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                # Остаемся на последней загруженной версии
+                logger.warning(f"Ошибка перезагрузки правил: {e}")
+
+    async def stop(self):
+        """Останавливает фоновую перезагрузку"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,338 @@
+"""
+Планировщик исходящих сообщений с ограничением скорости и обработкой FloodWait
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from telethon.errors import FloodWaitError, ServerError, TimedOutError
+from ..config.settings import config
+from ..config.logging_config import get_logger
+from ..utils.lazy import LazyProxy
+
+logger = get_logger("send_scheduler")
+
+# Максимальная длина сообщения Telegram
+MAX_MESSAGE_LENGTH = 4096
+
+# Ошибки, после которых отправку имеет смысл повторить; прочие ответы Telegram
+# (нет прав, чат не найден, неверный запрос) при повторе не изменятся
+TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError, ServerError, TimedOutError)
+
+
+class TokenBucket:
+    """Ведро токенов: `rate` токенов в секунду, не более `capacity` подряд"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Возвращает, сколько секунд ждать до появления токена"""
+        now = now if now is not None else time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Забирает один токен (после того как delay() вернул 0)"""
+        self.tokens -= 1
+
+
+@dataclass
+class SendResult:
+    """Результат отправки сообщения через планировщик"""
+    success: bool
+    queue_delay_ms: int = 0  # Ожидание в очереди и лимитах скорости до первой попытки
+    send_ms: int = 0  # Длительность успешного (или последнего) вызова send_message
+    attempts: int = 0
+    coalesced: int = 1  # Сколько ответов объединено в одно сообщение
+    error: Optional[str] = None
+    exception: Optional[Exception] = None  # Исключение последней неудачной попытки
+    deferred: bool = False  # Снят с очереди при остановке (см. withdraw)
+
+    def __bool__(self) -> bool:
+        return self.success
+
+
+class _PendingSend:
+    """Ответ, ожидающий отправки"""
+    __slots__ = ('client', 'text', 'future', 'enqueued_at', 'deadline', 'owner', 'started')
+
+    def __init__(self, client, text: str, future: asyncio.Future, deadline: float, owner: Any = None):
+        self.client = client
+        self.text = text
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.deadline = deadline
+        self.owner = owner
+        self.started = False  # Была попытка отправки
+
+
+class SendScheduler:
+    """
+    Общий для всех ботов планировщик исходящих сообщений.
+
+    Для каждого чата ведется своя очередь и свое ведро токенов, поверх них
+    действует глобальное ведро. FloodWaitError приостанавливает отправку
+    через соответствующий клиент на указанное Telegram время, после чего
+    попытка повторяется, пока не истечет срок жизни ответа.
+    """
+
+    def __init__(self, global_rate: float = 25.0, global_burst: float = 30.0,
+                 chat_rate: float = 1.0, chat_burst: float = 3.0,
+                 max_attempts: int = 5, deadline: float = 60.0, coalesce: bool = False):
+        """
+        Инициализация планировщика
+
+        Args:
+            global_rate: Сообщений в секунду на все чаты
+            global_burst: Допустимый всплеск на все чаты
+            chat_rate: Сообщений в секунду на один чат
+            chat_burst: Допустимый всплеск на один чат
+            max_attempts: Максимум попыток отправки одного сообщения
+            deadline: Срок жизни ответа в очереди по умолчанию, секунд
+            coalesce: Объединять несколько ожидающих ответов в один чат
+        """
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.coalesce = coalesce
+        self._global_bucket = TokenBucket(global_rate, global_burst)
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._queues: Dict[Any, Deque[_PendingSend]] = {}
+        self._workers: Dict[Any, asyncio.Task] = {}
+        self._sending: Dict[Any, list] = {}  # Снятые с очереди сообщения, ждущие токена или отправки
+        self._paused_until: Dict[int, float] = {}
+        self.stats = {
+            'submitted': 0,
+            'sent': 0,
+            'failed': 0,
+            'expired': 0,
+            'retries': 0,
+            'flood_waits': 0,
+            'coalesced': 0,
+            'queue_delay_ms_total': 0,
+            'queue_delay_ms_max': 0,
+            'send_ms_total': 0,
+            'send_ms_max': 0
+        }
+
+    async def submit(self, client, chat, text: str, deadline: Optional[float] = None,
+                     owner: Any = None) -> SendResult:
+        """
+        Ставит сообщение в очередь и ждет результата отправки
+
+        Args:
+            client: TelegramClient, через который отправлять
+            chat: Чат назначения
+            text: Текст сообщения
+            deadline: Срок жизни сообщения в секундах (по умолчанию общий)
+            owner: Владелец сообщения для withdraw() (например, бот)
+
+        Returns:
+            SendResult: Результат с раздельными задержкой очереди и временем отправки
+        """
+        loop = asyncio.get_running_loop()
+        item = _PendingSend(client, text, loop.create_future(),
+                            time.monotonic() + (deadline if deadline is not None else self.deadline), owner)
+        self._queues.setdefault(chat, deque()).append(item)
+        self.stats['submitted'] += 1
+
+        if chat not in self._workers:
+            self._workers[chat] = asyncio.create_task(self._drain_chat(chat))
+        return await item.future
+
+    def withdraw(self, owner: Any) -> List[Tuple[Any, str]]:
+        """
+        Снимает с очередей еще не начатые отправки владельца
+
+        Ожидающие submit() получают SendResult с deferred=True. Снимаются и
+        сообщения, которые ждут токена лимита, но не те, отправка которых
+        уже началась.
+
+        Returns:
+            list: Пары (чат, текст) снятых сообщений
+        """
+        withdrawn = []
+        for chat, queue in self._queues.items():
+            kept = deque()
+            for item in queue:
+                if item.owner is owner and owner is not None:
+                    withdrawn.append((chat, item.text))
+                    if not item.future.done():
+                        item.future.set_result(SendResult(success=False, error="отложено до перезапуска",
+                                                          deferred=True))
+                else:
+                    kept.append(item)
+            # Очередь меняется на месте: ее держит задача отправки чата
+            queue.clear()
+            queue.extend(kept)
+        for chat, batch in self._sending.items():
+            for item in batch:
+                if item.owner is owner and owner is not None and not item.started and not item.future.done():
+                    withdrawn.append((chat, item.text))
+                    item.future.set_result(SendResult(success=False, error="отложено до перезапуска",
+                                                      deferred=True))
+        return withdrawn
+
+    def pending(self) -> int:
+        """Количество сообщений, ожидающих отправки"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def _wait_for_token(self, bucket: TokenBucket):
+        """Ждет токен в ведре и забирает его"""
+        while True:
+            delay = bucket.delay()
+            if delay <= 0:
+                bucket.consume()
+                return
+            await asyncio.sleep(delay)
+
+    async def _drain_chat(self, chat):
+        """Отправляет сообщения одного чата по очереди"""
+        queue = self._queues[chat]
+        bucket = self._chat_buckets.get(chat)
+        if bucket is None:
+            bucket = self._chat_buckets[chat] = TokenBucket(self.chat_rate, self.chat_burst)
+        batch = []
+        try:
+            while queue:
+                batch = [queue.popleft()]
+                if self.coalesce:
+                    length = len(batch[0].text)
+                    while (queue and queue[0].client is batch[0].client
+                           and length + 2 + len(queue[0].text) <= MAX_MESSAGE_LENGTH):
+                        length += 2 + len(queue[0].text)
+                        batch.append(queue.popleft())
+                self._sending[chat] = batch
+                await self._send(chat, bucket, batch)
+        except Exception as e:
+            logger.error(f"Ошибка планировщика отправки для {chat}: {e}")
+            while queue:
+                batch.append(queue.popleft())
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_result(SendResult(success=False, error=str(e)))
+        finally:
+            self._sending.pop(chat, None)
+            self._workers.pop(chat, None)
+            if not queue:
+                self._queues.pop(chat, None)
+
+    async def _send(self, chat, bucket: TokenBucket, batch):
+        """Отправляет одно (возможно объединенное) сообщение с повторами"""
+        head = batch[0]
+        client = head.client
+        text = "\n\n".join(item.text for item in batch)
+        deadline = min(item.deadline for item in batch)
+        first_attempt_at = None
+        send_ms = 0
+        attempts = 0
+        error = None
+        exception = None
+        success = False
+
+        while attempts < self.max_attempts:
+            paused = max(0.0, self._paused_until.get(id(client), 0) - time.monotonic())
+            if time.monotonic() + max(paused, bucket.delay()) > deadline:
+                # Ответ не успеет уйти до истечения срока - не ждем зря
+                error = "истек срок отправки"
+                self.stats['expired'] += 1
+                break
+            if paused > 0:
+                await asyncio.sleep(paused)
+            await self._wait_for_token(bucket)
+            await self._wait_for_token(self._global_bucket)
+            if first_attempt_at is None:
+                # Пока ждали токен, часть сообщений могли снять (withdraw)
+                batch = [item for item in batch if not item.future.done()]
+                if not batch:
+                    return
+                text = "\n\n".join(item.text for item in batch)
+                for item in batch:
+                    item.started = True
+
+            now = time.monotonic()
+            if first_attempt_at is None:
+                first_attempt_at = now
+
+            attempts += 1
+            try:
+                await client.send_message(chat, text)
+                send_ms = int((time.monotonic() - now) * 1000)
+                success = True
+                error = None
+                exception = None
+                break
+            except FloodWaitError as e:
+                send_ms = int((time.monotonic() - now) * 1000)
+                error = f"FloodWait {e.seconds}с"
+                exception = e
+                self.stats['flood_waits'] += 1
+                logger.warning(f"FloodWait при отправке в {chat}: ждем {e.seconds}с")
+                self._paused_until[id(client)] = time.monotonic() + e.seconds
+            except Exception as e:
+                send_ms = int((time.monotonic() - now) * 1000)
+                error = str(e)
+                exception = e
+                if not isinstance(e, TRANSIENT_ERRORS):
+                    logger.warning(f"Ошибка отправки в {chat}, повтор не поможет: {e}")
+                    break
+                logger.warning(f"Ошибка отправки в {chat} (попытка {attempts}): {e}")
+                if attempts < self.max_attempts:
+                    await asyncio.sleep(min(2 ** attempts, 30))
+
+        finished = time.monotonic()
+        self.stats['retries'] += max(0, attempts - 1)
+        if success:
+            self.stats['sent'] += 1
+            self.stats['send_ms_total'] += send_ms
+            self.stats['send_ms_max'] = max(self.stats['send_ms_max'], send_ms)
+        else:
+            self.stats['failed'] += 1
+        if len(batch) > 1:
+            self.stats['coalesced'] += len(batch) - 1
+
+        for item in batch:
+            started = first_attempt_at if first_attempt_at is not None else finished
+            queue_delay_ms = int((started - item.enqueued_at) * 1000)
+            self.stats['queue_delay_ms_total'] += queue_delay_ms
+            self.stats['queue_delay_ms_max'] = max(self.stats['queue_delay_ms_max'], queue_delay_ms)
+            if not item.future.done():
+                item.future.set_result(SendResult(
+                    success=success,
+                    queue_delay_ms=queue_delay_ms,
+                    send_ms=send_ms,
+                    attempts=attempts,
+                    coalesced=len(batch),
+                    error=error,
+                    exception=exception
+                ))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику планировщика"""
+        stats = dict(self.stats)
+        stats['pending'] = self.pending()
+        finished = stats['sent'] + stats['failed']
+        stats['queue_delay_ms_avg'] = int(stats['queue_delay_ms_total'] / max(1, finished + stats['coalesced']))
+        stats['send_ms_avg'] = int(stats['send_ms_total'] / max(1, stats['sent']))
+        return stats
+
+
+# Глобальный планировщик, общий для всех ботов процесса
+send_scheduler = LazyProxy(lambda: SendScheduler(
+    global_rate=config.SEND_GLOBAL_RATE,
+    chat_rate=config.SEND_CHAT_RATE,
+    deadline=config.SEND_DEADLINE,
+    coalesce=config.SEND_COALESCE
+), 'send_scheduler')
@@ -0,0 +1,130 @@
+"""
+Шаблоны ответов с подстановкой значений при отправке
+"""
+import string
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Значение подстановки: (бот, peer id чата, исходное сообщение) -> строка или число
+Placeholder = Callable[[Any, int, Any], Any]
+
+
+def _sender_name(bot, chat_id: int, message) -> str:
+    sender = getattr(message, 'sender', None)
+    return (getattr(sender, 'first_name', None) or getattr(sender, 'username', None) or '') if sender else ''
+
+
+def _sender_username(bot, chat_id: int, message) -> str:
+    sender = getattr(message, 'sender', None)
+    username = getattr(sender, 'username', None) if sender else None
+    return f"@{username}" if username else _sender_name(bot, chat_id, message)
+
+
+def _uptime(bot, chat_id: int, message) -> str:
+    if not bot.start_time:
+        return '0:00:00'
+    return str(timedelta(seconds=int(time.time() - bot.start_time)))
+
+
+PLACEHOLDERS: Dict[str, Placeholder] = {
+    'time': lambda bot, chat_id, message: datetime.now().strftime('%H:%M'),
+    'date': lambda bot, chat_id, message: datetime.now().strftime('%d.%m.%Y'),
+    'uptime': _uptime,
+    'name': _sender_name,
+    'username': _sender_username,
+    'chat': lambda bot, chat_id, message: bot.chat_titles.get(chat_id) or bot.chat_refs.get(chat_id, ''),
+    'messages': lambda bot, chat_id, message: bot.stats['total_messages'],
+    'responses': lambda bot, chat_id, message: bot.stats['responses_sent'],
+}
+
+# Пример значения подстановки для проверки формата при компиляции (по умолчанию строка)
+_SAMPLES: Dict[str, Any] = {'messages': 0, 'responses': 0}
+
+_formatter = string.Formatter()
+
+
+def _with_spec(getter: Placeholder, spec: str) -> Placeholder:
+    return lambda bot, chat_id, message: format(getter(bot, chat_id, message), spec)
+
+
+class ResponseTemplate:
+    """
+    Текст ответа, разобранный на сегменты один раз.
+
+    Литералы хранятся готовыми строками, подстановки - функциями из
+    PLACEHOLDERS: {time}, {date}, {uptime}, {name}, {username}, {chat},
+    {messages}, {responses}. Формат проверяется при компиляции
+    ({messages:,} допустим, {name:d} - ValueError). Текст без известных
+    подстановок не разбирается и отдается как есть, вместе с {{ и }};
+    в тексте с подстановками {{ и }} означают одиночные скобки.
+    Неизвестные подстановки и некорректные скобки остаются в тексте.
+    Подпись присоединяется к последнему литералу при компиляции.
+    """
+
+    def __init__(self, text: str, signature: str = '', dynamic: bool = True):
+        """
+        Args:
+            text: Текст ответа
+            signature: Подпись в конце ответа
+            dynamic: Разбирать подстановки (False - текст как есть, например ответ LLM)
+            
+        Raises:
+            ValueError: Если формат подстановки не подходит к ее значению
+        """
+        self.source = text
+        parts: List[Union[str, Placeholder]] = []
+        for part in (self._parse(text) if dynamic else [text]) + [signature]:
+            if isinstance(part, str) and parts and isinstance(parts[-1], str):
+                parts[-1] += part
+            elif part != '':
+                parts.append(part)
+        self._parts = parts
+        self._static: Optional[str] = ''.join(parts) if all(isinstance(part, str) for part in parts) else None
+
+    @staticmethod
+    def _parse(text: str) -> List[Union[str, Placeholder]]:
+        """Разбирает текст на литералы и подстановки"""
+        try:
+            fields = list(_formatter.parse(text))
+        except ValueError:
+            # Непарные скобки - обычный текст
+            return [text]
+        if not any(name in PLACEHOLDERS for _, name, _, _ in fields):
+            # Без подстановок экранирование не применяется: {{ и }} остаются как есть
+            return [text]
+        parts: List[Union[str, Placeholder]] = []
+        for literal, name, spec, conversion in fields:
+            parts.append(literal)
+            if name is None:
+                continue
+            getter = PLACEHOLDERS.get(name)
+            if getter is None or conversion:
+                parts.append('{' + name + (f"!{conversion}" if conversion else '') + (f":{spec}" if spec else '') + '}')
+            elif spec:
+                try:
+                    format(_SAMPLES.get(name, ''), spec)
+                except ValueError as e:
+                    raise ValueError(f"Некорректный формат {{{name}:{spec}}} в шаблоне ответа: {e}") from None
+                parts.append(_with_spec(getter, spec))
+            else:
+                parts.append(getter)
+        return parts
+
+    @property
+    def is_static(self) -> bool:
+        """Ответ не зависит от момента отправки"""
+        return self._static is not None
+
+    def render(self, bot, chat_id: int, message) -> str:
+        """
+        Подставляет значения и возвращает текст ответа
+
+        Args:
+            bot: Бот, отправляющий ответ
+            chat_id: Peer id чата
+            message: Исходное сообщение
+        """
+        if self._static is not None:
+            return self._static
+        return ''.join([part if part.__class__ is str else str(part(bot, chat_id, message)) for part in self._parts])
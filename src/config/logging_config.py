@@ -5,30 +5,37 @@ import logging
 import logging.handlers
 import os
 from datetime import datetime
+from ..utils.lazy import LazyProxy
+from ..utils.log_pipeline import start_queue_logging, stop_queue_logging, queue_enabled
 
 
 class BotLogger:
     """Класс для настройки логирования бота"""
     
-    def __init__(self, name: str = "telegram_bot", log_level: str = "INFO"):
+    def __init__(self, name: str = "telegram_bot", log_level: str = "INFO",
+                 log_to_file: bool = True, use_queue: bool = None):
         """
         Инициализация логгера
         
         Args:
             name: Имя логгера
             log_level: Уровень логирования (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            log_to_file: Писать ли в файлы logs/
+            use_queue: Писать через очередь в фоновом потоке, чтобы запись
+                на диск и ротация не останавливали цикл событий
+                (по умолчанию LOG_QUEUE)
         """
         self.name = name
         self.log_level = getattr(logging, log_level.upper(), logging.INFO)
+        self.log_to_file = log_to_file
+        self.use_queue = queue_enabled() if use_queue is None else use_queue
         self.logger = self._setup_logger()
     
     def _setup_logger(self) -> logging.Logger:
         """Настраивает логгер с консольным и файловым выводом"""
         logger = logging.getLogger(self.name)
         logger.setLevel(self.log_level)
-        
-        # Очищаем существующие обработчики
-        logger.handlers.clear()
+        handlers = []
         
         # Создаем форматтер
         formatter = logging.Formatter(
@@ -40,7 +47,10 @@ class BotLogger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(self.log_level)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+        
+        if not self.log_to_file:
+            return self._install(logger, handlers)
         
         # Создаем директорию для логов
         log_dir = "logs"
@@ -56,7 +66,7 @@ class BotLogger:
         )
         file_handler.setLevel(self.log_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
         
         # Обработчик для ошибок
         error_log_file = os.path.join(log_dir, f"{self.name}_errors.log")
@@ -67,8 +77,18 @@ class BotLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
-        logger.addHandler(error_handler)
+        handlers.append(error_handler)
         
+        return self._install(logger, handlers)
+    
+    def _install(self, logger: logging.Logger, handlers: list) -> logging.Logger:
+        """Устанавливает обработчики напрямую или за очередью"""
+        # Заменяем обработчики новым списком, а не очисткой на месте: настройка
+        # может выполняться, пока logging перебирает текущий список
+        stop_queue_logging(logger.name)
+        logger.handlers = handlers
+        if self.use_queue:
+            start_queue_logging(logger)
         return logger
     
     def get_logger(self) -> logging.Logger:
@@ -79,13 +99,32 @@ class BotLogger:
         """Изменяет уровень логирования"""
         self.log_level = getattr(logging, level.upper(), logging.INFO)
         self.logger.setLevel(self.log_level)
+        # При записи через очередь уровни стоят на обработчиках фонового потока
         for handler in self.logger.handlers:
-            handler.setLevel(self.log_level)
+            for target in getattr(getattr(handler, 'listener', None), 'handlers', [handler]):
+                target.setLevel(self.log_level)
 
 
-# Глобальный логгер
-bot_logger = BotLogger()
-logger = bot_logger.get_logger()
+class _DeferredSetupHandler(logging.Handler):
+    """Настраивает логирование при первой записи и передает ей эту запись"""
+    
+    def handle(self, record):
+        configured = bot_logger.lazy_get().get_logger()
+        for handler in configured.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+    
+    def emit(self, record):
+        pass
+
+
+# Глобальный логгер: обработчики (консоль и файлы в logs/) создаются
+# при первой записи или явном вызове setup_logging()
+bot_logger = LazyProxy(BotLogger, 'bot_logger')
+logger = logging.getLogger("telegram_bot")
+logger.setLevel(logging.INFO)
+logger.addHandler(_DeferredSetupHandler())
 
 
 def get_logger(name: str = None) -> logging.Logger:
@@ -103,23 +142,15 @@ def get_logger(name: str = None) -> logging.Logger:
     return logger
 
 
-def setup_logging(level: str = "INFO", log_to_file: bool = True):
+def setup_logging(level: str = "INFO", log_to_file: bool = True, use_queue: bool = None):
     """
     Настраивает логирование для всего приложения
     
     Args:
         level: Уровень логирования
         log_to_file: Логировать ли в файл
+        use_queue: Писать через очередь в фоновом потоке (по умолчанию LOG_QUEUE)
     """
-    global bot_logger, logger
-    
-    bot_logger = BotLogger(log_level=level)
-    logger = bot_logger.get_logger()
-    
-    if not log_to_file:
-        # Удаляем файловые обработчики
-        for handler in logger.handlers[:]:
-            if isinstance(handler, logging.handlers.RotatingFileHandler):
-                logger.removeHandler(handler)
+    bot_logger.lazy_init(log_level=level, log_to_file=log_to_file, use_queue=use_queue)
     
     logger.info(f"Логирование настроено. Уровень: {level}")
@@ -4,10 +4,30 @@
 import os
 from dotenv import load_dotenv
 from .logging_config import get_logger
+from ..utils.lazy import LazyProxy
 
 logger = get_logger("config")
 
 
+def parse_chat_list(value: str) -> list:
+    """
+    Разбирает список чатов из строки через запятую
+    
+    Args:
+        value: Строка вида "@chat1, -1001234567890"
+        
+    Returns:
+        list: Непустые имена чатов
+    """
+    if not value:
+        return []
+    return [chat.strip() for chat in value.split(',') if chat.strip()]
+
+
+class ConfigError(Exception):
+    """Не заданы обязательные переменные окружения"""
+
+
 class Config:
     """Класс для управления конфигурацией бота"""
     
@@ -32,12 +52,112 @@ class Config:
         # Настройки чата
         self.CHANNEL_USERNAME = os.getenv('CHANNEL_USERNAME')
         self.GROUP_NAME = os.getenv('GROUP_NAME')
+        # Список чатов для автоответчиков через запятую (по умолчанию CHANNEL_USERNAME)
+        self.RESPONDER_CHATS = parse_chat_list(os.getenv('RESPONDER_CHATS'))
+        # Типы ботов, запускаемых в одном процессе (smart, simple, group через запятую)
+        self.BOT_TYPES = parse_chat_list(os.getenv('BOT_TYPES', 'simple'))
+        # Общий префикс сессий для ботов менеджера (одни клиенты на все боты)
+        self.BOT_SESSION_NAME = os.getenv('BOT_SESSION_NAME', 'simple_auto_responder')
         
         # Настройка режима ответов (bot/user)
         self.USE_USER_ACCOUNT = os.getenv('USE_USER_ACCOUNT', 'false').lower() in ['true', '1', 'yes']
+        
+        # Отложенная пакетная запись в базу данных
+        self.DB_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', '100'))
+        self.DB_FLUSH_INTERVAL = float(os.getenv('DB_FLUSH_INTERVAL', '0.5'))
+        
+        # Планировщик исходящих сообщений
+        self.SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', '25'))
+        self.SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', '1'))
+        self.SEND_DEADLINE = float(os.getenv('SEND_DEADLINE', '60'))
+        self.SEND_COALESCE = os.getenv('SEND_COALESCE', 'false').lower() in ['true', '1', 'yes']
+        
+        # Пул обработчиков сообщений: число одновременных обработчиков (0 - обработка
+        # прямо в диспетчере Telethon), глубина очереди чата и политика переполнения
+        self.HANDLER_WORKERS = int(os.getenv('HANDLER_WORKERS', '8'))
+        self.HANDLER_QUEUE_SIZE = int(os.getenv('HANDLER_QUEUE_SIZE', '100'))
+        self.HANDLER_OVERFLOW = os.getenv('HANDLER_OVERFLOW', 'drop_oldest').lower()
+        
+        # Окна тишины ответов в секундах (0 - без ограничения): на пользователя в чате,
+        # на ключевое слово в чате и на чат целиком
+        self.COOLDOWN_USER = float(os.getenv('COOLDOWN_USER', '0'))
+        self.COOLDOWN_KEYWORD = float(os.getenv('COOLDOWN_KEYWORD', '0'))
+        self.COOLDOWN_CHAT = float(os.getenv('COOLDOWN_CHAT', '0'))
+        
+        # Ответы LLM на сообщения без подходящего правила (только SmartResponder):
+        # провайдер deepseek/openai/openrouter, дедлайн ответа в секундах, размер и
+        # время жизни кэша ответов, число одновременных запросов, только вопросы
+        self.LLM_FALLBACK_ENABLED = os.getenv('LLM_FALLBACK_ENABLED', 'false').lower() in ['true', '1', 'yes']
+        self.LLM_FALLBACK_PROVIDER = os.getenv('LLM_FALLBACK_PROVIDER', 'deepseek').lower()
+        self.LLM_FALLBACK_MODEL = os.getenv('LLM_FALLBACK_MODEL', '')
+        self.LLM_FALLBACK_DEADLINE = float(os.getenv('LLM_FALLBACK_DEADLINE', '8'))
+        self.LLM_FALLBACK_CACHE_SIZE = int(os.getenv('LLM_FALLBACK_CACHE_SIZE', '1000'))
+        self.LLM_FALLBACK_CACHE_TTL = float(os.getenv('LLM_FALLBACK_CACHE_TTL', '86400'))
+        self.LLM_FALLBACK_CONCURRENCY = int(os.getenv('LLM_FALLBACK_CONCURRENCY', '4'))
+        self.LLM_FALLBACK_QUESTIONS_ONLY = os.getenv('LLM_FALLBACK_QUESTIONS_ONLY', 'true').lower() in ['true', '1', 'yes']
+        # Сколько предыдущих сообщений переписки передавать LLM (0 - только вопрос)
+        self.LLM_FALLBACK_CONTEXT = int(os.getenv('LLM_FALLBACK_CONTEXT', '0'))
+        self.DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY', '')
+        self.OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+        self.OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
+        
+        # Контекст переписки в памяти: сообщений на пользователя в чате, всего и длина текста
+        self.CONTEXT_SIZE = int(os.getenv('CONTEXT_SIZE', '10'))
+        self.CONTEXT_MAX_MESSAGES = int(os.getenv('CONTEXT_MAX_MESSAGES', '50000'))
+        self.CONTEXT_MAX_CHARS = int(os.getenv('CONTEXT_MAX_CHARS', '500'))
+        
+        # Период пересчета дневной статистики в bot_stats, секунд (0 - только при остановке)
+        self.STATS_ROLLUP_INTERVAL = float(os.getenv('STATS_ROLLUP_INTERVAL', '300'))
+        
+        # Период записи счетчиков сессии по чатам в bot_sessions, секунд (0 - только при остановке)
+        self.SESSION_STATS_INTERVAL = float(os.getenv('SESSION_STATS_INTERVAL', '60'))
+        
+        # Супервизор: число процессов-обработчиков и предельная пауза перед перезапуском упавшего
+        self.SUPERVISOR_WORKERS = int(os.getenv('SUPERVISOR_WORKERS', '2'))
+        self.SUPERVISOR_MAX_RESTART_DELAY = float(os.getenv('SUPERVISOR_MAX_RESTART_DELAY', '60'))
+        
+        # Плавная остановка по SIGTERM: сколько ждать дообработки принятых событий, секунд,
+        # и максимальный возраст отложенного ответа, который еще отправляется после перезапуска
+        self.DRAIN_TIMEOUT = float(os.getenv('DRAIN_TIMEOUT', '20'))
+        self.SPOOL_MAX_AGE = float(os.getenv('SPOOL_MAX_AGE', '600'))
+        
+        # Защита от повторной доставки: сколько последних сообщений помнить
+        # и как часто сохранять список в sessions/ (секунд, 0 - только при остановке)
+        self.DEDUP_CAPACITY = int(os.getenv('DEDUP_CAPACITY', '100000'))
+        self.DEDUP_SAVE_INTERVAL = float(os.getenv('DEDUP_SAVE_INTERVAL', '60'))
+        
+        # Сопоставление ключевых слов по основам слов (стемминг Snowball) вместо подстроки
+        # и размер кэша основ
+        self.KEYWORD_NORMALIZE = os.getenv('KEYWORD_NORMALIZE', 'false').lower() in ['true', '1', 'yes']
+        self.KEYWORD_STEM_CACHE_SIZE = int(os.getenv('KEYWORD_STEM_CACHE_SIZE', '50000'))
+        
+        # Период проверки изменений правил в таблице response_rules (0 - только при запуске)
+        self.RULES_RELOAD_INTERVAL = float(os.getenv('RULES_RELOAD_INTERVAL', '30'))
+        
+        # Время жизни сохраненных результатов проверки прав в чатах, секунд (0 - проверять всегда)
+        self.CHAT_ACCESS_CACHE_TTL = float(os.getenv('CHAT_ACCESS_CACHE_TTL', '86400'))
+        
+        # HTTP-статистика запущенных ботов (/health, /stats, /messages): порт (0 - выключена),
+        # адрес и время жизни кэшированных ответов в секундах
+        self.STATS_API_PORT = int(os.getenv('STATS_API_PORT', '0'))
+        self.STATS_API_HOST = os.getenv('STATS_API_HOST', '127.0.0.1')
+        self.STATS_API_CACHE_TTL = float(os.getenv('STATS_API_CACHE_TTL', '2'))
+        
+        # Время жизни кэша get_me()/get_entity() в секундах
+        self.ENTITY_CACHE_TTL = float(os.getenv('ENTITY_CACHE_TTL', '3600'))
+        
+        # Сохранение raw_data сообщений: none, fields (только RAW_DATA_FIELDS) или full
+        self.RAW_DATA_MODE = os.getenv('RAW_DATA_MODE', 'full').lower()
+        self.RAW_DATA_FIELDS = parse_chat_list(os.getenv('RAW_DATA_FIELDS'))
+        self.RAW_DATA_COMPRESS = os.getenv('RAW_DATA_COMPRESS', 'false').lower() in ['true', '1', 'yes']
     
     def _validate_config(self):
-        """Проверяет, что все необходимые переменные заданы"""
+        """
+        Проверяет, что все необходимые переменные заданы
+        
+        Raises:
+            ConfigError: Если какие-то переменные не заданы
+        """
         required_vars = {
             'API_ID_TG': self.API_ID,
             'API_HASH_TG': self.API_HASH,
@@ -55,7 +175,7 @@ class Config:
             logger.error("Убедитесь, что файл .env содержит все необходимые переменные:")
             for var in missing_vars:
                 logger.error(f"   {var}=ваше_значение")
-            exit(1)
+            raise ConfigError(f"Не заданы переменные окружения: {', '.join(missing_vars)}")
         
         # Логируем режим работы
         if self.USE_USER_ACCOUNT:
@@ -73,7 +193,8 @@ class Config:
             'phone': self.PHONE_NUMBER,
             'bot_token': self.BOT_TOKEN,
             'channel': self.CHANNEL_USERNAME,
-            'group': self.GROUP_NAME
+            'group': self.GROUP_NAME,
+            'responder_chats': self.RESPONDER_CHATS
         }
     
     def __str__(self):
@@ -81,5 +202,18 @@ class Config:
         return f"Config(channel={self.CHANNEL_USERNAME}, phone={self.PHONE_NUMBER[:3]}***)"
 
 
-# Глобальный экземпляр конфигурации
-config = Config()
+# Глобальная конфигурация: читается из окружения при первом обращении
+config = LazyProxy(Config, 'config')
+
+
+def init_config(env_path: str = ".env") -> Config:
+    """
+    Явно загружает конфигурацию (например, из другого .env)
+    
+    Args:
+        env_path: Путь к файлу .env
+        
+    Returns:
+        Config: Загруженная конфигурация
+    """
+    return config.lazy_init(env_path)
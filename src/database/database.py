@@ -1,18 +1,28 @@
 """
 Модуль для работы с базой данных PostgreSQL
 """
+import hashlib
 import os
-from datetime import datetime
-from typing import Optional, Dict, Any, List
-from sqlalchemy import create_engine, text
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from sqlalchemy import create_engine, func, insert, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
-from .models import Base, Chat, User, Message, BotResponse, BotStats, BotSession
+from .models import Base, Chat, User, Message, BotResponse, BotStats, BotSession, ResponseRuleRecord
 from ..config.logging_config import get_logger
+from ..utils.cache import LRUCache
+from ..utils.serialization import json_dumps
+from ..utils.lazy import LazyProxy
 
 logger = get_logger("database")
 
 
+def escape_like(value: str) -> str:
+    """Экранирует спецсимволы LIKE (%, _ и \\), чтобы значение совпадало буквально"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
 class DatabaseManager:
     """Менеджер для работы с базой данных"""
     
@@ -26,6 +36,10 @@ class DatabaseManager:
         self.database_url = database_url or self._get_database_url()
         self.engine = None
         self.SessionLocal = None
+        # Кэш telegram_id -> (id строки, профиль) перед upsert-запросами
+        id_cache_size = int(os.getenv('DB_ID_CACHE_SIZE', '100000'))
+        self.user_id_cache = LRUCache(maxsize=id_cache_size)
+        self.chat_id_cache = LRUCache(maxsize=id_cache_size)
         self._initialize_database()
     
     def _get_database_url(self) -> str:
@@ -45,7 +59,9 @@ class DatabaseManager:
                 self.database_url,
                 echo=False,  # Установите True для отладки SQL запросов
                 pool_pre_ping=True,
-                pool_recycle=300
+                pool_recycle=300,
+                # datetime и bytes в raw_data кодируются при вставке за один проход
+                json_serializer=json_dumps
             )
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
             logger.info("Подключение к базе данных инициализировано")
@@ -105,6 +121,100 @@ class DatabaseManager:
             logger.info(f"Создан новый пользователь: {first_name or username}")
         return user
     
+    # Upsert-методы с кэшем идентификаторов
+    def upsert_chat(self, session: Session, telegram_id: int, username: str = None,
+                    title: str = None, chat_type: str = 'channel') -> int:
+        """
+        Создает или обновляет чат и возвращает его ID
+        
+        Args:
+            session: Сессия базы данных
+            telegram_id: ID чата в Telegram
+            username: Имя чата
+            title: Название чата
+            chat_type: Тип чата
+            
+        Returns:
+            int: ID чата в базе данных
+        """
+        return self._upsert(session, Chat, self.chat_id_cache, telegram_id, {
+            'username': username,
+            'title': title,
+            'chat_type': chat_type
+        })
+    
+    def upsert_user(self, session: Session, telegram_id: int, username: str = None,
+                    first_name: str = None, last_name: str = None, is_bot: bool = False,
+                    commit: bool = True) -> int:
+        """
+        Создает или обновляет пользователя и возвращает его ID
+        
+        Args:
+            session: Сессия базы данных
+            telegram_id: ID пользователя в Telegram
+            username: Имя пользователя
+            first_name: Имя
+            last_name: Фамилия
+            is_bot: Является ли пользователь ботом
+            commit: Зафиксировать транзакцию. При False кэш обновляется
+                только после commit_with_id_cache()
+            
+        Returns:
+            int: ID пользователя в базе данных
+        """
+        return self._upsert(session, User, self.user_id_cache, telegram_id, {
+            'username': username,
+            'first_name': first_name,
+            'last_name': last_name,
+            'is_bot': is_bot
+        }, commit=commit)
+    
+    def _upsert(self, session: Session, model, cache: LRUCache, telegram_id: int,
+                profile: Dict[str, Any], commit: bool = True) -> int:
+        """
+        INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING id
+        
+        Если профиль в кэше совпадает с переданным, запрос не выполняется.
+        Пустые (None) поля не затирают уже сохраненные значения, а строка
+        обновляется только при реальном изменении профиля.
+        """
+        key = tuple(profile.values())
+        cached = cache.get(telegram_id)
+        if cached is not None and cached[1] == key:
+            return cached[0]
+        
+        dialect_insert = sqlite.insert if self.engine.dialect.name == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(model).values(telegram_id=telegram_id, **profile)
+        changes = {name: value for name, value in profile.items() if value is not None}
+        if changes:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.telegram_id],
+                set_=dict({name: stmt.excluded[name] for name in changes}, updated_at=datetime.utcnow()),
+                where=or_(*[getattr(model, name).is_distinct_from(stmt.excluded[name]) for name in changes])
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[model.telegram_id])
+        
+        row_id = session.execute(stmt.returning(model.id)).scalar()
+        if row_id is None:
+            # Профиль не изменился - строка не обновлялась и RETURNING пуст
+            row_id = session.execute(
+                select(model.id).where(model.telegram_id == telegram_id)
+            ).scalar_one()
+        
+        if commit:
+            session.commit()
+            cache.put(telegram_id, (row_id, key))
+        else:
+            session.info.setdefault('pending_id_cache', []).append((cache, telegram_id, (row_id, key)))
+        return row_id
+    
+    def commit_with_id_cache(self, session: Session):
+        """Фиксирует транзакцию и применяет отложенные обновления кэша ID"""
+        session.commit()
+        for cache, telegram_id, value in session.info.pop('pending_id_cache', []):
+            cache.put(telegram_id, value)
+    
     # Методы для работы с сообщениями
     def save_message(self, session: Session, telegram_id: int, chat_id: int, 
                     user_id: int = None, text: str = None, message_type: str = 'text',
@@ -132,15 +242,18 @@ class DatabaseManager:
     def save_bot_response(self, session: Session, original_message_id: int, response_text: str,
                          response_type: str = 'auto', trigger_keyword: str = None,
                          response_time_ms: int = None, is_successful: bool = True,
-                         error_message: str = None) -> BotResponse:
-        """Сохраняет ответ бота"""
+                         error_message: str = None, queue_delay_ms: int = None,
+                         **stage_timestamps) -> BotResponse:
+        """Сохраняет ответ бота (stage_timestamps - отметки этапов: received_at, sent_at и т.д.)"""
         try:
             response = BotResponse(
+                **stage_timestamps,
                 original_message_id=original_message_id,
                 response_text=response_text,
                 response_type=response_type,
                 trigger_keyword=trigger_keyword,
                 response_time_ms=response_time_ms,
+                queue_delay_ms=queue_delay_ms,
                 is_successful=is_successful,
                 error_message=error_message
             )
@@ -153,38 +266,435 @@ class DatabaseManager:
             logger.error(f"Ошибка сохранения ответа бота: {e}")
             raise
     
+    def save_batch(self, session: Session, messages: List[Dict[str, Any]],
+                   responses: List[Dict[str, Any]]) -> List[int]:
+        """
+        Сохраняет пачку сообщений и ответов бота одной транзакцией
+
+        Сообщения и ответы вставляются многострочными INSERT. Ответ ссылается
+        на исходное сообщение либо готовым `original_message_id`, либо
+        индексом `original_message_index` в списке `messages` этой же пачки.
+
+        Args:
+            session: Сессия базы данных
+            messages: Строки сообщений (поля Message плюс данные отправителя)
+            responses: Строки ответов (поля BotResponse)
+
+        Returns:
+            List[int]: ID сохраненных сообщений в порядке `messages`
+        """
+        try:
+            # Разрешаем отправителей один раз на пачку (через кэш ID)
+            user_ids = {}
+            for row in messages:
+                telegram_user_id = row.get('user_id')
+                if telegram_user_id and telegram_user_id not in user_ids:
+                    user_ids[telegram_user_id] = self.upsert_user(
+                        session,
+                        telegram_id=telegram_user_id,
+                        username=row.get('username'),
+                        first_name=row.get('first_name'),
+                        last_name=row.get('last_name'),
+                        is_bot=row.get('is_bot', False),
+                        commit=False
+                    )
+
+            message_ids = []
+            if messages:
+                message_rows = [
+                    {
+                        'telegram_id': row['telegram_id'],
+                        'chat_id': row['chat_id'],
+                        'user_id': user_ids.get(row.get('user_id')),
+                        'text': row.get('text'),
+                        'message_type': row.get('message_type', 'text'),
+                        'is_bot_response': row.get('is_bot_response', False),
+                        'raw_data': row.get('raw_data'),
+                        'created_at': row.get('created_at', datetime.utcnow())
+                    }
+                    for row in messages
+                ]
+                message_ids = list(session.execute(
+                    insert(Message).returning(Message.id, sort_by_parameter_order=True),
+                    message_rows
+                ).scalars())
+
+            if responses:
+                response_rows = []
+                for row in responses:
+                    row = dict(row)
+                    index = row.pop('original_message_index', None)
+                    if index is not None:
+                        row['original_message_id'] = message_ids[index]
+                    row.setdefault('created_at', datetime.utcnow())
+                    response_rows.append(row)
+                # Многострочный INSERT требует одинакового набора колонок
+                columns = set().union(*response_rows)
+                for row in response_rows:
+                    for column in columns.difference(row):
+                        row[column] = None
+                session.execute(insert(BotResponse), response_rows)
+
+            self.commit_with_id_cache(session)
+            logger.debug(f"Пачка сохранена: {len(messages)} сообщений, {len(responses)} ответов")
+            return message_ids
+        except Exception as e:
+            session.rollback()
+            session.info.pop('pending_id_cache', None)
+            logger.error(f"Ошибка сохранения пачки: {e}")
+            raise
+
+    # Методы для правил ответов
+    def get_rules_version(self, session: Session, bot_type: str) -> tuple:
+        """
+        Возвращает отпечаток набора правил бота для дешевой проверки изменений
+
+        Отпечаток - количество правил и хэш их содержимого, а не updated_at:
+        правки напрямую через SQL (UPDATE response_rules SET is_active = false)
+        не обновляют updated_at, но меняют отпечаток. Читаются только столбцы
+        правил, без создания объектов ORM и компиляции.
+        """
+        rules = ResponseRuleRecord
+        rows = session.execute(
+            select(rules.id, rules.bot_type, rules.chat_id, rules.keywords,
+                   rules.response, rules.priority, rules.is_active)
+            .where(or_(rules.bot_type == bot_type, rules.bot_type.is_(None)))
+            .order_by(rules.id)
+        ).all()
+        digest = hashlib.md5(json_dumps([list(row) for row in rows]).encode('utf-8')).hexdigest()
+        return len(rows), digest
+
+    def get_response_rules(self, session: Session, bot_type: str) -> List[Dict[str, Any]]:
+        """
+        Загружает активные правила бота (общие и для его типа)
+
+        Returns:
+            List[Dict]: Правила вида {'chat_id', 'keywords', 'response', 'priority'}
+                в порядке объявления
+        """
+        rows = session.execute(
+            select(ResponseRuleRecord)
+            .where(
+                ResponseRuleRecord.is_active.is_(True),
+                or_(ResponseRuleRecord.bot_type == bot_type, ResponseRuleRecord.bot_type.is_(None))
+            )
+            .order_by(ResponseRuleRecord.id)
+        ).scalars()
+        return [
+            {
+                'chat_id': rule.chat_id,
+                'keywords': list(rule.keywords or []),
+                'response': rule.response,
+                'priority': rule.priority if rule.priority is not None else 1
+            }
+            for rule in rows
+        ]
+
     # Методы для статистики
-    def get_chat_stats(self, session: Session, chat_id: int, days: int = 7) -> Dict[str, Any]:
-        """Получает статистику чата за указанный период"""
+    def rollup_chat_day(self, session: Session, chat_id: int, day: datetime,
+                        commit: bool = True, live: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Пересчитывает строку bot_stats для чата за один день (UTC)
+        
+        Агрегаты считаются только по строкам этого дня (индекс по created_at),
+        а не по всей истории, и записываются через INSERT ... ON CONFLICT.
+        Если передана статистика бота из памяти (live), ключевые слова и
+        среднее время ответа не пересчитываются по bot_responses, а
+        прибавляются к уже записанным в строке.
+        
+        Args:
+            session: Сессия базы данных
+            chat_id: ID чата в базе данных
+            day: Любой момент дня; строка хранится с date = полночь
+            commit: Зафиксировать транзакцию
+            live: Прирост статистики бота с прошлого пересчета:
+                {'keywords': {слово: количество}, 'responses': N, 'response_ms': сумма мс}
+            
+        Returns:
+            Dict: Записанные значения
+        """
+        day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        next_day = day + timedelta(days=1)
+        
+        total_messages, unique_users = session.execute(
+            select(func.count(Message.id), func.count(func.distinct(Message.user_id)))
+            .where(Message.chat_id == chat_id, Message.created_at >= day, Message.created_at < next_day)
+        ).one()
+        
+        response_window = (
+            Message.chat_id == chat_id,
+            BotResponse.created_at >= day,
+            BotResponse.created_at < next_day
+        )
+        if live is None:
+            bot_responses, timed_responses, response_time_avg = session.execute(
+                select(func.count(BotResponse.id), func.count(BotResponse.response_time_ms),
+                       func.avg(BotResponse.response_time_ms))
+                .join(Message, BotResponse.original_message_id == Message.id)
+                .where(*response_window)
+            ).one()
+            
+            keyword_count = func.count(BotResponse.id)
+            keywords = dict(session.execute(
+                select(BotResponse.trigger_keyword, keyword_count)
+                .join(Message, BotResponse.original_message_id == Message.id)
+                .where(*response_window, BotResponse.trigger_keyword.isnot(None))
+                .group_by(BotResponse.trigger_keyword)
+                .order_by(keyword_count.desc())
+                .limit(10)
+            ).all())
+        else:
+            bot_responses = session.execute(
+                select(func.count(BotResponse.id))
+                .join(Message, BotResponse.original_message_id == Message.id)
+                .where(*response_window)
+            ).scalar()
+            keywords, response_time_avg, timed_responses = self._merge_live_stats(session, chat_id, day, live)
+        
+        values = {
+            'total_messages': total_messages,
+            'bot_responses': bot_responses,
+            'unique_users': unique_users,
+            'most_used_keywords': keywords,
+            'response_time_avg': int(response_time_avg) if response_time_avg is not None else None,
+            'timed_responses': timed_responses,
+            'updated_at': datetime.utcnow()
+        }
+        
+        dialect_insert = sqlite.insert if self.engine.dialect.name == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(BotStats).values(chat_id=chat_id, date=day, **values)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[BotStats.chat_id, BotStats.date],
+            set_={name: stmt.excluded[name] for name in values}
+        ))
+        if commit:
+            session.commit()
+        return values
+    
+    def _merge_live_stats(self, session: Session, chat_id: int, day: datetime,
+                          live: Dict[str, Any]) -> Tuple[Dict[str, int], Optional[float], int]:
+        """
+        Прибавляет статистику бота из памяти к записанной строке bot_stats
+        
+        Вес записанного среднего времени ответа - число учтенных в нем
+        ответов (timed_responses); ключевые слова полного пересчета
+        ограничены первыми десятью и весом служить не могут.
+        
+        Returns:
+            tuple: Ключевые слова со счетчиками, среднее время ответа и его вес
+        """
+        row = session.execute(
+            select(BotStats.most_used_keywords, BotStats.response_time_avg, BotStats.timed_responses)
+            .where(BotStats.chat_id == chat_id, BotStats.date == day)
+            .with_for_update()
+        ).first()
+        keywords = dict(row.most_used_keywords or {}) if row else {}
+        average = row.response_time_avg if row else None
+        merged = 0
+        if average is not None:
+            # Строки, записанные до появления timed_responses, взвешиваются по ключевым словам
+            merged = row.timed_responses if row.timed_responses is not None else sum(keywords.values())
+        
+        for keyword, count in live.get('keywords', {}).items():
+            keywords[keyword] = keywords.get(keyword, 0) + count
+        responses = live.get('responses', 0)
+        if responses:
+            average = ((average or 0) * merged + live.get('response_ms', 0)) / (merged + responses)
+        return keywords, average, merged + responses
+    
+    def rollup_stats(self, session: Session, chat_days: Iterable[Tuple[int, datetime]],
+                     live: Optional[Dict[Tuple[int, datetime], Dict[str, Any]]] = None) -> int:
+        """
+        Пересчитывает bot_stats для набора (чат, день) одной транзакцией
+        
+        Args:
+            session: Сессия базы данных
+            chat_days: Пары (ID чата, полночь дня)
+            live: Статистика бота из памяти по тем же парам (см. rollup_chat_day);
+                None - полный пересчет по bot_responses
+        
+        Returns:
+            int: Количество обновленных строк
+        """
         try:
-            # Общее количество сообщений
-            total_messages = session.query(Message).filter(
-                Message.chat_id == chat_id,
-                Message.created_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).count()
+            count = 0
+            for chat_id, day in chat_days:
+                chat_live = None if live is None else live.get((chat_id, day), {})
+                self.rollup_chat_day(session, chat_id, day, commit=False, live=chat_live)
+                count += 1
+            session.commit()
+            return count
+        except Exception:
+            session.rollback()
+            raise
+    
+    def open_bot_sessions(self, session: Session, bot_name: str, chat_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Открывает строки bot_sessions для чатов экземпляра бота
+        
+        Строки, оставшиеся активными после аварийной остановки того же
+        экземпляра, предварительно закрываются.
+        
+        Args:
+            bot_name: Имя экземпляра бота
+            chat_ids: ID чатов в базе данных
             
-            # Количество ответов бота
-            bot_responses = session.query(BotResponse).join(Message).filter(
-                Message.chat_id == chat_id,
-                BotResponse.created_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).count()
+        Returns:
+            dict: ID чата -> ID строки bot_sessions
+        """
+        try:
+            self.close_bot_sessions(session, bot_name, commit=False)
+            rows = {}
+            for chat_id in chat_ids:
+                row = BotSession(bot_name=bot_name, chat_id=chat_id, is_active=True)
+                session.add(row)
+                session.flush()
+                rows[chat_id] = row.id
+            session.commit()
+            return rows
+        except Exception:
+            session.rollback()
+            raise
+    
+    def add_bot_session_counts(self, session: Session, counts: Dict[int, Dict[str, int]]):
+        """
+        Прибавляет счетчики к строкам bot_sessions
+        
+        Args:
+            counts: ID строки -> приращения messages_processed, responses_sent, errors_count
+        """
+        try:
+            for row_id, deltas in counts.items():
+                session.query(BotSession).filter(BotSession.id == row_id).update({
+                    getattr(BotSession, column): getattr(BotSession, column) + delta
+                    for column, delta in deltas.items() if delta
+                }, synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    
+    def close_bot_sessions(self, session: Session, bot_name: str, commit: bool = True) -> int:
+        """
+        Закрывает активные строки bot_sessions экземпляра бота
+        
+        Returns:
+            int: Количество закрытых строк
+        """
+        closed = session.query(BotSession).filter(
+            BotSession.bot_name == bot_name,
+            BotSession.is_active.is_(True)
+        ).update({'is_active': False, 'session_end': datetime.utcnow()}, synchronize_session=False)
+        if commit:
+            session.commit()
+        return closed
+    
+    def get_bot_session_totals(self, session: Session, name_like: str,
+                               active_only: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Суммирует счетчики bot_sessions по экземплярам бота
+        
+        Args:
+            name_like: Шаблон имен экземпляров для LIKE с escape-символом \\;
+                литеральные части экранируются escape_like (например '%:' + escape_like('bot_w') + '%')
+            active_only: Только активные строки
             
-            # Уникальные пользователи
-            unique_users = session.query(User).join(Message).filter(
-                Message.chat_id == chat_id,
-                Message.created_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            ).distinct().count()
+        Returns:
+            dict: Имя экземпляра -> chats, messages_processed, responses_sent, errors_count
+        """
+        query = session.query(
+            BotSession.bot_name,
+            func.count(BotSession.id),
+            func.coalesce(func.sum(BotSession.messages_processed), 0),
+            func.coalesce(func.sum(BotSession.responses_sent), 0),
+            func.coalesce(func.sum(BotSession.errors_count), 0)
+        ).filter(BotSession.bot_name.like(name_like, escape='\\'))
+        if active_only:
+            query = query.filter(BotSession.is_active.is_(True))
+        return {
+            name: {'chats': chats, 'messages_processed': messages,
+                   'responses_sent': responses, 'errors_count': errors}
+            for name, chats, messages, responses, errors in query.group_by(BotSession.bot_name)
+        }
+    
+    def get_chat_stats(self, session: Session, chat_id: int, days: int = 1) -> Dict[str, Any]:
+        """
+        Получает статистику чата за последние `days` дней (по умолчанию за сегодня)
+        из дневных строк bot_stats
+        
+        Если агрегатов еще нет (rollup не запускался), статистика за сегодня
+        считается напрямую по messages и bot_responses.
+        """
+        try:
+            since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+            rows = session.execute(
+                select(BotStats).where(BotStats.chat_id == chat_id, BotStats.date >= since)
+            ).scalars().all()
+            if not rows:
+                return self._live_chat_stats(session, chat_id)
+            
+            total_messages = sum(row.total_messages or 0 for row in rows)
+            bot_responses = sum(row.bot_responses or 0 for row in rows)
+            keywords: Dict[str, int] = {}
+            for row in rows:
+                for keyword, count in (row.most_used_keywords or {}).items():
+                    keywords[keyword] = keywords.get(keyword, 0) + count
+            timed = [row for row in rows if row.response_time_avg is not None and row.bot_responses]
+            timed_responses = sum(row.bot_responses for row in timed)
+            if len(rows) == 1:
+                unique_users = rows[0].unique_users or 0
+            else:
+                # Один пользователь мог писать в разные дни: дневные значения не суммируются
+                unique_users = session.execute(
+                    select(func.count(func.distinct(Message.user_id)))
+                    .where(Message.chat_id == chat_id, Message.created_at >= since)
+                ).scalar()
             
             return {
                 'total_messages': total_messages,
                 'bot_responses': bot_responses,
                 'unique_users': unique_users,
-                'response_rate': (bot_responses / total_messages * 100) if total_messages > 0 else 0
+                'response_rate': (bot_responses / total_messages * 100) if total_messages > 0 else 0,
+                'response_time_avg': (
+                    int(sum(row.response_time_avg * row.bot_responses for row in timed) / timed_responses)
+                    if timed_responses else None
+                ),
+                'top_keywords': dict(sorted(keywords.items(), key=lambda item: -item[1])[:10]),
+                'days': len(rows)
             }
         except Exception as e:
             logger.error(f"Ошибка получения статистики: {e}")
             return {}
     
+    def _live_chat_stats(self, session: Session, chat_id: int) -> Dict[str, Any]:
+        """Статистика чата за сегодня напрямую по сообщениям"""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Общее количество сообщений
+        total_messages = session.query(Message).filter(
+            Message.chat_id == chat_id,
+            Message.created_at >= today
+        ).count()
+        
+        # Количество ответов бота
+        bot_responses = session.query(BotResponse).join(Message).filter(
+            Message.chat_id == chat_id,
+            BotResponse.created_at >= today
+        ).count()
+        
+        # Уникальные пользователи
+        unique_users = session.query(User).join(Message).filter(
+            Message.chat_id == chat_id,
+            Message.created_at >= today
+        ).distinct().count()
+        
+        return {
+            'total_messages': total_messages,
+            'bot_responses': bot_responses,
+            'unique_users': unique_users,
+            'response_rate': (bot_responses / total_messages * 100) if total_messages > 0 else 0
+        }
+    
     def get_recent_messages(self, session: Session, chat_id: int, limit: int = 10) -> List[Message]:
         """Получает последние сообщения чата"""
         try:
@@ -207,5 +717,18 @@ class DatabaseManager:
             return False
 
 
-# Глобальный экземпляр менеджера базы данных
-db_manager = DatabaseManager()
+# Глобальный менеджер базы данных: подключение создается при первом обращении
+db_manager = LazyProxy(DatabaseManager, 'db_manager')
+
+
+def init_database(database_url: str = None) -> DatabaseManager:
+    """
+    Явно создает менеджер базы данных (например, с другим URL)
+    
+    Args:
+        database_url: URL подключения к базе данных
+        
+    Returns:
+        DatabaseManager: Созданный менеджер
+    """
+    return db_manager.lazy_init(database_url)
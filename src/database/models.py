@@ -3,7 +3,7 @@
 """
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -59,7 +59,7 @@ class Message(Base):
     is_bot_response = Column(Boolean, default=False)
     
     # Метаданные
-    raw_data = Column(JSON, nullable=True)  # Полные данные от Telegram API
+    raw_data = Column(JSON, nullable=True)  # Данные от Telegram API (см. RAW_DATA_MODE)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Связи
@@ -78,6 +78,14 @@ class BotResponse(Base):
     response_type = Column(String(50), default='auto')  # 'auto', 'manual', 'smart'
     trigger_keyword = Column(String(255), nullable=True)
     response_time_ms = Column(Integer, nullable=True)  # Время ответа в миллисекундах
+    queue_delay_ms = Column(Integer, nullable=True)  # Ожидание в очереди отправки в миллисекундах
+    
+    # Отметки этапов обработки (UTC) для разбора задержки ответа
+    message_date = Column(DateTime, nullable=True)  # Дата сообщения в Telegram
+    received_at = Column(DateTime, nullable=True)  # Вход в обработчик
+    persisted_at = Column(DateTime, nullable=True)  # Запись исходного сообщения в БД
+    matched_at = Column(DateTime, nullable=True)  # Подбор правила
+    sent_at = Column(DateTime, nullable=True)  # Завершение отправки
     is_successful = Column(Boolean, default=True)
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -86,9 +94,30 @@ class BotResponse(Base):
     original_message = relationship("Message", back_populates="responses")
 
 
+class ResponseRuleRecord(Base):
+    """Модель правила ответа, редактируемого без перезапуска бота"""
+    __tablename__ = 'response_rules'
+    
+    id = Column(Integer, primary_key=True)
+    bot_type = Column(String(50), nullable=True, index=True)  # response_type бота, NULL - для всех ботов
+    chat_id = Column(Integer, ForeignKey('chats.id'), nullable=True)  # NULL - правило по умолчанию
+    keywords = Column(JSON, nullable=False)  # Список ключевых слов
+    response = Column(Text, nullable=False)
+    priority = Column(Integer, default=1)  # Меньше - важнее
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    # Связи
+    chat = relationship("Chat")
+
+
 class BotStats(Base):
-    """Модель статистики бота"""
+    """Модель статистики бота: одна строка на чат и день (date - полночь UTC)"""
     __tablename__ = 'bot_stats'
+    __table_args__ = (
+        UniqueConstraint('chat_id', 'date', name='uq_bot_stats_chat_date'),
+    )
     
     id = Column(Integer, primary_key=True)
     chat_id = Column(Integer, ForeignKey('chats.id'), nullable=False)
@@ -100,6 +129,8 @@ class BotStats(Base):
     unique_users = Column(Integer, default=0)
     most_used_keywords = Column(JSON, nullable=True)
     response_time_avg = Column(Integer, nullable=True)  # Среднее время ответа в мс
+    timed_responses = Column(Integer, default=0)  # Ответов, учтенных в response_time_avg (вес при слиянии)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Время последнего пересчета
     
     # Связи
     chat = relationship("Chat", back_populates="bot_stats")
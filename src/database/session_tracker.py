@@ -0,0 +1,101 @@
+"""
+Счетчики сессии бота в bot_sessions
+"""
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+from ..config.logging_config import get_logger
+
+logger = get_logger("session_tracker")
+
+_COLUMNS = ('messages_processed', 'responses_sent', 'errors_count')
+
+
+class SessionTracker:
+    """
+    Статистика экземпляра бота по чатам в таблице bot_sessions.
+
+    При запуске открывается строка на каждый чат, счетчики копятся
+    в памяти и раз в `interval` секунд прибавляются к строкам одним
+    проходом; при остановке строки закрываются. Экземпляры (например,
+    процессы супервизора) различаются по bot_name.
+    """
+
+    def __init__(self, db_manager, bot_name: str, interval: float = 60.0):
+        """
+        Args:
+            db_manager: Менеджер базы данных
+            bot_name: Имя экземпляра бота
+            interval: Период записи счетчиков в секундах
+        """
+        self.db_manager = db_manager
+        self.bot_name = bot_name
+        self.interval = interval
+        self._rows: Dict[int, int] = {}
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _call(self, method, *args):
+        """Выполняет метод DatabaseManager в пуле потоков со своей сессией"""
+        def run():
+            session = self.db_manager.get_session()
+            try:
+                return method(session, *args)
+            finally:
+                session.close()
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+
+    async def open(self, chat_ids: Iterable[int]):
+        """Открывает строки сессии для чатов (ID в базе данных)"""
+        self._rows = await self._call(self.db_manager.open_bot_sessions, self.bot_name, list(chat_ids))
+
+    def count(self, chat_id: int, messages: int = 0, responses: int = 0, errors: int = 0):
+        """Прибавляет счетчики чата (ID в базе данных)"""
+        row_id = self._rows.get(chat_id)
+        if row_id is None:
+            return
+        pending = self._pending.setdefault(row_id, dict.fromkeys(_COLUMNS, 0))
+        pending['messages_processed'] += messages
+        pending['responses_sent'] += responses
+        pending['errors_count'] += errors
+
+    async def flush(self):
+        """Записывает накопленные счетчики"""
+        if not self._pending:
+            return
+        counts, self._pending = self._pending, {}
+        try:
+            await self._call(self.db_manager.add_bot_session_counts, counts)
+        except Exception as e:
+            # Вернем приращения, чтобы записать в следующий раз
+            for row_id, deltas in counts.items():
+                pending = self._pending.setdefault(row_id, dict.fromkeys(_COLUMNS, 0))
+                for column, delta in deltas.items():
+                    pending[column] += delta
+            logger.error(f"Ошибка записи статистики сессии: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        """Запускает периодическую запись"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Записывает остаток счетчиков и закрывает строки сессии"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self._rows:
+            try:
+                await self._call(self.db_manager.close_bot_sessions, self.bot_name)
+            except Exception as e:
+                logger.error(f"Ошибка закрытия сессии {self.bot_name}: {e}")
+            self._rows = {}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Возвращает число открытых строк и строк с незаписанными счетчиками"""
+        return {'chats': len(self._rows), 'pending': len(self._pending)}
@@ -0,0 +1,128 @@
+"""
+Периодический пересчет дневной статистики чатов в bot_stats
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from ..config.logging_config import get_logger
+
+logger = get_logger("stats_rollup")
+
+
+class StatsRollup:
+    """
+    Фоновое заполнение bot_stats.
+
+    Бот отмечает (чат, день), в которых была активность, и передает
+    статистику своих ответов из памяти (ключевые слова, время отправки).
+    Раз в `interval` секунд отмеченные строки пересчитываются: счетчики
+    сообщений и пользователей - по данным одного дня, а накопленная
+    статистика ответов прибавляется к строке. Чаты без новых сообщений
+    не пересчитываются.
+    """
+
+    def __init__(self, db_manager, interval: float = 300.0,
+                 before_flush: Optional[Callable[[], Awaitable[Any]]] = None):
+        """
+        Args:
+            db_manager: Менеджер базы данных
+            interval: Период пересчета в секундах
+            before_flush: Корутина, вызываемая перед пересчетом (например,
+                сброс очереди отложенной записи, чтобы учесть все сообщения)
+        """
+        self.db_manager = db_manager
+        self.interval = interval
+        self.before_flush = before_flush
+        self._dirty: Set[Tuple[int, datetime]] = set()
+        self._live: Dict[Tuple[int, datetime], Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            'flushes': 0,
+            'rows_written': 0,
+            'errors': 0
+        }
+
+    def mark(self, chat_id: int, when: Optional[datetime] = None):
+        """
+        Отмечает активность в чате
+
+        Args:
+            chat_id: ID чата в базе данных
+            when: Момент активности (UTC), по умолчанию сейчас
+        """
+        day = (when or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._dirty.add((chat_id, day))
+
+    def record_response(self, chat_id: int, keyword: str, response_ms: int,
+                        when: Optional[datetime] = None):
+        """
+        Учитывает отправленный ответ в статистике до следующего пересчета
+
+        Args:
+            chat_id: ID чата в базе данных
+            keyword: Ключевое слово, на которое ответил бот
+            response_ms: Время отправки ответа, мс
+            when: Момент ответа (UTC), по умолчанию сейчас
+        """
+        day = (when or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._dirty.add((chat_id, day))
+        self._add_live((chat_id, day), {keyword: 1}, 1, response_ms)
+
+    def _add_live(self, key: Tuple[int, datetime], keywords: Dict[str, int], responses: int, response_ms: int):
+        live = self._live.setdefault(key, {'keywords': {}, 'responses': 0, 'response_ms': 0})
+        for keyword, count in keywords.items():
+            live['keywords'][keyword] = live['keywords'].get(keyword, 0) + count
+        live['responses'] += responses
+        live['response_ms'] += response_ms
+
+    def _rollup(self, chat_days, live):
+        session = self.db_manager.get_session()
+        try:
+            return self.db_manager.rollup_stats(session, chat_days, live)
+        finally:
+            session.close()
+
+    async def flush(self):
+        """Пересчитывает отмеченные строки в пуле потоков"""
+        if self.before_flush:
+            await self.before_flush()
+        if not self._dirty:
+            return
+
+        chat_days, self._dirty = sorted(self._dirty), set()
+        live, self._live = self._live, {}
+        loop = asyncio.get_running_loop()
+        try:
+            written = await loop.run_in_executor(None, self._rollup, chat_days, live)
+        except Exception as e:
+            # Вернем отметки и статистику, чтобы учесть их в следующий раз
+            self._dirty.update(chat_days)
+            for key, values in live.items():
+                self._add_live(key, values['keywords'], values['responses'], values['response_ms'])
+            self.metrics['errors'] += 1
+            logger.error(f"Ошибка пересчета статистики: {e}")
+            return
+        self.metrics['flushes'] += 1
+        self.metrics['rows_written'] += written
+        logger.debug(f"Статистика пересчитана: {written} строк")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        """Запускает периодический пересчет"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Останавливает задачу и пересчитывает оставшиеся отметки"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Возвращает метрики пересчета"""
+        return dict(self.metrics, pending=len(self._dirty))
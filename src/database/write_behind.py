@@ -0,0 +1,319 @@
+"""
+Отложенная пакетная запись сообщений и ответов бота в базу данных
+"""
+import asyncio
+import itertools
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..config.logging_config import get_logger
+from ..utils.serialization import json_dumps
+from ..utils.spool import Spool
+
+logger = get_logger("write_behind")
+
+
+class MessageRef:
+    """
+    Ссылка на сообщение, поставленное в очередь записи
+
+    Пока сообщение не записано, `id` равен None. Ответы бота ссылаются на
+    MessageRef, а внешний ключ разрешается уже при записи пачки.
+    Сообщение, отложенное в файл, получает `spool_key`, по которому
+    к нему привязываются ответы при повторной записи.
+    """
+    __slots__ = ('id', 'enqueued_at', 'committed_at', 'persisted_at', 'failed', 'spool_key')
+
+    def __init__(self):
+        self.id: Optional[int] = None
+        self.enqueued_at = time.monotonic()
+        self.committed_at: Optional[float] = None
+        self.persisted_at: Optional[datetime] = None  # Время записи в БД (UTC)
+        self.failed = False
+        self.spool_key: Optional[str] = None
+
+
+class WriteBehindQueue:
+    """
+    Очередь отложенной записи с фоновым сбросом по размеру или интервалу.
+
+    Если задан spool, пачки, которые не удалось записать (например, база
+    недоступна при остановке), откладываются в файл, а не теряются, и
+    возвращаются в очередь методом replay() при следующем запуске.
+    """
+
+    def __init__(self, db_manager, batch_size: int = 100, flush_interval: float = 0.5,
+                 max_pending: int = 10000, spool: Optional[Spool] = None):
+        """
+        Инициализация очереди
+
+        Args:
+            db_manager: Менеджер базы данных
+            batch_size: Максимальный размер пачки (и порог досрочного сброса)
+            flush_interval: Интервал фонового сброса в секундах
+            max_pending: Максимальное число строк в очереди, сверх него строки отбрасываются
+            spool: Файл для строк, которые не удалось записать
+        """
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.spool = spool
+        # Ключи отложенных сообщений уникальны между запусками
+        self._spool_keys = (f"{os.getpid()}-{int(time.time())}-{n}" for n in itertools.count())
+        self._pending: List[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.metrics = {
+            'messages_enqueued': 0,
+            'responses_enqueued': 0,
+            'messages_written': 0,
+            'responses_written': 0,
+            'rows_dropped': 0,
+            'rows_spooled': 0,
+            'rows_replayed': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'last_batch_size': 0,
+            'last_flush_ms': 0,
+            'max_flush_ms': 0,
+            'last_lag_ms': 0,
+            'max_lag_ms': 0
+        }
+
+    def start(self):
+        """Запускает фоновую задачу сброса"""
+        if self._task:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Отложенная запись запущена (пачка {self.batch_size}, интервал {self.flush_interval}с)")
+
+    async def stop(self):
+        """Останавливает фоновую задачу и записывает все оставшиеся строки"""
+        if not self._task:
+            return
+        self._running = False
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+        logger.info("Отложенная запись остановлена")
+
+    def enqueue_message(self, row: Dict[str, Any]) -> Optional[MessageRef]:
+        """
+        Ставит сообщение в очередь записи
+
+        Args:
+            row: Строка сообщения для DatabaseManager.save_batch
+
+        Returns:
+            MessageRef or None: Ссылка на сообщение или None, если очередь переполнена
+        """
+        if len(self._pending) >= self.max_pending:
+            self.metrics['rows_dropped'] += 1
+            logger.warning("Очередь записи переполнена, сообщение отброшено")
+            return None
+        ref = MessageRef()
+        self._pending.append(('message', ref, row))
+        self.metrics['messages_enqueued'] += 1
+        self._notify()
+        return ref
+
+    def enqueue_response(self, original: MessageRef, row: Dict[str, Any]) -> bool:
+        """
+        Ставит ответ бота в очередь записи
+
+        Args:
+            original: Ссылка на исходное сообщение
+            row: Строка ответа без original_message_id
+
+        Returns:
+            bool: True если ответ принят в очередь
+        """
+        # Ответ на отложенное в файл сообщение откладывается вслед за ним
+        if (original.failed and not original.spool_key) or len(self._pending) >= self.max_pending:
+            self.metrics['rows_dropped'] += 1
+            return False
+        self._pending.append(('response', original, row))
+        self.metrics['responses_enqueued'] += 1
+        self._notify()
+        return True
+
+    def _notify(self):
+        """Будит фоновую задачу, если набралась полная пачка"""
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        """Фоновый цикл сброса"""
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка фонового сброса очереди записи: {e}")
+
+    async def flush(self):
+        """Записывает все накопленные строки пачками"""
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                await self._write(batch)
+
+    async def _write(self, batch: List[tuple]):
+        """Записывает одну пачку в пуле потоков, не блокируя цикл событий"""
+        messages, message_refs, responses = [], [], []
+        batch_indexes = {}
+        # Ответы на сообщения, отложенные прошлыми пачками, сразу уходят в файл вслед за ними;
+        # при ошибке записи в файл откладываются только строки, ушедшие в базу
+        spooled, written = [], []
+        persisted_at = datetime.utcnow()
+        for item in batch:
+            kind, ref, row = item
+            if kind == 'message':
+                batch_indexes[ref] = len(messages)
+                messages.append(row)
+                message_refs.append(ref)
+            elif ref.id is not None:
+                responses.append(dict(row, original_message_id=ref.id, persisted_at=ref.persisted_at))
+            elif ref in batch_indexes:
+                responses.append(dict(row, original_message_index=batch_indexes[ref],
+                                      persisted_at=persisted_at))
+            elif ref.spool_key:
+                spooled.append(item)
+                continue
+            else:
+                # Исходное сообщение не записано - ответ сохранить не к чему
+                self.metrics['rows_dropped'] += 1
+                continue
+            written.append(item)
+
+        if spooled:
+            self._spool(spooled)
+        if not messages and not responses:
+            return
+
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            message_ids = await loop.run_in_executor(None, self._save, messages, responses)
+        except Exception as e:
+            self.metrics['failed_flushes'] += 1
+            for ref in message_refs:
+                ref.failed = True
+            if self.spool and self._spool(written):
+                logger.error(f"Пачка из {len(written)} строк не записана и отложена в {self.spool.path}: {e}")
+            else:
+                logger.error(f"Пачка из {len(written)} строк не записана: {e}")
+            return
+
+        finished = time.monotonic()
+        for ref, message_id in zip(message_refs, message_ids):
+            ref.id = message_id
+            ref.committed_at = finished
+            ref.persisted_at = persisted_at
+
+        oldest = min((ref.enqueued_at for _, ref, _ in batch), default=finished)
+        flush_ms = int((finished - started) * 1000)
+        lag_ms = int((finished - oldest) * 1000)
+        self.metrics['flushes'] += 1
+        self.metrics['messages_written'] += len(messages)
+        self.metrics['responses_written'] += len(responses)
+        self.metrics['last_batch_size'] = len(batch)
+        self.metrics['last_flush_ms'] = flush_ms
+        self.metrics['max_flush_ms'] = max(self.metrics['max_flush_ms'], flush_ms)
+        self.metrics['last_lag_ms'] = lag_ms
+        self.metrics['max_lag_ms'] = max(self.metrics['max_lag_ms'], lag_ms)
+
+    def _spool(self, batch: List[tuple]) -> bool:
+        """Откладывает строки пачки в файл; ответы без записанного или отложенного сообщения теряются"""
+        records = []
+        # Ключи присваиваются ссылкам только после успешной записи файла
+        keys = {}
+        for kind, ref, row in batch:
+            if kind == 'message':
+                keys[ref] = ref.spool_key or next(self._spool_keys)
+                row = dict(row)
+                record = {'kind': 'message', 'key': keys[ref], 'row': row}
+                raw_data = row.pop('raw_data', None)
+                if raw_data is not None:
+                    # Значение колонки в том виде, в каком его записала бы база (CompressedJSON - сжатым)
+                    record['raw_data'] = json_dumps(raw_data)
+                records.append(record)
+            elif ref.id is not None:
+                records.append({'kind': 'response', 'original_id': ref.id,
+                                'persisted_at': ref.persisted_at, 'row': row})
+            elif ref in keys or ref.spool_key:
+                records.append({'kind': 'response', 'message_key': keys.get(ref) or ref.spool_key, 'row': row})
+            else:
+                self.metrics['rows_dropped'] += 1
+        try:
+            self.metrics['rows_spooled'] += self.spool.append(records)
+        except Exception as e:
+            self.metrics['rows_dropped'] += len(records)
+            logger.error(f"Не удалось отложить строки в {self.spool.path}: {e}")
+            return False
+        for ref, key in keys.items():
+            ref.spool_key = key
+        return True
+
+    def replay(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Возвращает в очередь строки, отложенные при прошлой остановке
+
+        Args:
+            records: Записи файла с kind message или response
+
+        Returns:
+            int: Количество строк, поставленных в очередь
+        """
+        refs: Dict[str, MessageRef] = {}
+        replayed = 0
+        for record in records:
+            if record.get('kind') == 'message':
+                row = record['row']
+                if 'raw_data' in record:
+                    row = dict(row, raw_data=json.loads(record['raw_data']))
+                ref = self.enqueue_message(row)
+                if ref:
+                    refs[record['key']] = ref
+                    replayed += 1
+            elif record.get('kind') == 'response':
+                if 'original_id' in record:
+                    ref = MessageRef()
+                    ref.id = record['original_id']
+                    ref.persisted_at = record.get('persisted_at')
+                else:
+                    ref = refs.get(record.get('message_key'))
+                if ref and self.enqueue_response(ref, record['row']):
+                    replayed += 1
+        self.metrics['rows_replayed'] += replayed
+        return replayed
+
+    def _save(self, messages: List[Dict[str, Any]], responses: List[Dict[str, Any]]) -> List[int]:
+        """Синхронная запись пачки (выполняется в пуле потоков)"""
+        session = self.db_manager.get_session()
+        try:
+            return self.db_manager.save_batch(session, messages, responses)
+        finally:
+            self.db_manager.close_session(session)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Возвращает метрики очереди, включая текущую глубину и задержку"""
+        metrics = dict(self.metrics)
+        metrics['pending'] = len(self._pending)
+        metrics['pending_lag_ms'] = (
+            int((time.monotonic() - self._pending[0][1].enqueued_at) * 1000)
+            if self._pending else 0
+        )
+        return metrics
@@ -0,0 +1,283 @@
+"""
+Супервизор процессов-обработчиков с распределением чатов по кольцу хэшей
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from .bot_manager import BotManager
+from .config.settings import ConfigError, config
+from .config.logging_config import get_logger, setup_logging
+from .database.database import db_manager as shared_db_manager, escape_like
+from .utils.hash_ring import HashRing
+
+logger = get_logger("supervisor")
+
+
+def worker_name(index: int) -> str:
+    """Имя узла кольца для процесса-обработчика"""
+    return f"worker-{index}"
+
+
+def run_worker(index: int, bot_types: List[str], chats: List[str], session_name: str):
+    """
+    Точка входа процесса-обработчика
+
+    Запускает боты для своей доли чатов в собственном цикле событий
+    и корректно останавливает их по SIGTERM.
+
+    Args:
+        index: Номер процесса
+        bot_types: Типы ботов
+        chats: Чаты этого процесса
+        session_name: Префикс сессий этого процесса
+    """
+    setup_logging()
+    worker_logger = get_logger(f"supervisor.{worker_name(index)}")
+
+    async def main():
+        # Каждый процесс слушает свой порт статистики: STATS_API_PORT + 1 + номер
+        stats_port = config.STATS_API_PORT + 1 + index if config.STATS_API_PORT else 0
+        manager = BotManager(session_name=session_name, chats=chats, stats_port=stats_port)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, lambda: asyncio.ensure_future(manager.stop_all()))
+        worker_logger.info(f"Запуск для {len(chats)} чатов: {', '.join(chats)}")
+        await manager.run_bots(bot_types)
+
+    asyncio.run(main())
+
+
+class Supervisor:
+    """
+    Запускает N процессов-обработчиков и следит за ними.
+
+    Чаты распределяются по процессам согласованным хэшированием, поэтому
+    при изменении числа процессов переезжает минимум чатов, и перезапускаются
+    только процессы, у которых изменился набор чатов. Упавший процесс
+    перезапускается с экспоненциальной паузой. Каждый процесс пишет свою
+    статистику в bot_sessions под именем с суффиксом _w<N>.
+
+    Процесс не может ввести код входа, поэтому файлы сессий читателя
+    <префикс>_w<N>_reader.session должны существовать до запуска процесса:
+    без них супервизор не запускается и не меняет число процессов.
+    """
+
+    def __init__(self, bot_types: List[str], chats: List[str], workers: int = 2,
+                 session_name: Optional[str] = None, replicas: int = 100,
+                 max_restart_delay: float = 60.0, check_interval: float = 1.0,
+                 process_factory: Optional[Callable[..., multiprocessing.Process]] = None,
+                 db_manager=None, session_dir: Optional[str] = None, require_sessions: bool = True):
+        """
+        Args:
+            bot_types: Типы ботов для каждого процесса
+            chats: Все обслуживаемые чаты
+            workers: Число процессов
+            session_name: Префикс сессий (процесс N использует <префикс>_w<N>)
+            replicas: Точек на узел в кольце хэшей
+            max_restart_delay: Предельная пауза перед перезапуском, секунд
+            check_interval: Период проверки процессов, секунд
+            process_factory: Фабрика процессов (по умолчанию multiprocessing spawn)
+            db_manager: Менеджер базы данных для bot_sessions (по умолчанию общий)
+            session_dir: Каталог файлов сессий (по умолчанию ./sessions)
+            require_sessions: Проверять наличие файлов сессий перед запуском процессов
+        """
+        self.bot_types = bot_types
+        self.chats = list(chats)
+        self.session_name = session_name or config.BOT_SESSION_NAME
+        self.replicas = replicas
+        self.max_restart_delay = max_restart_delay
+        self.check_interval = check_interval
+        self.process_factory = process_factory or multiprocessing.get_context('spawn').Process
+        self.db_manager = db_manager if db_manager is not None else shared_db_manager
+        self.session_dir = session_dir or os.path.join(os.getcwd(), 'sessions')
+        self.require_sessions = require_sessions
+        self.workers = 0
+        self.assignments: Dict[int, List[str]] = {}
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.restarts: Dict[int, int] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._started_at: Dict[int, float] = {}
+        self._stopping = False
+        self._requested_workers: Optional[int] = None
+        self.resize(workers)
+
+    def plan(self, workers: int) -> Dict[int, List[str]]:
+        """
+        Распределяет чаты по процессам
+
+        Returns:
+            dict: Номер процесса -> его чаты (процессы без чатов не включаются)
+        """
+        ring = HashRing((worker_name(index) for index in range(workers)), replicas=self.replicas)
+        by_node = ring.assign(self.chats)
+        return {
+            index: by_node[worker_name(index)]
+            for index in range(workers) if worker_name(index) in by_node
+        }
+
+    def worker_session(self, index: int) -> str:
+        """Префикс сессий процесса"""
+        return f"{self.session_name}_w{index}"
+
+    def missing_sessions(self, indexes: Iterable[int]) -> List[str]:
+        """Сессии читателя процессов, для которых нет файла в session_dir"""
+        names = [f"{self.worker_session(index)}_reader" for index in indexes]
+        return [name for name in names if not os.path.exists(os.path.join(self.session_dir, f"{name}.session"))]
+
+    def resize(self, workers: int):
+        """
+        Меняет число процессов, перезапуская только затронутые
+
+        Args:
+            workers: Новое число процессов
+
+        Raises:
+            ConfigError: Для новых процессов нет файлов сессий
+        """
+        workers = max(1, workers)
+        new = self.plan(workers)
+        missing = self.missing_sessions(new) if self.require_sessions else []
+        if missing:
+            # Процесс запросил бы код входа и падал бы при каждом перезапуске
+            logger.error(f"Нет файлов сессий в {self.session_dir}: {', '.join(missing)}. "
+                         f"Выполните вход: python scripts/run_supervisor.py --workers {workers} --login")
+            raise ConfigError(f"Нет файлов сессий: {', '.join(missing)}")
+        old = self.assignments
+        moved = sum(1 for index, chats in new.items() for chat in chats if chat not in old.get(index, []))
+        self.workers = workers
+        self.assignments = new
+
+        affected = [index for index in sorted(set(old) | set(new)) if old.get(index) != new.get(index)]
+        self.stop_workers(affected)
+        for index in affected:
+            self.restarts.pop(index, None)
+            self._restart_at.pop(index, None)
+            if index in new:
+                self._restart_at[index] = 0.0
+        if old:
+            logger.info(f"Процессов: {workers}, переезжает чатов: {moved} из {len(self.chats)}")
+
+    def start_worker(self, index: int, now: Optional[float] = None):
+        """Запускает процесс-обработчик"""
+        process = self.process_factory(
+            target=run_worker,
+            args=(index, self.bot_types, self.assignments[index], self.worker_session(index)),
+            name=worker_name(index),
+            daemon=False
+        )
+        process.start()
+        self.processes[index] = process
+        self._started_at[index] = time.monotonic() if now is None else now
+        logger.info(f"Запущен {worker_name(index)} (pid {process.pid}): {', '.join(self.assignments[index])}")
+
+    def stop_worker(self, index: int, timeout: float = 30.0):
+        """Останавливает процесс: SIGTERM, затем принудительно по истечении timeout"""
+        self.stop_workers([index], timeout)
+
+    def stop_workers(self, indexes: Iterable[int], timeout: float = 30.0):
+        """
+        Останавливает несколько процессов: SIGTERM отправляется всем сразу,
+        затем общее ожидание не дольше timeout; не успевшие завершаются принудительно
+        """
+        processes = {index: self.processes.pop(index) for index in indexes if index in self.processes}
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for index, process in processes.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"{worker_name(index)} не остановился за {timeout}с, завершаем принудительно")
+                process.kill()
+                process.join()
+            logger.info(f"Остановлен {worker_name(index)}")
+
+    def check(self, now: Optional[float] = None):
+        """Перезапускает упавшие процессы и запускает ожидающие"""
+        now = time.monotonic() if now is None else now
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                # Процесс, проработавший дольше предельной паузы, считается стабильным
+                if now - self._started_at.get(index, now) > self.max_restart_delay:
+                    self.restarts.pop(index, None)
+                continue
+            del self.processes[index]
+            restarts = self.restarts.get(index, 0)
+            delay = min(self.max_restart_delay, 2 ** restarts)
+            self.restarts[index] = restarts + 1
+            self._restart_at[index] = now + delay
+            self._close_sessions(index)
+            logger.error(f"{worker_name(index)} завершился с кодом {process.exitcode}, "
+                         f"перезапуск через {delay}с (попытка {restarts + 1})")
+
+        for index, at in list(self._restart_at.items()):
+            if at <= now and index in self.assignments and index not in self.processes:
+                del self._restart_at[index]
+                self.start_worker(index, now)
+
+    def _close_sessions(self, index: int):
+        """Закрывает строки bot_sessions, оставшиеся от упавшего процесса"""
+        session = None
+        try:
+            session = self.db_manager.get_session()
+            # '_' в имени сессии - спецсимвол LIKE: без экранирования совпали бы чужие строки
+            for name in self.db_manager.get_bot_session_totals(
+                session, f"%:{escape_like(self.worker_session(index))}", active_only=True
+            ):
+                self.db_manager.close_bot_sessions(session, name)
+        except Exception as e:
+            logger.warning(f"Не удалось закрыть сессии {worker_name(index)}: {e}")
+        finally:
+            if session:
+                session.close()
+
+    def log_totals(self):
+        """Выводит сводку bot_sessions по процессам"""
+        session = None
+        try:
+            session = self.db_manager.get_session()
+            totals = self.db_manager.get_bot_session_totals(session, f"%:{escape_like(self.session_name + '_w')}%")
+        except Exception as e:
+            logger.warning(f"Не удалось получить статистику процессов: {e}")
+            return
+        finally:
+            if session:
+                session.close()
+        for name, summary in sorted(totals.items()):
+            logger.info(f"   {name}: {summary}")
+
+    def request_stop(self, *_):
+        """Останавливает цикл наблюдения (обработчик сигнала)"""
+        self._stopping = True
+
+    def request_resize(self, delta: int):
+        """Запрашивает изменение числа процессов; применяется в цикле наблюдения"""
+        self._requested_workers = max(1, (self._requested_workers or self.workers) + delta)
+
+    def run(self):
+        """Запускает процессы и наблюдает за ними до SIGTERM/SIGINT"""
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        # SIGUSR1/SIGUSR2 - добавить/убрать процесс без остановки остальных
+        signal.signal(signal.SIGUSR1, lambda *_: self.request_resize(1))
+        signal.signal(signal.SIGUSR2, lambda *_: self.request_resize(-1))
+
+        logger.info(f"Супервизор: {self.workers} процессов, {len(self.chats)} чатов, боты: {', '.join(self.bot_types)}")
+        try:
+            while not self._stopping:
+                if self._requested_workers is not None:
+                    workers, self._requested_workers = self._requested_workers, None
+                    try:
+                        self.resize(workers)
+                    except ConfigError:
+                        # Причина уже в логе; процессы продолжают работать в прежнем числе
+                        pass
+                self.check()
+                time.sleep(self.check_interval)
+        finally:
+            self.stop_workers(list(self.processes))
+            logger.info("Итоговая статистика процессов:")
+            self.log_totals()
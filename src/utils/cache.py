@@ -0,0 +1,123 @@
+"""
+Ограниченные кэши в памяти процесса
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+class LRUCache:
+    """
+    Кэш с ограниченным числом записей и вытеснением давно не использованных.
+
+    Потокобезопасен: используется как из цикла событий, так и из пула потоков.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        """
+        Args:
+            maxsize: Максимальное количество записей
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение и отмечает запись как недавно использованную"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Сохраняет значение, вытесняя самую старую запись при переполнении"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Удаляет запись"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Очищает кэш"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику попаданий"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class TTLCache(LRUCache):
+    """
+    LRU-кэш, записи которого устаревают через `ttl` секунд.
+
+    Устаревшая запись удаляется при обращении и считается промахом.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600.0):
+        """
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.expired = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение, если оно еще не устарело"""
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            with self._lock:
+                if self._data.get(key) is entry:
+                    del self._data[key]
+                # Попадание по устаревшей записи на деле промах
+                self.hits -= 1
+                self.misses += 1
+                self.expired += 1
+            return default
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Сохраняет значение со сроком жизни ttl"""
+        super().put(key, (time.monotonic() + self.ttl, value))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику попаданий"""
+        stats = super().get_stats()
+        stats['expired'] = self.expired
+        total = self.hits + self.misses
+        stats['hit_rate'] = round(self.hits / total, 4) if total else 0.0
+        return stats
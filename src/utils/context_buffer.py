@@ -0,0 +1,110 @@
+"""
+Последние сообщения переписки с пользователями в памяти процесса
+"""
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class ContextEntry:
+    """Сообщение в контексте переписки"""
+    text: str
+    timestamp: float
+    from_bot: bool = False
+
+
+class ContextBuffers:
+    """
+    Кольцевые буферы последних `size` сообщений на пару (чат, пользователь).
+
+    Общее число хранимых сообщений ограничено `max_messages`: при
+    переполнении вытесняются буферы пользователей, дольше всех не
+    писавших в чат. Длинные тексты обрезаются до `max_chars`, чтобы
+    предел памяти зависел только от настроек.
+    """
+
+    def __init__(self, size: int = 10, max_messages: int = 50000, max_chars: int = 500):
+        """
+        Args:
+            size: Сообщений на пользователя в чате
+            max_messages: Сообщений во всех буферах вместе
+            max_chars: Максимальная длина сохраняемого текста
+        """
+        self.size = size
+        self.max_messages = max_messages
+        self.max_chars = max_chars
+        self._buffers: OrderedDict = OrderedDict()
+        self._total = 0
+        self.evictions = 0
+
+    def add(self, chat_id: int, user_id: Optional[int], text: str,
+            from_bot: bool = False, timestamp: Optional[float] = None):
+        """
+        Добавляет сообщение в буфер пользователя
+
+        Args:
+            chat_id: Peer id чата
+            user_id: Id пользователя, с которым идет переписка
+            text: Текст сообщения
+            from_bot: Сообщение - ответ бота этому пользователю
+            timestamp: Время сообщения (по умолчанию - сейчас)
+        """
+        if self.size <= 0 or user_id is None:
+            return
+        key = (chat_id, user_id)
+        buffer: Optional[Deque[ContextEntry]] = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = deque(maxlen=self.size)
+        else:
+            self._buffers.move_to_end(key)
+        if len(buffer) < self.size:
+            self._total += 1
+        buffer.append(ContextEntry(text[:self.max_chars], timestamp or time.time(), from_bot))
+
+        while self._total > self.max_messages and len(self._buffers) > 1:
+            _, evicted = self._buffers.popitem(last=False)
+            self._total -= len(evicted)
+            self.evictions += 1
+
+    def get(self, chat_id: int, user_id: Optional[int], limit: Optional[int] = None) -> List[ContextEntry]:
+        """
+        Возвращает последние сообщения переписки, от старых к новым
+
+        Args:
+            chat_id: Peer id чата
+            user_id: Id пользователя
+            limit: Сколько последних сообщений вернуть (по умолчанию все)
+        """
+        buffer = self._buffers.get((chat_id, user_id))
+        if not buffer:
+            return []
+        entries = list(buffer)
+        return entries[-limit:] if limit else entries
+
+    def clear(self, chat_id: int, user_id: Optional[int] = None):
+        """Удаляет буфер пользователя или, без user_id, все буферы чата"""
+        keys = [(chat_id, user_id)] if user_id is not None else [key for key in self._buffers if key[0] == chat_id]
+        for key in keys:
+            buffer = self._buffers.pop(key, None)
+            if buffer:
+                self._total -= len(buffer)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает число буферов, сообщений и вытеснений"""
+        return {
+            'users': len(self._buffers),
+            'messages': self._total,
+            'max_messages': self.max_messages,
+            'evictions': self.evictions
+        }
+
+
+def format_context(entries: List[ContextEntry], bot_label: str = "Бот",
+                   user_label: str = "Пользователь") -> str:
+    """Форматирует контекст переписки для промпта LLM, по строке на сообщение"""
+    return "\n".join(f"{bot_label if entry.from_bot else user_label}: {entry.text}" for entry in entries)
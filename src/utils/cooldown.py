@@ -0,0 +1,122 @@
+"""
+Окна тишины для ответов на колесе таймеров
+"""
+import math
+import time
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+# Названия областей окон тишины для логов
+SCOPE_LABELS = {'user': 'пользователь', 'keyword': 'слово', 'chat': 'чат'}
+
+
+class CooldownWheel:
+    """
+    Множество ключей с истечением через `window` секунд.
+
+    Истечение хранится в колесе таймеров: ключ кладется в ячейку своего
+    тика истечения, и при продвижении времени просроченные ячейки
+    очищаются целиком. Память пропорциональна числу ключей, активных
+    в текущем окне, а не числу всех когда-либо встреченных.
+    """
+
+    def __init__(self, window: float, resolution: Optional[float] = None):
+        """
+        Args:
+            window: Длительность окна в секундах
+            resolution: Шаг колеса в секундах (по умолчанию window/64, не меньше 0.1)
+        """
+        self.window = window
+        self.resolution = resolution or max(0.1, window / 64)
+        self._span = max(1, math.ceil(window / self.resolution))
+        self._slots: List[Set[Hashable]] = [set() for _ in range(self._span + 1)]
+        self._expiry: Dict[Hashable, int] = {}
+        self._tick: Optional[int] = None
+
+    def _advance(self, now: float) -> int:
+        """Продвигает колесо до текущего тика, удаляя просроченные ключи"""
+        tick = int(now / self.resolution)
+        if self._tick is None:
+            self._tick = tick
+        steps = min(tick - self._tick, len(self._slots))
+        for step in range(1, steps + 1):
+            slot = self._slots[(self._tick + step) % len(self._slots)]
+            for key in slot:
+                # Ключ мог быть продлен и лежать еще и в более поздней ячейке
+                if self._expiry.get(key, tick + 1) <= tick:
+                    del self._expiry[key]
+            slot.clear()
+        self._tick = max(self._tick, tick)
+        return self._tick
+
+    def active(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """Проверяет, действует ли окно для ключа"""
+        tick = self._advance(time.monotonic() if now is None else now)
+        expiry = self._expiry.get(key)
+        return expiry is not None and expiry > tick
+
+    def touch(self, key: Hashable, now: Optional[float] = None):
+        """Открывает (или продлевает) окно для ключа"""
+        tick = self._advance(time.monotonic() if now is None else now)
+        expiry = tick + self._span
+        self._expiry[key] = expiry
+        self._slots[expiry % len(self._slots)].add(key)
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+class ReplyCooldowns:
+    """
+    Окна тишины для ответов: на пользователя в чате, на ключевое слово
+    в чате и на чат целиком. Окно 0 отключает соответствующую проверку.
+    """
+
+    def __init__(self, user_window: float = 0, keyword_window: float = 0, chat_window: float = 0):
+        """
+        Args:
+            user_window: Не отвечать одному пользователю в чате чаще, секунд
+            keyword_window: Не отвечать на одно ключевое слово в чате чаще, секунд
+            chat_window: Не отвечать в чат чаще, секунд
+        """
+        self._wheels: Dict[str, CooldownWheel] = {
+            scope: CooldownWheel(window)
+            for scope, window in (('user', user_window), ('keyword', keyword_window), ('chat', chat_window))
+            if window > 0
+        }
+        self.suppressed: Dict[str, int] = {scope: 0 for scope in self._wheels}
+
+    @staticmethod
+    def _keys(chat_id: int, user_id: Optional[int], keyword: str) -> Dict[str, Hashable]:
+        return {'user': (chat_id, user_id), 'keyword': (chat_id, keyword), 'chat': chat_id}
+
+    def check(self, chat_id: int, user_id: Optional[int], keyword: str,
+              now: Optional[float] = None) -> Optional[str]:
+        """
+        Проверяет окна тишины и при отсутствии блокировки открывает их
+
+        Returns:
+            str or None: Область, заблокировавшая ответ ('user', 'keyword',
+                'chat'), или None если отвечать можно
+        """
+        if not self._wheels:
+            return None
+        now = time.monotonic() if now is None else now
+        keys = self._keys(chat_id, user_id, keyword)
+        for scope, wheel in self._wheels.items():
+            if wheel.active(keys[scope], now):
+                self.suppressed[scope] += 1
+                return scope
+        for scope, wheel in self._wheels.items():
+            wheel.touch(keys[scope], now)
+        return None
+
+    def format_suppressed(self) -> str:
+        """Подавленные ответы по включенным областям, например 'пользователь: 3, слово: 2, чат: 0'"""
+        return ", ".join(f"{SCOPE_LABELS[scope]}: {count}" for scope, count in self.suppressed.items())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает количество подавленных ответов и активных окон по областям"""
+        return {
+            'suppressed': dict(self.suppressed),
+            'active': {scope: len(wheel) for scope, wheel in self._wheels.items()}
+        }
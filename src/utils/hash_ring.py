@@ -0,0 +1,73 @@
+"""
+Кольцо согласованного хэширования
+"""
+import bisect
+import hashlib
+from typing import Dict, Hashable, Iterable, List
+
+
+def _hash(value: str) -> int:
+    # md5 стабилен между процессами и запусками, в отличие от hash()
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Распределение ключей по узлам согласованным хэшированием.
+
+    Каждый узел занимает `replicas` точек на кольце; ключ принадлежит
+    узлу первой точки по часовой стрелке. При добавлении или удалении
+    узла переезжает только примерно 1/N ключей.
+    """
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 100):
+        """
+        Args:
+            nodes: Начальные узлы
+            replicas: Количество точек на узел (больше - равномернее)
+        """
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, Hashable] = {}
+        self.nodes: List[Hashable] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Hashable):
+        """Добавляет узел"""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            if point in self._owners:
+                continue
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: Hashable):
+        """Удаляет узел"""
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: self._owners[point] for point in self._points}
+
+    def get(self, key: str) -> Hashable:
+        """Возвращает узел, которому принадлежит ключ"""
+        if not self._points:
+            raise LookupError("В кольце нет узлов")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def assign(self, keys: Iterable[str]) -> Dict[Hashable, List[str]]:
+        """
+        Распределяет ключи по узлам
+
+        Returns:
+            dict: Узел -> его ключи (узлы без ключей не включаются)
+        """
+        result: Dict[Hashable, List[str]] = {}
+        for key in keys:
+            result.setdefault(self.get(key), []).append(key)
+        return result
@@ -0,0 +1,80 @@
+"""
+Ленивое создание глобальных объектов
+"""
+import threading
+from typing import Any, Callable, Optional
+
+
+class LazyProxy:
+    """
+    Заместитель глобального объекта, создаваемого при первом обращении.
+
+    Модуль экспортирует заместитель вместо готового объекта, поэтому импорт
+    не читает окружение, не подключается к базе и не создает файлов.
+    Обращения к атрибутам передаются объекту, который создается фабрикой
+    один раз (потокобезопасно). Явная инициализация с параметрами -
+    lazy_init(); заместитель при этом остается тем же, и все ранее
+    импортированные ссылки видят новый объект.
+    """
+
+    __slots__ = ('_factory', '_instance', '_lock', '_name')
+
+    def __init__(self, factory: Callable[..., Any], name: Optional[str] = None):
+        """
+        Args:
+            factory: Функция или класс, создающий объект
+            name: Имя для repr и сообщений
+        """
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, '_name', name or getattr(factory, '__name__', 'object'))
+
+    def lazy_get(self) -> Any:
+        """Возвращает объект, создавая его при первом вызове"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def lazy_init(self, *args, **kwargs) -> Any:
+        """Создает (или пересоздает) объект с заданными параметрами"""
+        with self._lock:
+            instance = self._factory(*args, **kwargs)
+            object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def lazy_reset(self):
+        """Сбрасывает объект; следующее обращение создаст его заново"""
+        with self._lock:
+            object.__setattr__(self, '_instance', None)
+
+    @property
+    def lazy_initialized(self) -> bool:
+        """Создан ли объект"""
+        return self._instance is not None
+
+    def __getattr__(self, name: str) -> Any:
+        # Служебные имена запрашивает интроспекция (hasattr, inspect, pytest):
+        # они не должны создавать объект
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        return getattr(self.lazy_get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self.lazy_get(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self.lazy_get(), name)
+
+    def __str__(self) -> str:
+        return str(self.lazy_get())
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<LazyProxy {self._name} (не создан)>"
+        return repr(self._instance)
@@ -0,0 +1,227 @@
+"""
+Неблокирующий вывод логов и ограничение частых сообщений
+
+Модуль использует только стандартную библиотеку, чтобы его можно было
+подключать и из ботов, и из скриптов, и из casting-monitor (там src
+монтируется как /app/src_modules и модуль импортируется как utils.log_pipeline).
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# Фоновые потоки записи по имени логгера ('root' - корневой)
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+_listeners_lock = threading.Lock()
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ['true', '1', 'yes']
+
+
+def queue_enabled() -> bool:
+    """Включена ли запись логов через очередь (LOG_QUEUE, по умолчанию да)"""
+    return _env_flag('LOG_QUEUE', 'true')
+
+
+def start_queue_logging(logger: logging.Logger) -> logging.handlers.QueueListener:
+    """
+    Переносит обработчики логгера в фоновый поток
+
+    На логгере остается один QueueHandler: вызов logger.info() только
+    форматирует запись и кладет ее в очередь, а запись в консоль и файлы
+    (включая ротацию) выполняет поток QueueListener.
+
+    Args:
+        logger: Логгер с уже настроенными обработчиками
+
+    Returns:
+        QueueListener: Запущенный поток записи
+    """
+    stop_queue_logging(logger.name)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.listener = listener
+    # Новый список, а не очистка на месте: logging может перебирать текущий
+    logger.handlers = [queue_handler]
+    listener.start()
+    with _listeners_lock:
+        _listeners[logger.name] = listener
+    return listener
+
+
+def stop_queue_logging(name: Optional[str] = None):
+    """
+    Останавливает поток записи, дописав накопленные записи
+
+    Args:
+        name: Имя логгера ('root' - корневой); None - все потоки
+    """
+    with _listeners_lock:
+        if name is None:
+            listeners = list(_listeners.values())
+            _listeners.clear()
+        else:
+            listener = _listeners.pop(name, None)
+            listeners = [listener] if listener else []
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # Поток вывода уже закрыт (например, при завершении процесса)
+                pass
+
+
+atexit.register(stop_queue_logging)
+
+
+def configure_logging(level: str = "INFO", log_file: Optional[str] = None,
+                      logger_name: Optional[str] = None, use_queue: Optional[bool] = None,
+                      fmt: str = DEFAULT_FORMAT) -> logging.Logger:
+    """
+    Настраивает вывод логов для скрипта или отдельного сервиса
+
+    Замена logging.basicConfig(): консоль и (по желанию) файл с ротацией,
+    по умолчанию через фоновый поток.
+
+    Args:
+        level: Уровень логирования
+        log_file: Путь к файлу лога (None - только консоль)
+        logger_name: Имя настраиваемого логгера (None - корневой)
+        use_queue: Писать через очередь (по умолчанию LOG_QUEUE)
+        fmt: Формат записи
+
+    Returns:
+        logging.Logger: Настроенный логгер
+    """
+    logger = logging.getLogger(logger_name)
+    log_level = getattr(logging, level.upper(), logging.INFO)
+    logger.setLevel(log_level)
+    formatter = logging.Formatter(fmt, datefmt=DEFAULT_DATEFMT)
+
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=10*1024*1024, backupCount=5, encoding='utf-8'
+        ))
+    for handler in handlers:
+        handler.setLevel(log_level)
+        handler.setFormatter(formatter)
+    logger.handlers = handlers
+
+    if queue_enabled() if use_queue is None else use_queue:
+        start_queue_logging(logger)
+    return logger
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает частоту записей из одного места кода.
+
+    Для каждой строки вызова (файл и номер строки) действует ведро токенов:
+    не больше `per_second` записей в секунду с запасом `burst`. Число
+    отброшенных записей дописывается к следующей пропущенной.
+    """
+
+    def __init__(self, per_second: float = 5.0, burst: Optional[float] = None):
+        """
+        Args:
+            per_second: Записей в секунду из одного места
+            burst: Запас записей для всплеска (по умолчанию max(1, per_second))
+        """
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst if burst is not None else max(1.0, per_second)
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+        self._dropped: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.per_second)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                self._dropped[key] = self._dropped.get(key, 0) + 1
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            dropped = self._dropped.pop(key, 0)
+        if dropped:
+            _annotate(record, f"пропущено похожих: {dropped}")
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Пропускает каждую `every`-ю запись из одного места кода (первая проходит всегда)"""
+
+    def __init__(self, every: int = 10):
+        """
+        Args:
+            every: Пропускать одну запись из скольких
+        """
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        if count % self.every:
+            return False
+        if self.every > 1:
+            _annotate(record, f"1 из {self.every}")
+        return True
+
+
+def _annotate(record: logging.LogRecord, note: str):
+    """Дописывает пометку к тексту записи"""
+    record.msg = f"{record.getMessage()} ({note})"
+    record.args = ()
+
+
+def get_throttled_logger(logger: logging.Logger, per_second: Optional[float] = None,
+                         sample: Optional[int] = None) -> logging.Logger:
+    """
+    Возвращает дочерний логгер для записей на каждое сообщение
+
+    Записи дочернего логгера проходят через выборку и ограничение частоты,
+    а затем обрабатываются обработчиками родителя как обычно.
+
+    Args:
+        logger: Родительский логгер модуля
+        per_second: Записей в секунду из одного места (по умолчанию
+            LOG_MESSAGE_RATE, 0 - без ограничения)
+        sample: Писать одну запись из скольких (по умолчанию LOG_MESSAGE_SAMPLE)
+
+    Returns:
+        logging.Logger: Логгер <имя>.messages
+    """
+    child = logging.getLogger(f"{logger.name}.messages")
+    if per_second is None:
+        per_second = float(os.getenv('LOG_MESSAGE_RATE', '5'))
+    if sample is None:
+        sample = int(os.getenv('LOG_MESSAGE_SAMPLE', '1'))
+    for existing in [f for f in child.filters if isinstance(f, (RateLimitFilter, SampleFilter))]:
+        child.removeFilter(existing)
+    # Сначала выборка, затем ограничение частоты
+    if sample > 1:
+        child.addFilter(SampleFilter(sample))
+    if per_second > 0:
+        child.addFilter(RateLimitFilter(per_second))
+    return child
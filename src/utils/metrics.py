@@ -0,0 +1,90 @@
+"""
+Гистограммы задержек в памяти процесса
+"""
+import math
+import threading
+from typing import Any, Dict, List
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек в миллисекундах с логарифмическими корзинами.
+
+    Память постоянна (около 300 счетчиков) независимо от числа измерений,
+    относительная погрешность перцентилей - не более `precision`.
+    """
+
+    def __init__(self, max_ms: float = 600000.0, precision: float = 0.05):
+        """
+        Args:
+            max_ms: Верхняя граница измерений, большие значения попадают в последнюю корзину
+            precision: Относительная ширина корзины
+        """
+        self._log_base = math.log1p(precision)
+        self._buckets: List[int] = [0] * (self._bucket_index(max_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket_index(self, value_ms: float) -> int:
+        if value_ms <= 1:
+            return 0
+        return int(math.log(value_ms) / self._log_base) + 1
+
+    def _bucket_value(self, index: int) -> float:
+        if index == 0:
+            return 1.0
+        return math.exp(index * self._log_base)
+
+    def record(self, value_ms: float):
+        """Добавляет измерение"""
+        value_ms = max(0.0, value_ms)
+        index = min(self._bucket_index(value_ms), len(self._buckets) - 1)
+        self._buckets[index] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, q: float) -> float:
+        """Возвращает перцентиль q (0..100)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, bucket in enumerate(self._buckets):
+            seen += bucket
+            if seen >= rank:
+                return min(self._bucket_value(index), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Сводка: количество, среднее, p50/p95/p99 и максимум"""
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 1) if self.count else 0.0,
+            'p50': round(self.percentile(50), 1),
+            'p95': round(self.percentile(95), 1),
+            'p99': round(self.percentile(99), 1),
+            'max': round(self.max, 1)
+        }
+
+
+class LatencyStats:
+    """Набор именованных гистограмм задержек по этапам обработки"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, value_ms: float):
+        """Добавляет измерение этапа"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram())
+        histogram.record(value_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Сводка по всем этапам"""
+        return {stage: histogram.snapshot() for stage, histogram in self._histograms.items()}
@@ -2,6 +2,8 @@
 Модуль для проверки прав бота в чатах
 """
 from telethon import TelegramClient
+from telethon.errors import UserNotParticipantError
+from telethon.tl.types import User
 from ..config.logging_config import get_logger
 
 logger = get_logger("permissions")
@@ -11,6 +13,9 @@ async def check_bot_permissions(bot_client: TelegramClient, chat_username: str)
     """
     Проверяет права бота в указанном чате
     
+    Права читаются запросом участника (get_permissions), без отправки
+    тестового сообщения в чат.
+    
     Args:
         bot_client: Клиент Telegram бота
         chat_username: Имя чата/канала/группы
@@ -22,26 +27,65 @@ async def check_bot_permissions(bot_client: TelegramClient, chat_username: str)
         # Получаем информацию о чате
         chat = await bot_client.get_entity(chat_username)
         logger.info(f"Чат найден: {chat.title if hasattr(chat, 'title') else chat_username}")
-        
-        # Проверяем, может ли бот отправлять сообщения
-        try:
-            await bot_client.send_message(chat_username, "🔍 Проверка прав бота...")
-            logger.info("Бот может отправлять сообщения в чат")
-            return True
-        except Exception as e:
-            if "You can't write in this chat" in str(e):
-                logger.error("Бот не может отправлять сообщения в чат")
-                logger.error("Необходимо:")
-                logger.error("   1. Добавить бота в канал/группу как администратора")
-                logger.error("   2. Дать боту права на отправку сообщений")
-                return False
-            else:
-                logger.error(f"Ошибка при проверке прав: {e}")
-                return False
     except Exception as e:
         logger.error(f"Ошибка при получении информации о чате: {e}")
         logger.error("Проверьте правильность имени канала/группы")
         return False
+    
+    # В личный чат писать можно всегда
+    if isinstance(chat, User):
+        return True
+    
+    try:
+        permissions = await bot_client.get_permissions(chat, 'me')
+    except UserNotParticipantError:
+        logger.error("Бот не является участником чата")
+        _log_permission_hint()
+        return False
+    except Exception as e:
+        logger.error(f"Ошибка при проверке прав: {e}")
+        return False
+    
+    if can_send_messages(chat, permissions):
+        logger.info("Бот может отправлять сообщения в чат")
+        return True
+    
+    logger.error("Бот не может отправлять сообщения в чат")
+    _log_permission_hint()
+    return False
+
+
+def can_send_messages(chat, permissions) -> bool:
+    """
+    Определяет право отправки сообщений по правам участника
+    
+    Args:
+        chat: Сущность чата (Chat или Channel)
+        permissions: Результат client.get_permissions(chat, 'me')
+        
+    Returns:
+        bool: True если участник может писать в чат
+    """
+    if permissions.has_left:
+        return False
+    if permissions.is_banned:
+        # Ограниченный участник: запрет отправки задан в banned_rights
+        rights = getattr(permissions.participant, 'banned_rights', None)
+        return not (rights and (rights.view_messages or rights.send_messages))
+    if getattr(chat, 'broadcast', False):
+        # В канал пишут только администраторы с правом публикации
+        return permissions.post_messages
+    if permissions.is_admin:
+        return True
+    default_rights = getattr(chat, 'default_banned_rights', None)
+    return not (default_rights and default_rights.send_messages)
+
+
+def _log_permission_hint():
+    """Подсказывает, как выдать права"""
+    logger.error("Необходимо:")
+    logger.error("   1. Добавить бота в канал/группу как администратора")
+    logger.error("   2. Дать боту права на отправку сообщений")
 
 
 def format_error_message(error: Exception, chat_username: str) -> str:
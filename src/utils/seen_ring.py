@@ -0,0 +1,114 @@
+"""
+Ограниченное множество уже обработанных сообщений
+"""
+import os
+import struct
+from typing import Any, Dict, List, Optional
+
+# Запись файла: chat_id и message_id как два знаковых 64-битных числа
+_RECORD = struct.Struct('<qq')
+
+
+class SeenRing:
+    """
+    Множество последних `capacity` ключей (chat_id, message_id).
+
+    Ключи хранятся кольцевым буфером плюс хэш-множеством: проверка и
+    добавление за O(1), самый старый ключ вытесняется при заполнении.
+    Пара упаковывается в одно целое, чтобы не держать кортеж на запись.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        """
+        Args:
+            capacity: Максимальное количество запоминаемых сообщений
+        """
+        self.capacity = capacity
+        self._ring: List[Optional[int]] = [None] * capacity
+        self._position = 0
+        self._seen = set()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(chat_id: int, message_id: int) -> int:
+        # message_id в Telegram - 32-битный, поэтому упаковка однозначна
+        return (chat_id << 32) | (message_id & 0xFFFFFFFF)
+
+    @staticmethod
+    def _unpack(key: int) -> tuple:
+        return key >> 32, key & 0xFFFFFFFF
+
+    def _add_key(self, key: int):
+        evicted = self._ring[self._position]
+        if evicted is not None:
+            self._seen.discard(evicted)
+        self._ring[self._position] = key
+        self._seen.add(key)
+        self._position = (self._position + 1) % self.capacity
+
+    def check_and_add(self, chat_id: int, message_id: int) -> bool:
+        """
+        Отмечает сообщение как обработанное
+
+        Returns:
+            bool: True если сообщение уже встречалось (дубликат)
+        """
+        key = self._key(chat_id, message_id)
+        if key in self._seen:
+            self.hits += 1
+            return True
+        self.misses += 1
+        self._add_key(key)
+        return False
+
+    def __contains__(self, item: tuple) -> bool:
+        return self._key(*item) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _ordered_keys(self) -> List[int]:
+        """Ключи от самого старого к самому новому"""
+        ordered = self._ring[self._position:] + self._ring[:self._position]
+        return [key for key in ordered if key is not None]
+
+    def save(self, path: str):
+        """Атомарно сохраняет ключи в файл"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for key in self._ordered_keys():
+                f.write(_RECORD.pack(*self._unpack(key)))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        Добавляет ключи из файла, сохраненного методом save
+
+        Returns:
+            int: Количество прочитанных записей (0 если файла нет)
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            data = f.read()
+        count = 0
+        usable = len(data) - len(data) % _RECORD.size
+        for chat_id, message_id in _RECORD.iter_unpack(data[:usable]):
+            key = self._key(chat_id, message_id)
+            if key not in self._seen:
+                self._add_key(key)
+            count += 1
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику попаданий"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._seen),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,103 @@
+"""
+Сериализация сообщений Telegram для хранения в raw_data
+"""
+import base64
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+# Режимы сохранения raw_data
+RAW_DATA_NONE = 'none'
+RAW_DATA_FIELDS = 'fields'
+RAW_DATA_FULL = 'full'
+
+# Поля сообщения, сохраняемые в режиме 'fields' по умолчанию
+DEFAULT_MESSAGE_FIELDS = (
+    'id', 'date', 'edit_date', 'sender_id', 'chat_id', 'reply_to_msg_id',
+    'via_bot_id', 'grouped_id', 'views', 'forwards', 'post_author', 'media'
+)
+
+COMPRESSED_ENCODING = 'zlib+base64'
+
+
+class CompressedJSON(dict):
+    """
+    Значение JSON-колонки, которое сжимается при записи.
+
+    Сжатие выполняется в json_dumps, то есть в момент вставки строки
+    (в потоке отложенной записи), а не в обработчике сообщений.
+    """
+
+
+def _default(obj: Any) -> Any:
+    """Кодирует типы, которые json не умеет сериализовать сам"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(obj)).decode('ascii')
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Однопроходная сериализация в JSON с поддержкой datetime и bytes
+
+    Используется как json_serializer движка SQLAlchemy, поэтому дерево
+    to_dict() не нужно заранее обходить и переписывать.
+    """
+    if isinstance(obj, CompressedJSON):
+        packed = json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+        obj = {
+            'encoding': COMPRESSED_ENCODING,
+            'data': base64.b64encode(zlib.compress(packed.encode('utf-8'))).decode('ascii')
+        }
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_raw_data(value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Возвращает raw_data в исходном виде, распаковывая сжатое значение"""
+    if isinstance(value, dict) and value.get('encoding') == COMPRESSED_ENCODING:
+        return json.loads(zlib.decompress(base64.b64decode(value['data'])).decode('utf-8'))
+    return value
+
+
+def capture_message(message, mode: str = RAW_DATA_FULL,
+                    fields: Iterable[str] = DEFAULT_MESSAGE_FIELDS,
+                    compress: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Готовит raw_data сообщения в выбранном режиме
+
+    Args:
+        message: Сообщение Telethon
+        mode: 'none' - не сохранять, 'fields' - только перечисленные поля,
+            'full' - полный message.to_dict()
+        fields: Поля для режима 'fields'
+        compress: Сжимать значение при записи в базу
+
+    Returns:
+        dict or None: Данные для колонки raw_data
+    """
+    if mode == RAW_DATA_NONE:
+        return None
+
+    if mode == RAW_DATA_FIELDS:
+        data = {}
+        for field in fields:
+            value = getattr(message, field, None)
+            if value is None:
+                continue
+            if field == 'media':
+                # Сам объект медиа тяжелый, достаточно его типа
+                value = type(value).__name__
+            data[field] = value
+    elif hasattr(message, 'to_dict'):
+        data = message.to_dict()
+    else:
+        return None
+
+    return CompressedJSON(data) if compress else data
@@ -0,0 +1,83 @@
+"""
+Локальный файл для данных, не обработанных до остановки процесса
+"""
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List
+from ..config.logging_config import get_logger
+
+logger = get_logger("spool")
+
+_DATETIME = '__datetime__'
+
+
+def _encode(obj: Any) -> Any:
+    """Кодирует типы, которые json не умеет сериализовать сам; datetime восстанавливается при чтении"""
+    if isinstance(obj, datetime):
+        return {_DATETIME: obj.isoformat()}
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(obj)).decode('ascii')
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and _DATETIME in obj:
+        return datetime.fromisoformat(obj[_DATETIME])
+    return obj
+
+
+class Spool:
+    """
+    Записи в формате JSON Lines, переживающие перезапуск.
+
+    Процесс при остановке дописывает сюда то, что не успел отправить или
+    записать в базу данных, а при следующем запуске забирает записи
+    (take) и обрабатывает их заново. Каждая запись - словарь с полем kind.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Путь к файлу
+        """
+        self.path = path
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Дописывает записи и сбрасывает файл на диск
+
+        Returns:
+            int: Количество записанных записей
+        """
+        lines = [json.dumps(record, default=_encode, ensure_ascii=False) + '\n' for record in records]
+        if not lines:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(lines)
+
+    def take(self) -> List[Dict[str, Any]]:
+        """Читает все записи и удаляет файл"""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line, object_hook=_decode))
+                except ValueError:
+                    # Оборванная последняя строка при аварийной остановке
+                    logger.warning(f"Пропущена поврежденная строка {number} в {self.path}")
+        os.remove(self.path)
+        return records
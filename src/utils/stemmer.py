@@ -0,0 +1,150 @@
+"""
+Стемминг русских слов (алгоритм Snowball) для сопоставления ключевых слов
+"""
+import re
+from typing import Any, Dict, Optional, Tuple
+from .cache import LRUCache
+
+_VOWELS = frozenset('аеиоуыэюя')
+
+# Окончания алгоритма Snowball для русского языка. Окончания первой группы
+# удаляются, только если перед ними стоит "а" или "я".
+_PERFECTIVE_GERUND = (('в', 'вши', 'вшись'), ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+_ADJECTIVE = ((), ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым',
+                   'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею'))
+_PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+_REFLEXIVE = ((), ('ся', 'сь'))
+_VERB = (('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+         ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен',
+          'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'))
+_NOUN = ((), ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой',
+              'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь',
+              'ию', 'ью', 'ю', 'ия', 'ья', 'я'))
+_SUPERLATIVE = ((), ('ейше', 'ейш'))
+_DERIVATIONAL = ((), ('ость', 'ост'))
+
+
+def _prepare(groups: Tuple[Tuple[str, ...], Tuple[str, ...]]) -> Tuple[Tuple[str, bool], ...]:
+    """Окончания от длинных к коротким с признаком первой группы"""
+    endings = [(ending, True) for ending in groups[0]] + [(ending, False) for ending in groups[1]]
+    return tuple(sorted(endings, key=lambda item: -len(item[0])))
+
+
+_PERFECTIVE_GERUND = _prepare(_PERFECTIVE_GERUND)
+_ADJECTIVE = _prepare(_ADJECTIVE)
+_PARTICIPLE = _prepare(_PARTICIPLE)
+_REFLEXIVE = _prepare(_REFLEXIVE)
+_VERB = _prepare(_VERB)
+_NOUN = _prepare(_NOUN)
+_SUPERLATIVE = _prepare(_SUPERLATIVE)
+_DERIVATIONAL = _prepare(_DERIVATIONAL)
+
+
+def _strip(word: str, start: int, endings) -> Optional[str]:
+    """Удаляет первое подходящее окончание, лежащее не левее start"""
+    for ending, after_a in endings:
+        cut = len(word) - len(ending)
+        if cut < start or not word.endswith(ending):
+            continue
+        if after_a and (cut - 1 < start or word[cut - 1] not in 'ая'):
+            continue
+        return word[:cut]
+    return None
+
+
+def _regions(word: str) -> Tuple[int, int]:
+    """Начала областей RV и R2"""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in _VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i - 1] in _VOWELS and word[i] not in _VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in _VOWELS and word[i] not in _VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def stem(word: str) -> str:
+    """
+    Возвращает основу русского слова по алгоритму Snowball
+
+    Слово ожидается в нижнем регистре. Слова без русских гласных
+    (латиница, числа) возвращаются без изменений.
+    """
+    word = word.replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    # Шаг 1: деепричастие, иначе возвратная частица и прилагательное/глагол/существительное
+    result = _strip(word, rv, _PERFECTIVE_GERUND)
+    if result is None:
+        word = _strip(word, rv, _REFLEXIVE) or word
+        result = _strip(word, rv, _ADJECTIVE)
+        if result is not None:
+            result = _strip(result, rv, _PARTICIPLE) or result
+        else:
+            result = _strip(word, rv, _VERB)
+            if result is None:
+                result = _strip(word, rv, _NOUN)
+    if result is not None:
+        word = result
+
+    # Шаг 2: конечное "и"
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3: словообразовательное окончание в R2
+    word = _strip(word, r2, _DERIVATIONAL) or word
+
+    # Шаг 4: превосходная степень, двойное "н" и мягкий знак
+    word = _strip(word, rv, _SUPERLATIVE) or word
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        word = word[:-1]
+    elif word.endswith('ь') and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+_TOKEN = re.compile(r"\w+")
+
+
+class KeywordNormalizer:
+    """
+    Приводит текст к последовательности основ слов.
+
+    Результат обрамлен пробелами и разделен одиночными пробелами, поэтому
+    нормализованное ключевое слово находится в нормализованном тексте
+    только целыми словами и в любой словоформе с той же основой.
+    Основы кэшируются (LRU), так что частые слова стеммируются один раз.
+    """
+
+    def __init__(self, cache_size: int = 50000):
+        """
+        Args:
+            cache_size: Максимальное количество запоминаемых слов
+        """
+        self.cache = LRUCache(cache_size)
+
+    def stem(self, token: str) -> str:
+        """Возвращает основу слова из кэша или вычисляет ее"""
+        result = self.cache.get(token)
+        if result is None:
+            result = stem(token)
+            self.cache.put(token, result)
+        return result
+
+    def normalize(self, text: str) -> str:
+        """Возвращает основы слов текста через пробел, с пробелами по краям"""
+        stems = [self.stem(token) for token in _TOKEN.findall(text.lower())]
+        return f" {' '.join(stems)} " if stems else ''
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику кэша основ"""
+        return self.cache.get_stats()
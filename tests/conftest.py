@@ -0,0 +1,17 @@
+"""
+Общая настройка pytest: минимальное окружение для тестов
+"""
+import os
+
+# Тесты не подключаются к Telegram, но конфигурация требует эти переменные.
+# Уже заданные значения (из окружения или .env) не перезаписываются.
+TEST_ENV = {
+    'API_ID_TG': '1',
+    'API_HASH_TG': 'test',
+    'PHONE_NUMBER': '+10000000000',
+    'CHANNEL_USERNAME': '@test',
+    'BOT_TOKEN': '123:test',
+}
+
+for name, value in TEST_ENV.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Тесты одновременного запуска ботов через BotManager
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bot_manager import BotManager
+from src.bots.client_pool import ClientPool
+
+
+class MockClient:
+    def __init__(self, session_name):
+        self.session_name = session_name
+        self.disconnected = asyncio.get_running_loop().create_future()
+
+    async def disconnect(self):
+        if not self.disconnected.done():
+            self.disconnected.set_result(None)
+
+
+class MockPool(ClientPool):
+    def __init__(self):
+        super().__init__()
+        self.connects = 0
+
+    async def _connect(self, session_name, phone, bot_token):
+        self.connects += 1
+        await asyncio.sleep(0)
+        return MockClient(session_name)
+
+
+class MockBot:
+    fail = False
+
+    def __init__(self, session_name=None, client_pool=None):
+        self.name = type(self).__name__
+        self.session_name = session_name
+        self.client_pool = client_pool
+        self.reader_client = None
+        self.chat_refs = {1: '@chat'}
+        self.stopped = False
+
+    async def start(self):
+        self.reader_client = await self.client_pool.acquire(f'{self.session_name}_reader')
+        if self.fail:
+            raise RuntimeError("start failed")
+        return True
+
+    def register_handlers(self):
+        pass
+
+    def print_stats(self):
+        pass
+
+    async def stop(self):
+        self.stopped = True
+        if self.reader_client:
+            await self.client_pool.release(self.reader_client)
+            self.reader_client = None
+
+    async def drain(self, timeout=None):
+        await self.stop()
+
+
+class FailingBot(MockBot):
+    fail = True
+
+
+class TestBotManager(unittest.TestCase):
+    """Тесты для BotManager и ClientPool"""
+
+    def test_bots_share_clients_and_isolate_errors(self):
+        """Боты используют один клиент, ошибка запуска одного не мешает остальным"""
+        async def scenario():
+            pool = MockPool()
+            manager = BotManager(session_name='shared', pool=pool)
+            manager.bots = {'a': MockBot, 'b': type('OtherBot', (MockBot,), {}), 'bad': FailingBot}
+
+            runner = asyncio.create_task(manager.run_bots(['a', 'b', 'bad']))
+            while len(manager.running) < 2:
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            running = dict(manager.running)
+            self.assertEqual(set(running), {'a', 'b'})
+            self.assertIs(running['a'].reader_client, running['b'].reader_client)
+            self.assertEqual(pool.connects, 1)
+
+            client = running['a'].reader_client
+            await manager.stop_bot('a')
+            self.assertTrue(running['a'].stopped)
+            self.assertFalse(client.disconnected.done())
+
+            await manager.stop_all()
+            await runner
+            self.assertTrue(client.disconnected.done())
+            self.assertEqual(len(pool), 0)
+
+        asyncio.run(scenario())
+
+    def test_run_bots_returns_when_client_disconnects(self):
+        """Отключение общего клиента завершает run_bots и останавливает ботов"""
+        async def scenario():
+            manager = BotManager(session_name='shared', pool=MockPool())
+            manager.bots = {'a': MockBot}
+            runner = asyncio.create_task(manager.run_bots(['a']))
+            while not manager.running:
+                await asyncio.sleep(0)
+            bot = manager.running['a']
+            await bot.reader_client.disconnect()
+            await asyncio.wait_for(runner, timeout=1)
+            self.assertTrue(bot.stopped)
+            self.assertEqual(manager.running, {})
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
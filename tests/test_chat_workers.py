@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Тесты пула обработчиков по чатам
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots.chat_workers import ChatWorkerPool, OVERFLOW_DROP_NEWEST
+
+
+class TestChatWorkerPool(unittest.TestCase):
+    """Тесты для ChatWorkerPool"""
+
+    def test_order_within_chat_and_parallel_chats(self):
+        """Чат обрабатывается по порядку, медленный чат не задерживает другие"""
+        async def scenario():
+            handled = []
+            release_slow = asyncio.Event()
+
+            async def handler(item):
+                chat, number = item
+                if chat == 'slow':
+                    await release_slow.wait()
+                handled.append(item)
+
+            pool = ChatWorkerPool(handler, workers=4)
+            pool.submit('slow', ('slow', 1))
+            for number in range(5):
+                pool.submit('fast', ('fast', number))
+            await asyncio.sleep(0.01)
+            self.assertEqual(handled, [('fast', n) for n in range(5)])
+
+            pool.submit('slow', ('slow', 2))
+            release_slow.set()
+            await pool.join()
+            self.assertEqual(handled[5:], [('slow', 1), ('slow', 2)])
+            self.assertEqual(pool.get_stats()['processed'], 7)
+
+        asyncio.run(scenario())
+
+    def test_overflow_and_errors(self):
+        """Переполнение отбрасывает события по политике, ошибки не останавливают очередь"""
+        async def scenario():
+            handled = []
+
+            async def handler(item):
+                if item == 'bad':
+                    raise RuntimeError("boom")
+                handled.append(item)
+
+            oldest = ChatWorkerPool(handler, max_queue=2)
+            for item in ('bad', 'a', 'b', 'c'):
+                oldest.submit(1, item)
+            newest = ChatWorkerPool(handler, max_queue=2, overflow=OVERFLOW_DROP_NEWEST)
+            results = [newest.submit(2, item) for item in ('bad', 'x', 'y')]
+            await oldest.join()
+            await newest.join()
+            return handled, results, oldest.get_stats(), newest.get_stats()
+
+        handled, results, oldest_stats, newest_stats = asyncio.run(scenario())
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(sorted(handled), ['b', 'c', 'x'])
+        self.assertEqual(oldest_stats['dropped'], 2)
+        self.assertEqual(newest_stats['errors'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
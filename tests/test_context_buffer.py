@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Тесты контекста переписки в памяти
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots import SimpleResponder
+from src.bots.replay import ReplayHarness, FakeEvent, FakeMessage, FakeUser
+from src.database.database import DatabaseManager
+from src.utils.context_buffer import ContextBuffers, format_context
+
+
+class TestContextBuffers(unittest.TestCase):
+    """Тесты для ContextBuffers и BaseBot.get_context"""
+
+    def test_ring_keeps_last_messages(self):
+        """В буфере остаются последние size сообщений, длинные тексты обрезаются"""
+        context = ContextBuffers(size=3, max_chars=5)
+        for i in range(5):
+            context.add(1, 10, f"msg{i}-long")
+        self.assertEqual([entry.text for entry in context.get(1, 10)], ["msg2-", "msg3-", "msg4-"])
+        self.assertEqual([entry.text for entry in context.get(1, 10, limit=1)], ["msg4-"])
+        self.assertEqual(context.get(1, 11), [])
+        self.assertEqual(context.get_stats()['messages'], 3)
+
+    def test_global_cap_evicts_idle_users(self):
+        """При превышении общего предела вытесняются давно молчащие пользователи"""
+        context = ContextBuffers(size=2, max_messages=4)
+        for user_id in (1, 2):
+            context.add(100, user_id, "a")
+            context.add(100, user_id, "b")
+        context.add(100, 1, "c")  # пользователь 1 снова активен
+        context.add(100, 3, "d")
+        self.assertEqual(context.get(100, 2), [])
+        self.assertEqual(len(context.get(100, 1)), 2)
+        stats = context.get_stats()
+        self.assertEqual((stats['users'], stats['messages'], stats['evictions']), (2, 3, 1))
+
+        context.clear(100)
+        self.assertEqual(context.get_stats()['messages'], 0)
+
+    def test_bot_records_messages_and_replies(self):
+        """Бот кладет в контекст сообщения пользователя и свои ответы"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = DatabaseManager(f"sqlite:///{os.path.join(tmpdir, 'test.db')}")
+            db.create_tables()
+            harness = ReplayHarness(lambda chats: SimpleResponder(chats=chats), db,
+                                    global_rate=10000, chat_rate=10000)
+            chat_id = harness.chat_ids[0]
+            keyword = harness.keywords()[0]
+            user = FakeUser(42)
+            events = [FakeEvent(FakeMessage(1, chat_id, "просто текст", user)),
+                      FakeEvent(FakeMessage(2, chat_id, keyword, user))]
+
+            asyncio.run(harness.run(events))
+            db.engine.dispose()
+
+        entries = harness.bot.get_context(chat_id, 42)
+        self.assertEqual([entry.from_bot for entry in entries], [False, False, True])
+        self.assertEqual(entries[1].text, keyword)
+        self.assertTrue(format_context(entries).startswith("Пользователь: просто текст\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Тесты окон тишины ответов
+"""
+
+import os
+import sys
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.cooldown import CooldownWheel, ReplyCooldowns
+
+
+class TestCooldowns(unittest.TestCase):
+    """Тесты для CooldownWheel и ReplyCooldowns"""
+
+    def test_wheel_expires_and_frees_memory(self):
+        """Ключи истекают по окну и удаляются из памяти"""
+        wheel = CooldownWheel(window=10, resolution=1)
+        wheel.touch('a', now=100)
+        self.assertTrue(wheel.active('a', now=105))
+        wheel.touch('a', now=105)
+        self.assertTrue(wheel.active('a', now=112))
+        self.assertFalse(wheel.active('a', now=116))
+        for user in range(1000):
+            wheel.touch(user, now=200)
+        self.assertEqual(len(wheel), 1000)
+        wheel.active('b', now=1000)
+        self.assertEqual(len(wheel), 0)
+
+    def test_reply_cooldown_scopes(self):
+        """Пользовательское окно не мешает другим пользователям, подавления считаются"""
+        cooldowns = ReplyCooldowns(user_window=60, keyword_window=5)
+        self.assertIsNone(cooldowns.check(1, 10, "привет", now=0))
+        self.assertEqual(cooldowns.check(1, 10, "пока", now=10), 'user')
+        self.assertEqual(cooldowns.check(1, 11, "привет", now=1), 'keyword')
+        self.assertIsNone(cooldowns.check(1, 11, "привет", now=7))
+        self.assertIsNone(cooldowns.check(2, 10, "привет", now=8))
+        self.assertEqual(cooldowns.get_stats()['suppressed'], {'user': 1, 'keyword': 1})
+        self.assertEqual(cooldowns.format_suppressed(), "пользователь: 1, слово: 1")
+        self.assertIsNone(ReplyCooldowns().check(1, 10, "привет"))
+        self.assertEqual(ReplyCooldowns().format_suppressed(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Тесты DatabaseManager на SQLite
+"""
+
+import os
+import sys
+import tempfile
+import asyncio
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from src.database.database import DatabaseManager
+from datetime import datetime, timedelta
+from src.database.models import BotStats, User
+from src.database.stats_rollup import StatsRollup
+
+
+class TestUpsert(unittest.TestCase):
+    """Тесты upsert-методов с кэшем идентификаторов"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+        self.statements = []
+        event.listen(self.db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_cached_profile_skips_database(self):
+        """Повторный upsert с тем же профилем не обращается к базе"""
+        session = self.db.get_session()
+        try:
+            first = self.db.upsert_user(session, telegram_id=10, username="alice")
+            executed = len(self.statements)
+            second = self.db.upsert_user(session, telegram_id=10, username="alice")
+            self.assertEqual(first, second)
+            self.assertEqual(len(self.statements), executed)
+        finally:
+            session.close()
+
+    def test_profile_changes_are_written(self):
+        """Изменившийся профиль обновляется, пустые поля не затирают данные"""
+        session = self.db.get_session()
+        try:
+            user_id = self.db.upsert_user(session, telegram_id=10, username="alice", first_name="Alice")
+            self.assertEqual(self.db.upsert_user(session, telegram_id=10, username="alice2"), user_id)
+            self.db.user_id_cache.clear()
+            self.assertEqual(self.db.upsert_user(session, telegram_id=10), user_id)
+
+            user = session.query(User).filter(User.telegram_id == 10).one()
+            self.assertEqual(user.username, "alice2")
+            self.assertEqual(user.first_name, "Alice")
+            self.assertEqual(session.query(User).count(), 1)
+        finally:
+            session.close()
+
+    def test_uncommitted_ids_are_not_cached(self):
+        """ID из откаченной транзакции не попадают в кэш"""
+        session = self.db.get_session()
+        try:
+            self.db.upsert_user(session, telegram_id=20, username="bob", commit=False)
+            session.rollback()
+            self.assertNotIn(20, self.db.user_id_cache)
+        finally:
+            session.close()
+
+
+
+class TestStatsRollup(unittest.TestCase):
+    """Тесты дневных агрегатов bot_stats"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_rollup_is_idempotent_and_feeds_stats(self):
+        """Повторный пересчет обновляет ту же строку, get_chat_stats читает агрегаты"""
+        session = self.db.get_session()
+        try:
+            chat_id = self.db.upsert_chat(session, telegram_id=1, title="test")
+            messages = [
+                {'telegram_id': i, 'chat_id': chat_id, 'user_id': 10 + i % 2, 'text': f"m{i}"}
+                for i in range(4)
+            ]
+            responses = [
+                {'original_message_index': i, 'response_text': "ok", 'trigger_keyword': "привет",
+                 'response_time_ms': 100 * (i + 1)}
+                for i in range(2)
+            ]
+            self.db.save_batch(session, messages, responses)
+
+            now = datetime.utcnow()
+            self.db.rollup_stats(session, [(chat_id, now)])
+            self.db.rollup_stats(session, [(chat_id, now)])
+            row = session.query(BotStats).one()
+            self.assertEqual(row.total_messages, 4)
+            self.assertEqual(row.unique_users, 2)
+            self.assertEqual(row.bot_responses, 2)
+            self.assertEqual(row.response_time_avg, 150)
+            self.assertEqual(row.most_used_keywords, {"привет": 2})
+
+            stats = self.db.get_chat_stats(session, chat_id)
+            self.assertEqual(stats['total_messages'], 4)
+            self.assertEqual(stats['response_rate'], 50)
+            self.assertEqual(stats['top_keywords'], {"привет": 2})
+        finally:
+            session.close()
+
+    def test_window_counts_each_user_once(self):
+        """По умолчанию статистика за сегодня; за несколько дней пользователь учитывается один раз"""
+        session = self.db.get_session()
+        try:
+            chat_id = self.db.upsert_chat(session, telegram_id=1, title="test")
+            today = datetime.utcnow()
+            yesterday = today - timedelta(days=1)
+            self.db.save_batch(session, [
+                {'telegram_id': 1, 'chat_id': chat_id, 'user_id': 10, 'text': "a", 'created_at': yesterday},
+                {'telegram_id': 2, 'chat_id': chat_id, 'user_id': 10, 'text': "b", 'created_at': today},
+                {'telegram_id': 3, 'chat_id': chat_id, 'user_id': 11, 'text': "c", 'created_at': today},
+            ], [])
+            self.db.rollup_stats(session, [(chat_id, yesterday), (chat_id, today)])
+
+            self.assertEqual(self.db.get_chat_stats(session, chat_id)['total_messages'], 2)
+            week = self.db.get_chat_stats(session, chat_id, days=7)
+            self.assertEqual((week['total_messages'], week['unique_users']), (3, 2))
+        finally:
+            session.close()
+
+    def test_bot_stats_are_merged_into_row(self):
+        """Ключевые слова и время ответа из памяти бота прибавляются к строке при каждом пересчете"""
+        session = self.db.get_session()
+        chat_id = self.db.upsert_chat(session, telegram_id=1, title="test")
+        session.close()
+
+        async def scenario():
+            rollup = StatsRollup(self.db, interval=0)
+            rollup.record_response(chat_id, "привет", 100)
+            rollup.record_response(chat_id, "цена", 300)
+            await rollup.flush()
+            rollup.record_response(chat_id, "привет", 500)
+            await rollup.flush()
+            return rollup.get_metrics()
+
+        metrics = asyncio.run(scenario())
+        self.assertEqual((metrics['flushes'], metrics['errors']), (2, 0))
+        session = self.db.get_session()
+        try:
+            row = session.query(BotStats).one()
+            self.assertEqual(row.most_used_keywords, {"привет": 2, "цена": 1})
+            self.assertEqual(row.response_time_avg, 300)
+            self.assertEqual(row.timed_responses, 3)
+        finally:
+            session.close()
+
+    def test_merge_weights_average_by_timed_responses(self):
+        """Среднее полного пересчета взвешивается числом ответов, а не обрезанными ключевыми словами"""
+        session = self.db.get_session()
+        try:
+            chat_id = self.db.upsert_chat(session, telegram_id=1, title="test")
+            messages = [{'telegram_id': i, 'chat_id': chat_id, 'user_id': 10, 'text': f"m{i}"} for i in range(12)]
+            # 11 разных слов (в строку попадут 10) и ответ без слова
+            responses = [
+                {'original_message_index': i, 'response_text': "ok",
+                 'trigger_keyword': f"слово{i}" if i < 11 else None, 'response_time_ms': 100}
+                for i in range(12)
+            ]
+            self.db.save_batch(session, messages, responses)
+            day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            self.db.rollup_stats(session, [(chat_id, day)])
+            self.assertEqual(session.query(BotStats).one().timed_responses, 12)
+
+            self.db.rollup_stats(session, [(chat_id, day)], live={
+                (chat_id, day): {'keywords': {"слово0": 1}, 'responses': 1, 'response_ms': 1400}
+            })
+            session.expire_all()
+            row = session.query(BotStats).one()
+            self.assertEqual((row.response_time_avg, row.timed_responses), (200, 13))
+        finally:
+            session.close()
+
+if __name__ == "__main__":
+    unittest.main()
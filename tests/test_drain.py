@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Тесты плавной остановки и отложенных ответов и строк
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots import SimpleResponder
+from src.bots.replay import ReplayHarness, FakeEvent, FakeMessage, FakeUser
+from src.bots.send_scheduler import SendScheduler
+from src.database.database import DatabaseManager
+from src.database.models import BotResponse, Message
+from src.database.write_behind import WriteBehindQueue
+from src.utils.serialization import COMPRESSED_ENCODING, CompressedJSON, load_raw_data
+from src.utils.spool import Spool
+
+
+class BrokenDatabase:
+    """Менеджер базы данных, запись в которую всегда падает"""
+
+    def get_session(self):
+        return None
+
+    def close_session(self, session):
+        pass
+
+    def save_batch(self, session, messages, responses):
+        raise ConnectionError("база недоступна")
+
+
+class TestDrain(unittest.TestCase):
+    """Тесты для Spool, WriteBehindQueue.replay и BaseBot.drain"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+        self.spool_path = os.path.join(self.tmpdir.name, 'bot_spool.jsonl')
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_spool_round_trip(self):
+        """Записи переживают перезапуск, datetime восстанавливается, оборванная строка пропускается"""
+        spool = Spool(self.spool_path)
+        moment = datetime(2024, 5, 1, 12, 30)
+        spool.append([{'kind': 'reply', 'text': 'привет', 'at': moment}])
+        with open(self.spool_path, 'a', encoding='utf-8') as f:
+            f.write('{"kind": "rep')
+        self.assertEqual(spool.take(), [{'kind': 'reply', 'text': 'привет', 'at': moment}])
+        self.assertFalse(os.path.exists(self.spool_path))
+        self.assertEqual(spool.take(), [])
+
+    def test_failed_batch_is_spooled_and_replayed(self):
+        """Пачка, не записанная при остановке, записывается при следующем запуске вместе с ответами"""
+        session = self.db.get_session()
+        chat_id = self.db.upsert_chat(session, telegram_id=1, title="chat")
+        session.close()
+
+        async def first_run():
+            queue = WriteBehindQueue(BrokenDatabase(), spool=Spool(self.spool_path))
+            ref = queue.enqueue_message({'telegram_id': 10, 'chat_id': chat_id, 'text': 'помощь'})
+            await queue.flush()
+            # Ответ на уже отложенное сообщение откладывается вслед за ним
+            self.assertTrue(queue.enqueue_response(ref, {'response_text': 'ок', 'sent_at': datetime.utcnow()}))
+            await queue.flush()
+            return queue.get_metrics()
+
+        async def second_run():
+            queue = WriteBehindQueue(self.db)
+            replayed = queue.replay(Spool(self.spool_path).take())
+            await queue.flush()
+            return replayed
+
+        metrics = asyncio.run(first_run())
+        self.assertEqual((metrics['rows_spooled'], metrics['rows_dropped']), (2, 0))
+        self.assertEqual(asyncio.run(second_run()), 2)
+
+        session = self.db.get_session()
+        message = session.query(Message).one()
+        response = session.query(BotResponse).one()
+        self.assertEqual(response.original_message_id, message.id)
+        self.assertIsInstance(response.sent_at, datetime)
+        session.close()
+
+    def test_spooled_response_is_spooled_once(self):
+        """Ответ на отложенное сообщение не откладывается повторно вместе с упавшей пачкой"""
+        async def scenario():
+            queue = WriteBehindQueue(BrokenDatabase(), spool=Spool(self.spool_path))
+            ref = queue.enqueue_message({'telegram_id': 10, 'chat_id': 1, 'text': 'помощь'})
+            await queue.flush()
+            queue.enqueue_response(ref, {'response_text': 'ок', 'sent_at': datetime.utcnow()})
+            queue.enqueue_message({'telegram_id': 11, 'chat_id': 1, 'text': 'еще'})
+            await queue.flush()
+            return queue.get_metrics()
+
+        metrics = asyncio.run(scenario())
+        records = Spool(self.spool_path).take()
+        self.assertEqual([record['kind'] for record in records], ['message', 'response', 'message'])
+        self.assertEqual((metrics['rows_spooled'], metrics['rows_dropped']), (3, 0))
+
+    def test_unspooled_message_rejects_responses(self):
+        """Если файл не записан, сообщение не получает ключ и ответы на него отбрасываются"""
+        blocked_path = os.path.join(self.tmpdir.name, 'missing', 'bot_spool.jsonl')
+        open(os.path.join(self.tmpdir.name, 'missing'), 'w').close()
+
+        async def scenario():
+            queue = WriteBehindQueue(BrokenDatabase(), spool=Spool(blocked_path))
+            ref = queue.enqueue_message({'telegram_id': 10, 'chat_id': 1, 'text': 'помощь'})
+            await queue.flush()
+            self.assertIsNone(ref.spool_key)
+            self.assertFalse(queue.enqueue_response(ref, {'response_text': 'ок', 'sent_at': datetime.utcnow()}))
+            return queue.get_metrics()
+
+        metrics = asyncio.run(scenario())
+        self.assertEqual((metrics['rows_spooled'], metrics['rows_dropped']), (0, 2))
+
+    def test_spooled_raw_data_keeps_compression(self):
+        """Сжатый raw_data после отложенной записи хранится сжатым и распаковывается в исходный"""
+        session = self.db.get_session()
+        chat_id = self.db.upsert_chat(session, telegram_id=1, title="chat")
+        session.close()
+        raw_data = CompressedJSON({'id': 10, 'date': datetime(2024, 5, 1, 12, 30), 'message': 'помощь'})
+
+        async def first_run():
+            queue = WriteBehindQueue(BrokenDatabase(), spool=Spool(self.spool_path))
+            queue.enqueue_message({'telegram_id': 10, 'chat_id': chat_id, 'text': 'помощь', 'raw_data': raw_data})
+            await queue.flush()
+
+        async def second_run():
+            queue = WriteBehindQueue(self.db)
+            queue.replay(Spool(self.spool_path).take())
+            await queue.flush()
+
+        asyncio.run(first_run())
+        asyncio.run(second_run())
+
+        session = self.db.get_session()
+        stored = session.query(Message).one().raw_data
+        session.close()
+        self.assertEqual(stored['encoding'], COMPRESSED_ENCODING)
+        self.assertEqual(load_raw_data(stored), {'id': 10, 'date': '2024-05-01T12:30:00', 'message': 'помощь'})
+
+    def make_harness(self):
+        harness = ReplayHarness(lambda chats: SimpleResponder(chats=chats), self.db)
+        bot = harness.bot
+        # Один ответ в 2 секунды на чат: остальные ждут в очереди отправки
+        bot.send_scheduler = SendScheduler(chat_rate=0.5, chat_burst=1, deadline=600)
+        bot.spool = Spool(self.spool_path)
+        bot.seen_path = os.path.join(self.tmpdir.name, 'seen.bin')
+        harness._prepare()
+        return harness
+
+    def test_drain_defers_queued_replies(self):
+        """При остановке неотправленный ответ откладывается и уходит после перезапуска"""
+        harness = self.make_harness()
+        chat_id = harness.chat_ids[0]
+        keyword = harness.keywords()[0]
+
+        async def first_run():
+            bot = harness.bot
+            bot.db_writer.start()
+            tasks = [
+                asyncio.create_task(bot.dispatch_message(
+                    FakeEvent(FakeMessage(message_id, chat_id, keyword, FakeUser(100 + message_id)))))
+                for message_id in (1, 2, 3)
+            ]
+            await asyncio.sleep(0.1)
+            await bot.drain(timeout=0.1)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(first_run())
+        # Первый ответ ушел; второй ждал токена лимита, третье сообщение - очереди чата
+        self.assertEqual(len(harness.client.sent), 1)
+        spooled = Spool(self.spool_path).take()
+        self.assertEqual([record['kind'] for record in spooled], ['reply', 'reply'])
+        Spool(self.spool_path).append(spooled)
+
+        restarted = self.make_harness()
+
+        async def second_run():
+            bot = restarted.bot
+            bot._replay_spool()
+            await asyncio.gather(*bot._spool_tasks)
+
+        asyncio.run(second_run())
+        self.assertEqual(restarted.client.sent, [(harness.chat_names[0], record['text']) for record in spooled])
+        self.assertFalse(os.path.exists(self.spool_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Тесты времени импорта и ленивого создания глобальных объектов
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.check_import_time import measure
+from src.config.settings import Config, ConfigError
+from src.utils.lazy import LazyProxy
+
+# Допустимое время импорта модулей ботов в чистом процессе, секунд
+IMPORT_BUDGET = 1.5
+
+
+class TestImportTime(unittest.TestCase):
+    """Тесты для LazyProxy и бюджета времени импорта"""
+
+    def test_import_has_no_side_effects_and_fits_budget(self):
+        """Импорт без .env не читает конфигурацию, не создает БД и файлы логов"""
+        report = measure('src.bot_manager')
+        self.assertFalse(report['config'])
+        self.assertFalse(report['db_manager'])
+        self.assertFalse(report['logger'])
+        self.assertEqual(report['files'], [])
+        self.assertLess(report['seconds'], IMPORT_BUDGET)
+
+    def test_lazy_proxy(self):
+        """Объект создается один раз при первом обращении, lazy_init заменяет его"""
+        created = []
+
+        class Settings:
+            def __init__(self, value=1):
+                created.append(value)
+                self.value = value
+
+        proxy = LazyProxy(Settings)
+        self.assertFalse(proxy.lazy_initialized)
+        self.assertEqual(proxy.value, 1)
+        proxy.value = 5
+        self.assertEqual(proxy.value, 5)
+        self.assertEqual(created, [1])
+
+        proxy.lazy_init(value=7)
+        self.assertEqual(proxy.value, 7)
+        self.assertEqual(created, [1, 7])
+
+    def test_introspection_does_not_create_object(self):
+        """Служебные имена (hasattr, pytest) не создают объект"""
+        proxy = LazyProxy(lambda: self.fail("объект создан"))
+        self.assertFalse(hasattr(proxy, '__wrapped__'))
+        self.assertFalse(hasattr(proxy, '__test__'))
+        self.assertFalse(proxy.lazy_initialized)
+
+    def test_missing_env_raises_config_error(self):
+        """Без обязательных переменных создается исключение, а не выход из процесса"""
+        with mock.patch.dict(os.environ, {'API_ID_TG': '', 'BOT_TOKEN': ''}):
+            with self.assertRaises(ConfigError) as raised:
+                Config(env_path=os.devnull)
+        self.assertIn('API_ID_TG', str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Тесты запасных ответов LLM и кэша с временем жизни
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.cache import TTLCache
+from src.bots.llm_fallback import LLMFallback, normalize_question
+from src.utils.context_buffer import ContextEntry
+
+
+class SlowFallback(LLMFallback):
+    """LLMFallback с имитацией LLM вместо LLMPipeline"""
+
+    def __init__(self, delay, **kwargs):
+        super().__init__(pipeline=None, **kwargs)
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _request(self, question):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return f"ответ: {question}"
+
+
+class TestLLMFallback(unittest.TestCase):
+    """Тесты для TTLCache и LLMFallback"""
+
+    def test_ttl_cache_expires(self):
+        """Устаревшая запись удаляется и считается промахом"""
+        cache = TTLCache(maxsize=2, ttl=0.05)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('a'))
+        self.assertNotIn('a', cache)
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expired']), (1, 1, 1))
+
+    def test_normalize_question(self):
+        """Регистр, ё и пунктуация не влияют на ключ кэша"""
+        self.assertEqual(normalize_question("  Где  ЁЛКА?! "), normalize_question("где елка"))
+
+    def test_concurrent_questions_share_request_and_cache(self):
+        """Одинаковые вопросы ждут один запрос, повтор берется из кэша"""
+        fallback = SlowFallback(0.05, deadline=1)
+
+        async def scenario():
+            answers = await asyncio.gather(*(fallback.answer("Который час?") for _ in range(5)))
+            cached = await fallback.answer("который   час")
+            return answers, cached
+
+        answers, cached = asyncio.run(scenario())
+        fallback.close()
+        self.assertEqual(fallback.calls, 1)
+        self.assertEqual(set(answers), {"ответ: Который час?"})
+        self.assertEqual(cached, "ответ: Который час?")
+        self.assertEqual(fallback.stats['joined'], 4)
+        self.assertEqual(fallback.stats['cache_hits'], 1)
+
+    def test_deadline_returns_none_and_caches_late_answer(self):
+        """После дедлайна ответа нет, но поздний ответ попадает в кэш"""
+        fallback = SlowFallback(0.2, deadline=0.05)
+
+        async def scenario():
+            first = await fallback.answer("долгий вопрос?")
+            await asyncio.sleep(0.3)
+            return first, await fallback.answer("долгий вопрос?")
+
+        first, second = asyncio.run(scenario())
+        fallback.close()
+        self.assertIsNone(first)
+        self.assertEqual(second, "ответ: долгий вопрос?")
+        self.assertEqual(fallback.stats['timeouts'], 1)
+        self.assertEqual(fallback.stats['late_cached'], 1)
+        self.assertEqual(fallback.calls, 1)
+
+    def test_history_goes_to_prompt_and_cache_key(self):
+        """Предыдущие сообщения попадают в промпт и различают ключи кэша"""
+        fallback = SlowFallback(0, deadline=1, context=1)
+        history = [ContextEntry("старое", 0), ContextEntry("привет", 1, from_bot=True)]
+
+        async def scenario():
+            return (await fallback.answer("а дальше?", history),
+                    await fallback.answer("а дальше?"))
+
+        with_history, without_history = asyncio.run(scenario())
+        fallback.close()
+        self.assertIn("Бот: привет", with_history)
+        self.assertNotIn("старое", with_history)
+        self.assertEqual(without_history, "ответ: а дальше?")
+        self.assertEqual(fallback.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Тесты записи логов через очередь и ограничения частых записей
+"""
+
+import logging
+import os
+import sys
+import threading
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.log_pipeline import (
+    RateLimitFilter, SampleFilter, get_throttled_logger,
+    start_queue_logging, stop_queue_logging
+)
+
+
+class CollectingHandler(logging.Handler):
+    """Запоминает записи и поток, в котором они были записаны"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.threads.add(threading.current_thread().name)
+
+
+def make_logger(name):
+    logger = logging.getLogger(f"test_log_pipeline.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = CollectingHandler()
+    logger.handlers = [handler]
+    return logger, handler
+
+
+class TestLogPipeline(unittest.TestCase):
+    """Тесты для log_pipeline"""
+
+    def test_queue_writes_in_background_thread(self):
+        """Записи доходят до обработчиков из фонового потока"""
+        logger, handler = make_logger('queue')
+        start_queue_logging(logger)
+        for i in range(100):
+            logger.info("запись %d", i)
+        stop_queue_logging(logger.name)
+        self.assertEqual(len(handler.messages), 100)
+        self.assertEqual(handler.messages[7], "запись 7")
+        self.assertNotIn(threading.current_thread().name, handler.threads)
+
+    def test_rate_limit_reports_dropped(self):
+        """Сверх запаса записи отбрасываются, их число дописывается к следующей"""
+        logger, handler = make_logger('rate')
+        rate_filter = RateLimitFilter(per_second=1, burst=3)
+        logger.addFilter(rate_filter)
+
+        def log(i):
+            logger.info(f"сообщение {i}")
+
+        for i in range(10):
+            log(i)
+        self.assertEqual(len(handler.messages), 3)
+
+        # Пополняем ведро вручную, чтобы не ждать
+        key = next(iter(rate_filter._buckets))
+        rate_filter._buckets[key] = (3, rate_filter._buckets[key][1])
+        for i in range(10, 12):
+            log(i)
+        self.assertEqual(handler.messages[3], "сообщение 10 (пропущено похожих: 7)")
+
+    def test_sample_and_throttled_logger(self):
+        """Выборка пропускает каждую N-ю запись; дочерний логгер наследует обработчики"""
+        logger, handler = make_logger('sample')
+        throttled = get_throttled_logger(logger, per_second=0, sample=5)
+        self.assertTrue(any(isinstance(f, SampleFilter) for f in throttled.filters))
+        for i in range(20):
+            throttled.debug(f"сообщение {i}")
+        self.assertEqual(handler.messages, [f"сообщение {i} (1 из 5)" for i in (0, 5, 10, 15)])
+
+
+if __name__ == "__main__":
+    unittest.main()
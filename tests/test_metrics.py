@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Тесты гистограмм задержек
+"""
+
+import os
+import sys
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.metrics import LatencyHistogram, LatencyStats
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Тесты для LatencyHistogram и LatencyStats"""
+
+    def test_percentiles_within_precision(self):
+        """Перцентили совпадают с точными значениями с точностью корзины"""
+        histogram = LatencyHistogram(precision=0.05)
+        for value in range(1, 1001):
+            histogram.record(value)
+        for q, expected in ((50, 500), (95, 950), (99, 990)):
+            self.assertAlmostEqual(histogram.percentile(q), expected, delta=expected * 0.05)
+        self.assertEqual(histogram.snapshot()['max'], 1000)
+        self.assertEqual(histogram.snapshot()['count'], 1000)
+
+    def test_stats_by_stage(self):
+        """Этапы учитываются раздельно, отрицательные значения обрезаются"""
+        stats = LatencyStats()
+        stats.record('send', 120)
+        stats.record('delivery', -5)
+        snapshot = stats.snapshot()
+        self.assertEqual(set(snapshot), {'send', 'delivery'})
+        self.assertEqual(snapshot['delivery']['max'], 0)
+        self.assertEqual(LatencyHistogram().percentile(99), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
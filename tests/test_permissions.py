@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Тесты проверки прав в чатах и кэша проверенных чатов
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telethon.errors import ChatWriteForbiddenError
+from telethon.tl import types
+from src.utils.permissions import can_send_messages
+from src.bots.access_cache import ChatAccessCache
+from src.bots import SimpleResponder
+from src.bots.send_scheduler import SendResult
+
+
+def permissions(participant):
+    return SimpleNamespace(
+        participant=participant,
+        has_left=isinstance(participant, types.ChannelParticipantLeft),
+        is_banned=isinstance(participant, types.ChannelParticipantBanned),
+        is_admin=isinstance(participant, types.ChannelParticipantAdmin),
+        post_messages=isinstance(participant, types.ChannelParticipantAdmin) and participant.admin_rights.post_messages
+    )
+
+
+class TestPermissions(unittest.TestCase):
+    """Тесты для can_send_messages и ChatAccessCache"""
+
+    def test_can_send_messages(self):
+        """Права определяются по участнику и правам чата по умолчанию"""
+        group = SimpleNamespace(broadcast=False, default_banned_rights=None)
+        muted_group = SimpleNamespace(broadcast=False,
+                                      default_banned_rights=types.ChatBannedRights(0, send_messages=True))
+        channel = SimpleNamespace(broadcast=True)
+        member = types.ChannelParticipantSelf(1, 2, None)
+        admin = types.ChannelParticipantAdmin(1, 0, None, types.ChatAdminRights(post_messages=True))
+        restricted = types.ChannelParticipantBanned(
+            types.PeerUser(1), 2, None, types.ChatBannedRights(0, send_messages=True)
+        )
+
+        self.assertTrue(can_send_messages(group, permissions(member)))
+        self.assertFalse(can_send_messages(muted_group, permissions(member)))
+        self.assertTrue(can_send_messages(muted_group, permissions(admin)))
+        self.assertFalse(can_send_messages(channel, permissions(member)))
+        self.assertTrue(can_send_messages(channel, permissions(admin)))
+        self.assertFalse(can_send_messages(group, permissions(restricted)))
+        self.assertFalse(can_send_messages(group, permissions(types.ChannelParticipantLeft(types.PeerUser(1)))))
+
+    def test_access_cache_persists_with_ttl(self):
+        """Запись переживает перезапуск и устаревает по TTL"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'access.json')
+            ChatAccessCache(path, ttl=60).put('bot:@chat', {'peer_id': -100})
+            self.assertEqual(ChatAccessCache(path, ttl=60).get('bot:@chat')['peer_id'], -100)
+
+            stale = ChatAccessCache(path, ttl=60)
+            stale._load()['bot:@chat']['checked_at'] = time.time() - 61
+            self.assertIsNone(stale.get('bot:@chat'))
+
+    def test_warm_start_skips_checks(self):
+        """Чат из кэша подключается без обращения к Telegram"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bot = SimpleResponder(chats=['@chat'])
+            bot.access_cache = ChatAccessCache(os.path.join(tmpdir, 'access.json'), ttl=60)
+            info = {'peer_id': -1001, 'telegram_id': 1, 'username': 'chat',
+                    'title': 'Chat', 'chat_type': 'channel'}
+            checks = []
+
+            async def check_chat(chat):
+                checks.append(chat)
+                return info
+
+            bot._check_chat = check_chat
+            self.assertTrue(asyncio.run(bot._setup_chat('@chat')))
+            bot.chat_refs.clear()
+            self.assertTrue(asyncio.run(bot._setup_chat('@chat')))
+            self.assertEqual(checks, ['@chat'])
+            self.assertEqual(bot.chat_refs, {-1001: '@chat'})
+
+    def test_lost_write_access_invalidates_cache(self):
+        """Отказ в отправке удаляет сохраненную проверку чата, другие ошибки - нет"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bot = SimpleResponder(chats=['@chat'])
+            bot.access_cache = ChatAccessCache(os.path.join(tmpdir, 'access.json'), ttl=60)
+            bot.chat_refs[-1001] = '@chat'
+            key = bot._access_cache_key('@chat')
+            bot.access_cache.put(key, {'peer_id': -1001})
+            results = [
+                SendResult(success=False, error="timeout", exception=TimeoutError("timeout")),
+                SendResult(success=False, error="forbidden", exception=ChatWriteForbiddenError(request=None)),
+            ]
+
+            class Scheduler:
+                async def submit(self, client, chat, text, owner=None):
+                    return results.pop(0)
+
+            bot.send_scheduler = Scheduler()
+            asyncio.run(bot.send_response("ок", -1001))
+            self.assertIsNotNone(ChatAccessCache(bot.access_cache.path, ttl=60).get(key))
+            asyncio.run(bot.send_response("ок", -1001))
+            self.assertIsNone(ChatAccessCache(bot.access_cache.path, ttl=60).get(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
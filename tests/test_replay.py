@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Тесты нагрузочного стенда автоответчиков
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots import SimpleResponder
+from src.bots.replay import ReplayHarness, generate_events
+from src.database.database import DatabaseManager
+
+
+class TestReplayHarness(unittest.TestCase):
+    """Тесты для ReplayHarness на SQLite"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def test_replay_through_real_handler(self):
+        """События проходят через handle_message, ответы и записи подсчитываются"""
+        harness = ReplayHarness(lambda chats: SimpleResponder(chats=chats), self.db,
+                                chat_count=3, global_rate=10000, chat_rate=10000)
+        events = generate_events(harness.chat_ids, 60, harness.keywords(), reply_ratio=0.5, seed=1)
+        expected_replies = sum(1 for e in events if harness.bot.rule_engine.match(e.message.text))
+
+        report = asyncio.run(harness.run(events))
+
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['replies_sent'], expected_replies)
+        self.assertEqual(report['db_writer']['messages_written'], 60)
+        self.assertEqual(report['db_writer']['responses_written'], expected_replies)
+        self.assertGreater(report['db_statements'], 0)
+        self.assertEqual(report['latency_ms']['reply_total']['count'], expected_replies)
+
+
+if __name__ == "__main__":
+    unittest.main()
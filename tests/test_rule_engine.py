@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Тесты движка правил ответов
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots.rule_engine import RuleEngine, ResponseRule
+from src.utils.stemmer import KeywordNormalizer, stem
+
+
+def linear_match(rules, text):
+    """Эталонный линейный перебор, как в прежних версиях ботов"""
+    text_lower = text.lower()
+    for rule in sorted(rules, key=lambda x: x.priority):
+        for keyword in rule.keywords:
+            if keyword in text_lower:
+                return rule, keyword
+    return None
+
+
+class TestRuleEngine(unittest.TestCase):
+    """Тесты для RuleEngine"""
+
+    def test_dict_order_is_priority(self):
+        """Порядок словаря определяет победителя"""
+        engine = RuleEngine.from_responses({
+            'привет': "hello",
+            'как дела': "fine",
+            'пока': "bye"
+        })
+        match = engine.match("Пока, как дела? Привет!")
+        self.assertEqual(match.keyword, 'привет')
+        self.assertEqual(match.response, "hello")
+        self.assertIsNone(engine.match("ничего интересного"))
+        self.assertIsNone(engine.match(""))
+
+    def test_priority_and_keyword_order(self):
+        """Приоритет правила важнее позиции в тексте"""
+        engine = RuleEngine.from_rule_dicts([
+            {'keywords': ['как дела', 'как ты'], 'response': "a", 'priority': 2},
+            {'keywords': ['помощь', 'помоги'], 'response': "b", 'priority': 1},
+        ])
+        match = engine.match("как ты? помоги пожалуйста")
+        self.assertEqual(match.response, "b")
+        self.assertEqual(match.keyword, 'помоги')
+        self.assertEqual(match.priority, 1)
+
+    def test_overlapping_keywords(self):
+        """Ключевые слова внутри других слов находятся через суффиксные ссылки"""
+        engine = RuleEngine.from_responses({'hi': "x", 'ку': "y"})
+        self.assertEqual(engine.match("this").keyword, 'hi')
+        self.assertEqual(engine.match("куку").keyword, 'ку')
+
+    def test_matches_linear_scan(self):
+        """Результат совпадает с линейным перебором на случайных данных"""
+        rng = random.Random(42)
+        alphabet = "абвгд "
+        rules = [
+            ResponseRule(
+                keywords=tuple(
+                    ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                    for _ in range(rng.randint(1, 3))
+                ),
+                response=f"r{i}",
+                priority=rng.randint(1, 3)
+            )
+            for i in range(30)
+        ]
+        engine = RuleEngine(rules)
+        for _ in range(500):
+            text = ''.join(rng.choice(alphabet + "АБ") for _ in range(rng.randint(0, 30)))
+            expected = linear_match(rules, text)
+            match = engine.match(text)
+            if expected is None:
+                self.assertIsNone(match)
+            else:
+                self.assertIs(match.rule, expected[0])
+                self.assertEqual(match.keyword, expected[1])
+
+
+
+class TestKeywordNormalizer(unittest.TestCase):
+    """Тесты для стемминга и сопоставления по основам слов"""
+
+    def test_stem(self):
+        """Словоформы приводятся к одной основе, латиница не меняется"""
+        self.assertEqual(stem("помогите"), stem("помоги"))
+        self.assertEqual(stem("делах"), stem("дела"))
+        self.assertEqual(stem("красивейший"), "красив")
+        self.assertEqual(stem("бегавшись"), "бега")
+        self.assertEqual(stem("hello"), "hello")
+
+    def test_normalized_engine_matches_word_forms_only(self):
+        """Ключевое слово находится в другой словоформе, но не внутри другого слова"""
+        normalizer = KeywordNormalizer(cache_size=100)
+        engine = RuleEngine.from_responses({'помоги': "help", 'как дела': "ok", 'ку': "hi"}, normalizer)
+        self.assertEqual(engine.match("Помогите, пожалуйста!").keyword, 'помоги')
+        self.assertEqual(engine.match("ну как твои дела? как делах?").keyword, 'как дела')
+        self.assertIsNone(engine.match("куда идти"))
+        # Без нормализатора поиск по подстроке, как раньше
+        self.assertIsNotNone(RuleEngine.from_responses({'ку': "hi"}).match("куда"))
+
+        engine.match("помогите помогите")
+        stats = normalizer.get_stats()
+        self.assertGreater(stats['hits'], 0)
+        self.assertLessEqual(stats['size'], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Тесты правил ответов из базы данных
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from sqlalchemy import text
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots.rule_store import RuleStore
+from src.database.database import DatabaseManager
+from src.database.models import ResponseRuleRecord
+
+
+class TestRuleStore(unittest.TestCase):
+    """Тесты для RuleStore на SQLite"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+        session = self.db.get_session()
+        self.chat_id = self.db.upsert_chat(session, telegram_id=1, title="test")
+        session.close()
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _add_rule(self, **fields):
+        session = self.db.get_session()
+        try:
+            rule = ResponseRuleRecord(**fields)
+            session.add(rule)
+            session.commit()
+            return rule.id
+        finally:
+            session.close()
+
+    def test_reload_swaps_snapshot_on_change(self):
+        """Новая версия загружается только при изменении таблицы"""
+        async def scenario():
+            self._add_rule(bot_type='simple', keywords=['привет'], response="Привет из базы")
+            self._add_rule(bot_type='smart', keywords=['привет'], response="Чужое правило")
+            self._add_rule(chat_id=self.chat_id, keywords=['цена'], response="Цена в чате")
+
+            store = RuleStore(self.db, 'simple', interval=0)
+            await store.start()
+            first = store.snapshot
+            self.assertEqual(first.default.match("привет всем").response, "Привет из базы")
+            self.assertEqual(first.by_chat[self.chat_id].match("какая цена").response, "Цена в чате")
+            self.assertEqual(first.by_chat[self.chat_id].match("привет").response, "Привет из базы")
+            self.assertEqual(store.rule_count(), 2)
+            self.assertFalse(await store.reload())
+
+            session = self.db.get_session()
+            rule = session.query(ResponseRuleRecord).filter_by(bot_type='simple').one()
+            rule.is_active = False
+            session.commit()
+            session.close()
+
+            self.assertTrue(await store.reload())
+            self.assertIsNone(store.snapshot.default)
+            # Старый снимок не изменился - обработчики, уже взявшие его, не затронуты
+            self.assertIsNotNone(first.default)
+            await store.stop()
+
+        asyncio.run(scenario())
+
+    def test_reload_picks_up_raw_sql_update(self):
+        """Правка правила через SQL без ORM (updated_at не меняется) тоже перезагружает набор"""
+        async def scenario():
+            rule_id = self._add_rule(bot_type='simple', keywords=['привет'], response="Привет из базы")
+            store = RuleStore(self.db, 'simple', interval=0)
+            await store.start()
+
+            session = self.db.get_session()
+            session.execute(text("UPDATE response_rules SET response = 'Новый текст' WHERE id = :id"),
+                            {'id': rule_id})
+            session.commit()
+            session.close()
+            self.assertTrue(await store.reload())
+            self.assertEqual(store.snapshot.default.match("привет").response, "Новый текст")
+
+            session = self.db.get_session()
+            session.execute(text("UPDATE response_rules SET is_active = false WHERE id = :id"), {'id': rule_id})
+            session.commit()
+            session.close()
+            self.assertTrue(await store.reload())
+            self.assertIsNone(store.snapshot.default)
+            await store.stop()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Тесты защиты от повторной доставки сообщений
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.seen_ring import SeenRing
+
+
+class TestSeenRing(unittest.TestCase):
+    """Тесты для SeenRing"""
+
+    def test_duplicates_and_eviction(self):
+        """Повтор распознается, самые старые ключи вытесняются"""
+        ring = SeenRing(capacity=3)
+        self.assertFalse(ring.check_and_add(-1001234567890, 1))
+        self.assertTrue(ring.check_and_add(-1001234567890, 1))
+        self.assertFalse(ring.check_and_add(-1009999999999, 1))
+        ring.check_and_add(5, 2)
+        ring.check_and_add(5, 3)
+        self.assertNotIn((-1001234567890, 1), ring)
+        self.assertIn((5, 3), ring)
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.get_stats()['hits'], 1)
+
+    def test_persistence_keeps_newest(self):
+        """Сохраненный список восстанавливается после перезапуска"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'seen.bin')
+            ring = SeenRing(capacity=10)
+            for message_id in range(1, 6):
+                ring.check_and_add(-1001234567890, message_id)
+            ring.save(path)
+
+            restored = SeenRing(capacity=3)
+            self.assertEqual(restored.load(path), 5)
+            self.assertTrue(restored.check_and_add(-1001234567890, 5))
+            self.assertFalse(restored.check_and_add(-1001234567890, 1))
+            self.assertEqual(SeenRing().load(os.path.join(tmpdir, 'missing.bin')), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Тесты планировщика исходящих сообщений
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telethon.errors import ChatWriteForbiddenError, FloodWaitError
+from src.bots.send_scheduler import SendScheduler, TokenBucket
+
+
+class FakeClient:
+    """Клиент, который записывает отправленные сообщения"""
+
+    def __init__(self, flood_waits=0, errors=()):
+        self.sent = []
+        self.calls = 0
+        self.flood_waits = flood_waits
+        self.errors = list(errors)
+
+    async def send_message(self, chat, text):
+        self.calls += 1
+        if self.flood_waits:
+            self.flood_waits -= 1
+            raise FloodWaitError(request=None, capture=0)
+        if self.errors:
+            raise self.errors.pop(0)
+        await asyncio.sleep(0.01)
+        self.sent.append((chat, text))
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Тесты для TokenBucket"""
+
+    def test_burst_then_rate(self):
+        """После исчерпания всплеска токены появляются со скоростью rate"""
+        bucket = TokenBucket(rate=2.0, capacity=2)
+        now = bucket.updated
+        for _ in range(2):
+            self.assertEqual(bucket.delay(now), 0.0)
+            bucket.consume()
+        self.assertAlmostEqual(bucket.delay(now), 0.5)
+        self.assertEqual(bucket.delay(now + 0.5), 0.0)
+
+
+class TestSendScheduler(unittest.TestCase):
+    """Тесты для SendScheduler"""
+
+    def test_queue_delay_reported_separately(self):
+        """Задержка очереди растет из-за лимита чата, время отправки - нет"""
+        async def scenario():
+            scheduler = SendScheduler(chat_rate=20.0, chat_burst=1)
+            client = FakeClient()
+            results = await asyncio.gather(*[
+                scheduler.submit(client, '@chat', f"reply {i}") for i in range(3)
+            ])
+            return client, results
+
+        client, results = asyncio.run(scenario())
+        self.assertEqual([text for _, text in client.sent], ["reply 0", "reply 1", "reply 2"])
+        self.assertTrue(all(result.success for result in results))
+        self.assertLess(results[0].queue_delay_ms, results[2].queue_delay_ms)
+        self.assertGreaterEqual(results[2].queue_delay_ms, 80)
+        self.assertLess(results[2].send_ms, 80)
+
+    def test_flood_wait_retry(self):
+        """После FloodWait сообщение отправляется повторно"""
+        async def scenario():
+            scheduler = SendScheduler()
+            client = FakeClient(flood_waits=1)
+            result = await scheduler.submit(client, '@chat', "hello")
+            return scheduler, client, result
+
+        scheduler, client, result = asyncio.run(scenario())
+        self.assertTrue(result.success)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(scheduler.stats['flood_waits'], 1)
+        self.assertEqual(client.sent, [('@chat', "hello")])
+
+    def test_permanent_error_not_retried(self):
+        """Ошибка прав доступа не повторяется, сетевая ошибка - повторяется"""
+        async def scenario(error):
+            scheduler = SendScheduler()
+            client = FakeClient(errors=[error])
+            result = await scheduler.submit(client, '@chat', "hello")
+            return client, result
+
+        client, result = asyncio.run(scenario(ChatWriteForbiddenError(request=None)))
+        self.assertFalse(result.success)
+        self.assertIsInstance(result.exception, ChatWriteForbiddenError)
+        self.assertEqual((result.attempts, client.calls), (1, 1))
+
+        client, result = asyncio.run(scenario(ConnectionError("сеть недоступна")))
+        self.assertTrue(result.success)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(client.sent, [('@chat', "hello")])
+
+    def test_coalescing(self):
+        """Ожидающие ответы в один чат объединяются в одно сообщение"""
+        async def scenario():
+            scheduler = SendScheduler(coalesce=True)
+            client = FakeClient()
+            results = await asyncio.gather(*[
+                scheduler.submit(client, '@chat', text) for text in ("a", "b", "c")
+            ])
+            return client, results
+
+        client, results = asyncio.run(scenario())
+        self.assertEqual(client.sent, [('@chat', "a\n\nb\n\nc")])
+        self.assertEqual([result.coalesced for result in results], [3, 3, 3])
+
+    def test_deadline_expires(self):
+        """Сообщение с истекшим сроком не отправляется"""
+        async def scenario():
+            scheduler = SendScheduler(chat_rate=1.0, chat_burst=1)
+            client = FakeClient()
+            first = scheduler.submit(client, '@chat', "first")
+            second = scheduler.submit(client, '@chat', "second", deadline=0.1)
+            return client, await asyncio.gather(first, second)
+
+        client, (first, second) = asyncio.run(scenario())
+        self.assertTrue(first.success)
+        self.assertFalse(second.success)
+        self.assertEqual(client.sent, [('@chat', "first")])
+
+
+if __name__ == "__main__":
+    unittest.main()
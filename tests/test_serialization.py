@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Тесты сериализации raw_data
+"""
+
+import json
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.serialization import CompressedJSON, capture_message, json_dumps, load_raw_data
+
+
+class MockMedia:
+    pass
+
+
+class MockMessage:
+    def __init__(self):
+        self.id = 5
+        self.date = datetime(2024, 9, 16, 20, 0, tzinfo=timezone.utc)
+        self.sender_id = 42
+        self.media = MockMedia()
+        self.views = None
+
+    def to_dict(self):
+        return {'_': 'Message', 'id': self.id, 'date': self.date, 'file_reference': b'\x00\x01'}
+
+
+class TestSerialization(unittest.TestCase):
+    """Тесты для capture_message и json_dumps"""
+
+    def test_native_datetime_and_bytes(self):
+        """datetime и bytes кодируются без предварительного обхода дерева"""
+        data = json.loads(json_dumps(capture_message(MockMessage(), mode='full')))
+        self.assertEqual(data['date'], "2024-09-16T20:00:00+00:00")
+        self.assertEqual(data['file_reference'], "AAE=")
+
+    def test_field_projection(self):
+        """В режиме fields сохраняются только заданные непустые поля"""
+        data = capture_message(MockMessage(), mode='fields', fields=('id', 'views', 'media'))
+        self.assertEqual(data, {'id': 5, 'media': 'MockMedia'})
+        self.assertIsNone(capture_message(MockMessage(), mode='none'))
+
+    def test_compressed_round_trip(self):
+        """Сжатое значение распаковывается в исходные данные"""
+        data = capture_message(MockMessage(), mode='fields', compress=True)
+        self.assertIsInstance(data, CompressedJSON)
+        stored = json.loads(json_dumps(data))
+        self.assertEqual(stored['encoding'], 'zlib+base64')
+        self.assertEqual(load_raw_data(stored)['sender_id'], 42)
+        self.assertEqual(load_raw_data({'id': 1}), {'id': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
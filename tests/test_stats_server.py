@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Тесты HTTP-статистики запущенных ботов
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from sqlalchemy import event
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.stats_server import StatsServer
+from src.bots import SimpleResponder
+from src.bots.replay import ReplayHarness, generate_events
+from src.database.database import DatabaseManager
+
+
+class FakeManager:
+    """BotManager с уже запущенными ботами"""
+
+    def __init__(self, running):
+        self.running = running
+
+
+async def http_get(port, path):
+    """Выполняет GET-запрос и возвращает статус и JSON тела"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, body = raw.split(b"\r\n\r\n", 1)
+    return int(head.split()[1]), json.loads(body)
+
+
+class TestStatsServer(unittest.TestCase):
+    """Тесты для StatsServer"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+        self.statements = 0
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def count_statement(self, *args):
+        self.statements += 1
+
+    def test_stats_and_cached_messages(self):
+        """Статистика бота отдается по HTTP, повторный опрос не обращается к базе"""
+        harness = ReplayHarness(lambda chats: SimpleResponder(chats=chats), self.db,
+                                global_rate=10000, chat_rate=10000)
+        events = generate_events(harness.chat_ids, 10, harness.keywords(), reply_ratio=0.5, seed=3)
+
+        async def scenario():
+            await harness.run(events)
+            server = StatsServer(FakeManager({'simple': harness.bot}), port=0, cache_ttl=60, db_manager=self.db)
+            await server.start()
+            try:
+                health = await http_get(server.port, '/health')
+                stats = await http_get(server.port, '/stats')
+                chat = harness.chat_names[0]
+                first = await http_get(server.port, f'/messages?chat={chat}&limit=5')
+                event.listen(self.db.engine, 'before_cursor_execute', self.count_statement)
+                try:
+                    repeated = await asyncio.gather(*(
+                        http_get(server.port, f'/messages?chat={chat}&limit=5') for _ in range(5)
+                    ))
+                finally:
+                    event.remove(self.db.engine, 'before_cursor_execute', self.count_statement)
+                missing = await http_get(server.port, '/messages?chat=@nope')
+                unknown = await http_get(server.port, '/nope')
+                return health, stats, first, repeated, missing, unknown, server.get_stats()
+            finally:
+                await server.stop()
+
+        health, stats, first, repeated, missing, unknown, server_stats = asyncio.run(scenario())
+        self.assertEqual(health, (200, {'status': 'ok', 'bots': ['simple']}))
+        self.assertEqual(stats[0], 200)
+        self.assertEqual(stats[1]['simple']['stats']['total_messages'], 10)
+        self.assertIn('reply_total', stats[1]['simple']['latency_ms'])
+        self.assertEqual(first[0], 200)
+        self.assertTrue(1 <= len(first[1]['messages']) <= 5)
+        self.assertTrue(all(response == first for response in repeated))
+        self.assertEqual(self.statements, 0)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(unknown[0], 404)
+        self.assertEqual(server_stats['cache']['hits'], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
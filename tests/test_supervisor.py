@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Тесты супервизора процессов и статистики сессий
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.hash_ring import HashRing
+from src.config.settings import ConfigError
+from src.supervisor import Supervisor
+from src.database.database import DatabaseManager
+from src.database.session_tracker import SessionTracker
+
+
+class FakeProcess:
+    """Процесс без запуска: жив, пока тест его не «уронит»"""
+
+    started = []
+    calls = []  # Порядок вызовов terminate/join всех процессов
+
+    def __init__(self, target, args, name, daemon):
+        self.args = args
+        self.name = name
+        self.pid = len(FakeProcess.started) + 1
+        self.alive = False
+        self.exitcode = None
+
+    def start(self):
+        self.alive = True
+        FakeProcess.started.append(self)
+
+    def is_alive(self):
+        return self.alive
+
+    def crash(self):
+        self.alive = False
+        self.exitcode = 1
+
+    def terminate(self):
+        FakeProcess.calls.append(('terminate', self.name))
+        self.alive = False
+        self.exitcode = 0
+
+    def join(self, timeout=None):
+        FakeProcess.calls.append(('join', self.name))
+
+
+class TestSupervisor(unittest.TestCase):
+    """Тесты для HashRing, Supervisor и SessionTracker"""
+
+    def setUp(self):
+        FakeProcess.started = []
+        FakeProcess.calls = []
+        self.chats = [f"@chat{i}" for i in range(200)]
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.session_dir = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_supervisor(self, chats, workers, sessions=None, **kwargs):
+        """Супервизор с файлами сессий для первых `sessions` процессов (по умолчанию для всех)"""
+        for index in range(workers if sessions is None else sessions):
+            open(os.path.join(self.session_dir, f"bot_w{index}_reader.session"), 'w').close()
+        return Supervisor(['simple'], chats, workers=workers, session_name="bot",
+                          process_factory=FakeProcess, session_dir=self.session_dir, **kwargs)
+
+    def test_ring_moves_few_keys(self):
+        """При добавлении узла переезжает примерно 1/N ключей и только на новый узел"""
+        before = HashRing([f"worker-{i}" for i in range(4)])
+        after = HashRing([f"worker-{i}" for i in range(5)])
+        moved = [chat for chat in self.chats if before.get(chat) != after.get(chat)]
+        self.assertLess(len(moved), len(self.chats) * 0.35)
+        self.assertTrue(all(after.get(chat) == "worker-4" for chat in moved))
+        self.assertTrue(all(len(chats) > 10 for chats in after.assign(self.chats).values()))
+
+    def test_resize_restarts_only_affected_workers(self):
+        """Изменение числа процессов не трогает процессы с прежним набором чатов"""
+        supervisor = self.make_supervisor(self.chats[:6], workers=3)
+        supervisor.check(now=0)
+        initial = dict(supervisor.processes)
+        self.assertEqual(sorted(chat for chats in supervisor.assignments.values() for chat in chats),
+                         sorted(self.chats[:6]))
+
+        self.make_supervisor([], workers=4)
+        supervisor.resize(4)
+        supervisor.check(now=1)
+        unchanged = [index for index in initial if supervisor.processes[index] is initial[index]]
+        changed = set(supervisor.assignments) - set(unchanged)
+        self.assertTrue(unchanged)
+        self.assertEqual(len(FakeProcess.started), len(initial) + len(changed))
+
+    def test_stop_signals_all_workers_before_waiting(self):
+        """SIGTERM получают все останавливаемые процессы до ожидания первого из них"""
+        supervisor = self.make_supervisor(self.chats[:6], workers=3)
+        supervisor.check(now=0)
+        running = len(supervisor.processes)
+        self.assertGreater(running, 1)
+        supervisor.stop_workers(list(supervisor.processes))
+        actions = [action for action, _ in FakeProcess.calls]
+        self.assertEqual(actions, ['terminate'] * running + ['join'] * running)
+        self.assertEqual(supervisor.processes, {})
+
+    def test_missing_sessions_refuse_start_and_resize(self):
+        """Без файла сессии процесс не запускается, а число процессов не меняется"""
+        with self.assertRaises(ConfigError):
+            self.make_supervisor(self.chats[:6], workers=2, sessions=1)
+
+        supervisor = self.make_supervisor(self.chats[:6], workers=2)
+        assignments = dict(supervisor.assignments)
+        with self.assertRaises(ConfigError):
+            supervisor.resize(3)
+        self.assertEqual((supervisor.workers, supervisor.assignments), (2, assignments))
+        self.assertEqual(supervisor.missing_sessions(range(4)), ["bot_w2_reader", "bot_w3_reader"])
+
+    def test_crashed_worker_restarts_with_backoff(self):
+        """Упавший процесс перезапускается после паузы, растущей с каждой попыткой"""
+        supervisor = self.make_supervisor(self.chats[:4], workers=1)
+        supervisor._close_sessions = lambda index: None
+        supervisor.check(now=0)
+        supervisor.processes[0].crash()
+        supervisor.check(now=10)
+        self.assertNotIn(0, supervisor.processes)
+        supervisor.check(now=11)
+        self.assertIn(0, supervisor.processes)
+
+        supervisor.processes[0].crash()
+        supervisor.check(now=12)
+        supervisor.check(now=13)
+        self.assertNotIn(0, supervisor.processes)
+        supervisor.check(now=14)
+        self.assertIn(0, supervisor.processes)
+        self.assertEqual(len(FakeProcess.started), 3)
+
+    def test_session_tracker_rolls_up_counts(self):
+        """Счетчики процессов попадают в bot_sessions, строки закрываются при остановке"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = DatabaseManager(f"sqlite:///{os.path.join(tmpdir, 'test.db')}")
+            db.create_tables()
+            session = db.get_session()
+            chat_ids = [db.upsert_chat(session, telegram_id=i, title=f"chat{i}") for i in range(2)]
+
+            async def run_worker(name, messages):
+                tracker = SessionTracker(db, name, interval=0)
+                await tracker.open(chat_ids)
+                for _ in range(messages):
+                    tracker.count(chat_ids[0], messages=1)
+                tracker.count(chat_ids[1], messages=1, responses=1)
+                await tracker.flush()
+                return tracker
+
+            first = asyncio.run(run_worker("simple:bot_w0", 3))
+            asyncio.run(run_worker("simple:bot_w1", 1))
+            totals = db.get_bot_session_totals(session, "%:bot_w%", active_only=True)
+            self.assertEqual(totals["simple:bot_w0"]['messages_processed'], 4)
+            self.assertEqual(totals["simple:bot_w1"]['responses_sent'], 1)
+
+            asyncio.run(first.stop())
+            self.assertNotIn("simple:bot_w0", db.get_bot_session_totals(session, "%:bot_w%", active_only=True))
+
+            # '_' в имени не совпадает с другим символом: строки botXw1 не закрываются
+            asyncio.run(run_worker("simple:botXw1", 1))
+            supervisor = self.make_supervisor(self.chats[:2], workers=2, db_manager=db)
+            supervisor._close_sessions(1)
+            active = db.get_bot_session_totals(session, "%", active_only=True)
+            self.assertNotIn("simple:bot_w1", active)
+            self.assertIn("simple:botXw1", active)
+            session.close()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Тесты шаблонов ответов
+"""
+
+import os
+import sys
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bots import SimpleResponder, SmartResponder
+from src.bots.replay import FakeMessage, FakeUser
+from src.bots.rule_store import RuleSnapshot
+from src.bots.templates import ResponseTemplate
+from src.config.settings import config
+
+
+class TestResponseTemplate(unittest.TestCase):
+    """Тесты для ResponseTemplate и BaseBot.get_template"""
+
+    def setUp(self):
+        self.bot = SmartResponder(chats=['@chat'])
+        self.bot.chat_refs[-100] = '@chat'
+        self.bot.chat_titles[-100] = 'Мой чат'
+        self.bot.stats['total_messages'] = 7
+        user = FakeUser(1)
+        user.first_name = 'Анна'
+        self.message = FakeMessage(1, -100, 'привет', user)
+
+    def render(self, text, signature=''):
+        return ResponseTemplate(text, signature).render(self.bot, -100, self.message)
+
+    def test_placeholders_and_signature(self):
+        """Подстановки заполняются при отправке, подпись добавляется в конец"""
+        self.assertEqual(self.render("{name}, это {chat}, сообщений: {messages:>3}", "!"),
+                         "Анна, это Мой чат, сообщений:   7!")
+        self.bot.stats['total_messages'] = 8
+        self.assertTrue(self.render("{messages}").endswith("8"))
+
+    def test_static_and_unknown_text_kept(self):
+        """Текст без подстановок, неизвестные поля и непарные скобки не меняются"""
+        template = ResponseTemplate("👋 Привет!", " — бот")
+        self.assertTrue(template.is_static)
+        self.assertEqual(template.render(self.bot, -100, self.message), "👋 Привет! — бот")
+        # Без известных подстановок текст не разбирается, двойные скобки сохраняются
+        self.assertEqual(self.render("{unknown} и {{скобки}}"), "{unknown} и {{скобки}}")
+        self.assertEqual(self.render("{chat}: {{скобки}}"), "Мой чат: {скобки}")
+        self.assertEqual(self.render("смайл :-{"), "смайл :-{")
+        self.assertEqual(ResponseTemplate("{time}", dynamic=False).render(self.bot, -100, self.message), "{time}")
+
+    def test_numeric_format_spec(self):
+        """Счетчики форматируются как числа, некорректный формат отклоняется при компиляции"""
+        self.bot.stats['total_messages'] = 12345
+        self.assertEqual(self.render("{messages:d} / {messages:,}"), "12345 / 12,345")
+        with self.assertRaises(ValueError):
+            ResponseTemplate("{name:d}")
+        snapshot = RuleSnapshot.compile((1,), [
+            {'chat_id': None, 'keywords': ['плохо'], 'response': "{messages:q}", 'priority': 1},
+            {'chat_id': None, 'keywords': ['хорошо'], 'response': "{messages:,}", 'priority': 1},
+        ])
+        self.assertIsNone(snapshot.default.match("плохо"))
+        self.assertIsNotNone(snapshot.default.match("хорошо"))
+
+    def test_time_rule_is_evaluated_at_send_time(self):
+        """Правило 'время' показывает текущее время, а не время запуска"""
+        self.bot.start_time = time.time() - 65
+        match = self.bot.rule_engine.match("который час?")
+        response = self.bot.get_template(match.response).render(self.bot, -100, self.message)
+        self.assertIn(datetime.now().strftime('%H:%M'), response)
+        self.assertIn("0:01:05", response)
+        self.assertIs(self.bot.get_template(match.response), self.bot.get_template(match.response))
+
+    def test_signature_for_user_account(self):
+        """Подпись SimpleResponder входит в шаблон только при работе от имени пользователя"""
+        with mock.patch.object(config, 'USE_USER_ACCOUNT', True):
+            signed = SimpleResponder(chats=['@chat']).get_template("ок").render(self.bot, -100, self.message)
+        with mock.patch.object(config, 'USE_USER_ACCOUNT', False):
+            plain = SimpleResponder(chats=['@chat']).get_template("ок").render(self.bot, -100, self.message)
+        self.assertEqual(signed, "ок\n\n— Отвечает автоматически")
+        self.assertEqual(plain, "ок")
+
+
+if __name__ == "__main__":
+    unittest.main()
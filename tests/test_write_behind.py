@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Тесты отложенной пакетной записи в базу данных
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database import DatabaseManager
+from src.database.models import Chat, Message, BotResponse, User
+from src.database.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    """Тесты для WriteBehindQueue на SQLite"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}")
+        self.db.create_tables()
+        session = self.db.get_session()
+        self.chat_id = self.db.get_or_create_chat(session, telegram_id=1, title="test").id
+        session.close()
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def _message_row(self, telegram_id, user_id=None):
+        return {
+            'telegram_id': telegram_id,
+            'chat_id': self.chat_id,
+            'user_id': user_id,
+            'username': f"user{user_id}",
+            'text': f"message {telegram_id}",
+        }
+
+    def test_batches_resolve_foreign_keys(self):
+        """Ответы привязываются к сообщениям из той же и из прошлых пачек"""
+        async def scenario():
+            queue = WriteBehindQueue(self.db, batch_size=3, flush_interval=10)
+            queue.start()
+            refs = [queue.enqueue_message(self._message_row(i, user_id=100 + i % 2)) for i in range(5)]
+            for ref in refs:
+                queue.enqueue_response(ref, {'response_text': "ok", 'response_type': 'test'})
+            await queue.stop()
+            return queue, refs
+
+        queue, refs = asyncio.run(scenario())
+        metrics = queue.get_metrics()
+        self.assertEqual(metrics['messages_written'], 5)
+        self.assertEqual(metrics['responses_written'], 5)
+        self.assertEqual(metrics['pending'], 0)
+        self.assertGreaterEqual(metrics['flushes'], 3)
+
+        session = self.db.get_session()
+        try:
+            self.assertEqual(session.query(Message).count(), 5)
+            self.assertEqual(session.query(User).count(), 2)
+            for ref in refs:
+                self.assertIsNotNone(ref.id)
+                response = session.query(BotResponse).filter(BotResponse.original_message_id == ref.id).one()
+                self.assertEqual(response.response_text, "ok")
+                self.assertIsNotNone(response.persisted_at)
+        finally:
+            session.close()
+
+    def test_overflow_drops_rows(self):
+        """Переполненная очередь отбрасывает строки, а не блокирует обработчик"""
+        queue = WriteBehindQueue(self.db, batch_size=10, max_pending=2)
+        self.assertIsNotNone(queue.enqueue_message(self._message_row(1)))
+        self.assertIsNotNone(queue.enqueue_message(self._message_row(2)))
+        self.assertIsNone(queue.enqueue_message(self._message_row(3)))
+        self.assertEqual(queue.get_metrics()['rows_dropped'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()